@@ -0,0 +1,469 @@
+"""
+Local stand-ins for Notion, the App Script web app and the Graph Send API, for benchmarks.
+
+One process serves three ports:
+
+    <port>      Notion      POST /v1/databases/<id>/query   (filters, sorts, pagination, filter_properties)
+                            GET  /v1/databases/<id>          (schema, for filter_properties IDs)
+                            GET  /v1/pages/<id>, PATCH /v1/pages/<id>
+                            GET  /__stats, POST /__reset     (request counters / restore the dataset)
+    <port + 1>  App Script  GET  /exec?formId=<id>[&since=<cursor>]   (ETag / 304, fixed latency)
+    <port + 2>  Graph       POST /v17.0/me/messages, POST /v17.0 (batch)
+
+Every Nth Notion request answers 429 with a Retry-After header, so the rate
+limiter and retry paths are exercised too.
+
+The dataset is generated from a number of forms and response rows: every
+person has one response row per form, and half of the people answered each
+form in Google Forms. Column names mirror NotionColumns.
+
+Usage:
+    python -m bench.fake_services --forms 100 --rows 10000 --port 8900
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+from utils.app_script_standin import build_payload
+
+logger = logging.getLogger(__name__)
+
+FORMS_DB = "forms-db"
+PEOPLE_DB = "people-db"
+RESPONSES_DB = "responses-db"
+
+# {database ID: {property name: (property ID, type)}}, mirroring NotionColumns
+SCHEMAS = {
+    FORMS_DB: {
+        "Nom du formulaire": ("title", "title"),
+        "Form ID": ("fid", "rich_text"),
+        "Date envoi": ("denv", "date"),
+        "Cadence relance": ("cad", "number"),
+    },
+    PEOPLE_DB: {
+        "Prénom": ("title", "title"),
+        "PSID": ("psid", "rich_text"),
+        "Email": ("mail", "email"),
+    },
+    RESPONSES_DB: {
+        "Forms": ("frel", "relation"),
+        "Personnes": ("prel", "relation"),
+        "A répondu": ("resp", "checkbox"),
+        "Dernier rappel": ("rapp", "date"),
+        # Rollup of the person's PSID (see NOTION_PSID_ROLLUP)
+        "PSID": ("rpsid", "rollup"),
+    },
+}
+
+CREATED = "2025-09-01T08:00:00.000Z"
+
+def _page_id(database_index: int, row: int) -> str:
+    return str(uuid.UUID(int=(database_index << 64) | row))
+
+def _now_minute() -> str:
+    # Notion rounds last_edited_time down to the minute
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:00.000Z")
+
+def _comparable(value: str) -> str:
+    """Normalize a date or datetime so that string comparison follows time order."""
+    return (value + "T00:00:00" if len(value) == 10 else value)[:19]
+
+class Dataset:
+    """Compact rows of the three databases plus the App Script responses of each form."""
+
+    def __init__(self, forms: int, rows: int):
+        self.form_count = forms
+        self.people_count = max(1, rows // max(1, forms))
+        self.lock = threading.Lock()
+        self.rows: Dict[str, Dict[str, Dict[str, Any]]] = {FORMS_DB: {}, PEOPLE_DB: {}, RESPONSES_DB: {}}
+        self.app_script: Dict[str, List[Dict]] = {}
+        self._generate()
+
+    def _add(self, database_id: str, page_id: str, props: Dict[str, Any]):
+        self.rows[database_id][page_id] = {"id": page_id, "created_time": CREATED,
+                                           "last_edited_time": CREATED, "props": props}
+
+    def _generate(self):
+        people = []
+        for j in range(self.people_count):
+            page_id = _page_id(2, j)
+            email = f"person{j}@example.org"
+            # One person in 20 cannot be reached on Messenger
+            psid = "" if j % 20 == 19 else f"psid-{j}"
+            self._add(PEOPLE_DB, page_id, {"Prénom": f"Person {j}", "PSID": psid, "Email": email})
+            people.append((page_id, email, psid))
+
+        row = 0
+        for i in range(self.form_count):
+            form_id = _page_id(1, i)
+            google_form_id = f"gform-{i:05d}"
+            self._add(FORMS_DB, form_id, {"Nom du formulaire": f"Form {i}", "Form ID": google_form_id,
+                                          "Date envoi": "2025-09-01", "Cadence relance": None})
+            self.app_script[google_form_id] = []
+            for j, (person_id, email, _) in enumerate(people):
+                self._add(RESPONSES_DB, _page_id(3, row), {"Forms": [form_id], "Personnes": [person_id],
+                                                           "A répondu": False, "Dernier rappel": None})
+                row += 1
+                if (i + j) % 2 == 0:
+                    self.app_script[google_form_id].append({
+                        "email": email, "firstName": f"Person {j}", "lastName": "",
+                        "timestamp": f"2025-09-0{1 + j % 9}T12:00:00.000Z"
+                    })
+
+    # ----- Values -----
+
+    def value(self, database_id: str, row: Dict, property_name: str) -> Any:
+        if database_id == RESPONSES_DB and property_name == "PSID":
+            people = self.rows[PEOPLE_DB]
+            return [people[p]["props"]["PSID"] for p in row["props"]["Personnes"] if p in people]
+        return row["props"].get(property_name)
+
+    def render(self, database_id: str, row: Dict, property_ids: Optional[set] = None) -> Dict:
+        """Notion page JSON of a row (only the properties in `property_ids` when given)."""
+        properties = {}
+        for name, (prop_id, prop_type) in SCHEMAS[database_id].items():
+            if property_ids is not None and prop_id not in property_ids:
+                continue
+            value = self.value(database_id, row, name)
+            if prop_type in ("title", "rich_text"):
+                rendered = [{"type": "text", "text": {"content": value}, "plain_text": value}] if value else []
+            elif prop_type == "date":
+                rendered = {"start": value, "end": None} if value else None
+            elif prop_type == "relation":
+                rendered = [{"id": page_id} for page_id in value]
+            elif prop_type == "rollup":
+                rendered = {"type": "array", "function": "show_original", "array": [
+                    {"type": "rich_text", "rich_text": [{"type": "text", "plain_text": v}] if v else []}
+                    for v in value]}
+            else:
+                rendered = value
+            properties[name] = {"id": prop_id, "type": prop_type, prop_type: rendered}
+        return {"object": "page", "id": row["id"], "created_time": row["created_time"],
+                "last_edited_time": row["last_edited_time"], "archived": False,
+                "parent": {"type": "database_id", "database_id": database_id}, "properties": properties}
+
+    # ----- Queries -----
+
+    def matches(self, database_id: str, row: Dict, condition: Optional[Dict]) -> bool:
+        if not condition:
+            return True
+        if "and" in condition:
+            return all(self.matches(database_id, row, c) for c in condition["and"])
+        if "or" in condition:
+            return any(self.matches(database_id, row, c) for c in condition["or"])
+        if "timestamp" in condition:
+            return self._match_date(row[condition["timestamp"]], condition[condition["timestamp"]])
+
+        value = self.value(database_id, row, condition["property"])
+        if "checkbox" in condition:
+            return bool(value) == condition["checkbox"]["equals"]
+        if "relation" in condition:
+            return condition["relation"]["contains"] in value
+        if "date" in condition:
+            return self._match_date(value, condition["date"])
+        if "rollup" in condition:
+            return any(value)
+        if "rich_text" in condition or "title" in condition:
+            text = condition.get("rich_text") or condition.get("title")
+            return bool(value) if text.get("is_not_empty") else value == text.get("equals")
+        raise ValueError(f"unsupported filter {condition}")
+
+    @staticmethod
+    def _match_date(value: Optional[str], condition: Dict) -> bool:
+        if "is_empty" in condition:
+            return not value
+        if "is_not_empty" in condition:
+            return bool(value)
+        if not value:
+            return False
+        operator, target = next(iter(condition.items()))
+        value, target = _comparable(value), _comparable(target)
+        return {"before": value < target, "after": value > target, "on_or_before": value <= target,
+                "on_or_after": value >= target, "equals": value[:10] == target[:10]}[operator]
+
+    def query(self, database_id: str, body: Dict) -> List[Dict]:
+        rows = [row for row in self.rows[database_id].values() if self.matches(database_id, row, body.get("filter"))]
+        for sort in reversed(body.get("sorts") or []):
+            if "timestamp" in sort:
+                key = lambda row, field=sort["timestamp"]: row[field]
+            else:
+                key = lambda row, name=sort["property"]: _comparable(self.value(database_id, row, name) or "9999")
+            rows.sort(key=key, reverse=sort.get("direction") == "descending")
+        return rows
+
+    def patch(self, page_id: str, properties: Dict) -> Optional[Tuple[str, Dict]]:
+        for database_id, rows in self.rows.items():
+            row = rows.get(page_id)
+            if row is None:
+                continue
+            for name, prop in properties.items():
+                if "checkbox" in prop:
+                    row["props"][name] = prop["checkbox"]
+                elif "date" in prop:
+                    row["props"][name] = (prop["date"] or {}).get("start")
+            row["last_edited_time"] = _now_minute()
+            return database_id, row
+        return None
+
+    def find(self, page_id: str) -> Optional[Tuple[str, Dict]]:
+        for database_id, rows in self.rows.items():
+            if page_id in rows:
+                return database_id, rows[page_id]
+        return None
+
+class FakeServices:
+    """The three stand-in servers, their dataset and request counters."""
+
+    def __init__(self, forms: int, rows: int, port: int = 8900, host: str = "127.0.0.1",
+                 throttle_every: int = 200, retry_after: float = 0.05, app_script_latency: float = 0.05,
+                 page_latency: float = 0.0):
+        self.forms = forms
+        self.rows = rows
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.app_script_latency = app_script_latency
+        self.page_latency = page_latency
+        self.dataset = Dataset(forms, rows)
+        self.counts: Dict[str, int] = {}
+        self._counts_lock = threading.Lock()
+        self._notion_requests = 0
+        # {query ID: matching rows} of the latest queries, read by their later pages
+        self._queries: "OrderedDict[str, List[Dict]]" = OrderedDict()
+        self._query_ids = itertools.count(1)
+        self.servers = [ThreadingHTTPServer((host, port + offset), handler)
+                        for offset, handler in enumerate(self._handlers())]
+        for server in self.servers:
+            server.daemon_threads = True
+        self.host = host
+        self.port = port
+
+    @property
+    def urls(self) -> Dict[str, str]:
+        base = f"http://{self.host}"
+        return {
+            "notion": f"{base}:{self.port}/v1",
+            "app_script": f"{base}:{self.port + 1}/exec",
+            "graph": f"{base}:{self.port + 2}/v17.0",
+            "stats": f"{base}:{self.port}/__stats",
+            "reset": f"{base}:{self.port}/__reset",
+        }
+
+    def count(self, key: str, amount: int = 1):
+        with self._counts_lock:
+            self.counts[key] = self.counts.get(key, 0) + amount
+
+    def _throttle(self) -> bool:
+        with self._counts_lock:
+            self._notion_requests += 1
+            return bool(self.throttle_every) and self._notion_requests % self.throttle_every == 0
+
+    def reset(self):
+        """Restore the generated dataset and zero the counters."""
+        dataset = Dataset(self.forms, self.rows)
+        with self._counts_lock:
+            self.dataset = dataset
+            self._queries.clear()
+            self.counts.clear()
+            self._notion_requests = 0
+
+    # ----- Notion -----
+
+    def notion_query(self, database_id: str, body: Dict, property_ids: Optional[set]) -> Dict:
+        dataset = self.dataset
+        page_size = min(int(body.get("page_size") or 100), 100)
+        with dataset.lock:
+            cursor = body.get("start_cursor")
+            rows = None
+            if cursor:
+                # Later pages of a query read the result computed for its first page
+                query_id, offset = cursor.rsplit(":", 1)
+                offset = int(offset)
+                rows = self._queries.get(query_id)
+            if rows is None:
+                rows = dataset.query(database_id, body)
+                query_id = str(next(self._query_ids))
+                offset = 0 if not cursor else offset
+                self._queries[query_id] = rows
+                while len(self._queries) > 64:
+                    self._queries.popitem(last=False)
+            chunk = [dataset.render(database_id, row, property_ids) for row in rows[offset:offset + page_size]]
+        has_more = offset + page_size < len(rows)
+        return {"object": "list", "results": chunk, "has_more": has_more,
+                "next_cursor": f"{query_id}:{offset + page_size}" if has_more else None}
+
+    def _handlers(self):
+        services = self
+
+        class JsonHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+            def _send(self, status: int, payload: Any = None, headers: Optional[Dict[str, str]] = None):
+                body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                if payload is not None:
+                    self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _body(self) -> bytes:
+                length = int(self.headers.get("Content-Length") or 0)
+                return self.rfile.read(length) if length else b""
+
+        class NotionHandler(JsonHandler):
+            def _throttled(self) -> bool:
+                if services._throttle():
+                    services.count("notion.429")
+                    self._send(429, {"object": "error", "status": 429, "code": "rate_limited"},
+                               {"Retry-After": str(services.retry_after)})
+                    return True
+                return False
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                parts = url.path.strip("/").split("/")
+                if url.path == "/__stats":
+                    with services._counts_lock:
+                        return self._send(200, dict(services.counts))
+                if self._throttled():
+                    return
+                if parts[:2] == ["v1", "databases"] and len(parts) == 3:
+                    services.count("notion.schema")
+                    schema = SCHEMAS.get(parts[2])
+                    if schema is None:
+                        return self._send(404, {"object": "error", "status": 404})
+                    return self._send(200, {"object": "database", "id": parts[2], "properties": {
+                        name: {"id": prop_id, "name": name, "type": prop_type}
+                        for name, (prop_id, prop_type) in schema.items()}})
+                if parts[:2] == ["v1", "pages"] and len(parts) == 3:
+                    services.count("notion.page_get")
+                    if services.page_latency:
+                        time.sleep(services.page_latency)
+                    with services.dataset.lock:
+                        found = services.dataset.find(parts[2])
+                        page = services.dataset.render(*found) if found else None
+                    return self._send(200 if page else 404, page or {"object": "error", "status": 404})
+                self._send(404, {"object": "error", "status": 404})
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                parts = url.path.strip("/").split("/")
+                body = json.loads(self._body() or b"{}")
+                if url.path == "/__reset":
+                    services.reset()
+                    return self._send(200, {"status": "reset"})
+                if self._throttled():
+                    return
+                if parts[:2] == ["v1", "databases"] and len(parts) == 4 and parts[3] == "query":
+                    services.count("notion.query")
+                    if parts[2] not in SCHEMAS:
+                        return self._send(404, {"object": "error", "status": 404})
+                    property_ids = parse_qs(url.query).get("filter_properties")
+                    try:
+                        result = services.notion_query(parts[2], body, set(property_ids) if property_ids else None)
+                    except (ValueError, KeyError) as e:
+                        return self._send(400, {"object": "error", "status": 400, "message": str(e)})
+                    return self._send(200, result)
+                self._send(404, {"object": "error", "status": 404})
+
+            def do_PATCH(self):
+                parts = urlparse(self.path).path.strip("/").split("/")
+                body = json.loads(self._body() or b"{}")
+                if self._throttled():
+                    return
+                if parts[:2] == ["v1", "pages"] and len(parts) == 3:
+                    services.count("notion.patch")
+                    if services.page_latency:
+                        time.sleep(services.page_latency)
+                    with services.dataset.lock:
+                        found = services.dataset.patch(parts[2], body.get("properties", {}))
+                        page = services.dataset.render(*found) if found else None
+                    return self._send(200 if page else 404, page or {"object": "error", "status": 404})
+                self._send(404, {"object": "error", "status": 404})
+
+        class AppScriptHandler(JsonHandler):
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)
+                form_id = query.get("formId", [None])[0]
+                since = query.get("since", [None])[0]
+                services.count("app_script.get")
+                if services.app_script_latency:
+                    time.sleep(services.app_script_latency)
+                responses = services.dataset.app_script.get(form_id)
+                if responses is None:
+                    return self._send(200, {"error": f"form not found: {form_id}"})
+                payload = build_payload(responses, since)
+                etag = '"' + hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()[:32] + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    services.count("app_script.304")
+                    return self._send(304, headers={"ETag": etag})
+                self._send(200, payload, {"ETag": etag})
+
+        class GraphHandler(JsonHandler):
+            def do_POST(self):
+                url = urlparse(self.path)
+                raw = self._body()
+                if url.path.endswith("/me/messages"):
+                    services.count("graph.send")
+                    services.count("graph.messages")
+                    return self._send(200, {"recipient_id": "bench", "message_id": "m"})
+                form = parse_qs(raw.decode("utf-8"))
+                if "batch" in form:
+                    operations = json.loads(form["batch"][0])
+                    services.count("graph.batch")
+                    services.count("graph.messages", len(operations))
+                    return self._send(200, [{"code": 200, "body": json.dumps({"message_id": "m"})}
+                                            for _ in operations])
+                self._send(400, {"error": {"message": "unsupported request", "code": 100}})
+
+        return NotionHandler, AppScriptHandler, GraphHandler
+
+    def start(self):
+        """Serve in background threads."""
+        for server in self.servers:
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def shutdown(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Fake Notion / App Script / Graph services for benchmarks")
+    parser.add_argument("--forms", type=int, default=10)
+    parser.add_argument("--rows", type=int, default=1000, help="Number of response rows")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900, help="Notion port; App Script and Graph use the next two")
+    parser.add_argument("--throttle-every", type=int, default=200, help="Answer 429 to every Nth Notion request (0: never)")
+    parser.add_argument("--retry-after", type=float, default=0.05, help="Retry-After of 429 answers, in seconds")
+    parser.add_argument("--app-script-latency", type=float, default=0.05, help="Seconds per App Script call")
+    parser.add_argument("--page-latency", type=float, default=0.0, help="Seconds per Notion page GET/PATCH")
+    args = parser.parse_args()
+
+    services = FakeServices(args.forms, args.rows, args.port, args.host, args.throttle_every, args.retry_after,
+                            args.app_script_latency, args.page_latency)
+    services.start()
+    logger.info(f"🧪 Fake services ready: {json.dumps(services.urls)}")
+    # The benchmark runner waits for this line
+    print("READY", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        services.shutdown()
@@ -0,0 +1,221 @@
+"""
+Offline benchmarks of the synchronization and reminder runs against bench.fake_services.
+
+For each scenario (forms x response rows) the runner starts the fake services
+in their own process, then runs each operation in a fresh worker process with
+an empty STATE_DIR, and reports wall time, requests per service and peak
+memory (max RSS of the worker).
+
+Operations:
+    sync        SynchronizerService.synchronize_all_forms() from a cold state
+    sync_warm   the same, second run in the same process (incremental reads, ETags, fingerprints)
+    remind      ReminderService.send_reminders_for_all_forms(sync_first=True)
+
+Usage:
+    python -m bench.run                                # small and medium scenarios
+    python -m bench.run --scenarios large --ops sync
+    python -m bench.run --scenarios 50x5000 --save bench.json
+    python -m bench.run --baseline bench.json          # exit code 1 on regression
+"""
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+SCENARIOS = {
+    "small": (10, 1000),
+    "medium": (100, 10000),
+    "large": (1000, 100000),
+}
+OPERATIONS = ("sync", "sync_warm", "remind")
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def parse_scenario(name: str):
+    """'small' / 'medium' / 'large' or '<forms>x<rows>'."""
+    if name in SCENARIOS:
+        return name, SCENARIOS[name]
+    forms, _, rows = name.partition("x")
+    return name, (int(forms), int(rows))
+
+def service_env(urls: Dict[str, str], state_dir: str, realistic_rates: bool) -> Dict[str, str]:
+    """Environment pointing the application at the fake services."""
+    env = dict(os.environ)
+    env.update({
+        "NOTION_TOKEN": "bench",
+        "NOTION_FORMS_DB_ID": "forms-db",
+        "NOTION_PEOPLE_DB_ID": "people-db",
+        "NOTION_RESPONSES_DB_ID": "responses-db",
+        "PAGE_TOKEN": "bench",
+        "GOOGLE_APP_SCRIPT_URL": urls["app_script"],
+        "NOTION_BASE_URL": urls["notion"],
+        "GRAPH_API_BASE_URL": urls["graph"],
+        "STATE_DIR": state_dir,
+        "PYTHONPATH": REPO_ROOT + os.pathsep + env.get("PYTHONPATH", ""),
+    })
+    if not realistic_rates:
+        # Measure the code, not the production rate limits
+        env.update({"NOTION_RATE_LIMIT": "10000", "MESSENGER_RATE_LIMIT": "10000", "DEFAULT_RATE_LIMIT": "10000"})
+    return env
+
+# ----- Worker (runs inside the measured process) -----
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def run_worker(operation: str, stats_url: str) -> Dict:
+    logging.basicConfig(level=logging.WARNING)
+    from utils.reminder_service import ReminderService
+
+    service = ReminderService()
+    if operation == "sync":
+        func = service.synchronizer.synchronize_all_forms
+    elif operation == "sync_warm":
+        service.synchronizer.synchronize_all_forms()
+        func = service.synchronizer.synchronize_all_forms
+    elif operation == "remind":
+        func = lambda: service.send_reminders_for_all_forms(sync_first=True)
+    else:
+        raise ValueError(f"unknown operation {operation}")
+
+    session = requests.Session()
+    before = session.get(stats_url).json()
+    rss_before = _peak_rss_mb()
+    started = time.perf_counter()
+    func()
+    wall = time.perf_counter() - started
+    after = session.get(stats_url).json()
+    service.synchronizer.close()
+
+    return {
+        "wall_seconds": round(wall, 3),
+        "requests": {key: value - before.get(key, 0) for key, value in sorted(after.items())
+                     if value != before.get(key, 0)},
+        "peak_rss_mb": _peak_rss_mb(),
+        "rss_before_mb": rss_before
+    }
+
+# ----- Runner -----
+
+def start_services(forms: int, rows: int, args) -> subprocess.Popen:
+    command = [sys.executable, "-m", "bench.fake_services", "--forms", str(forms), "--rows", str(rows),
+               "--port", str(args.port), "--throttle-every", str(args.throttle_every),
+               "--app-script-latency", str(args.app_script_latency), "--page-latency", str(args.page_latency)]
+    process = subprocess.Popen(command, cwd=REPO_ROOT, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    line = process.stdout.readline()
+    if line.strip() != "READY":
+        process.kill()
+        raise RuntimeError(f"fake services did not start (got {line!r})")
+    return process
+
+def run_operation(operation: str, urls: Dict[str, str], args) -> Dict:
+    requests.post(urls["reset"]).raise_for_status()
+    with tempfile.TemporaryDirectory(prefix="bench-state-") as state_dir:
+        env = service_env(urls, state_dir, args.realistic_rates)
+        completed = subprocess.run([sys.executable, "-m", "bench.run", "--worker", operation,
+                                    "--stats-url", urls["stats"]],
+                                   cwd=REPO_ROOT, env=env, capture_output=True, text=True, timeout=args.timeout)
+    if completed.returncode != 0:
+        raise RuntimeError(f"{operation} failed:\n{completed.stderr[-2000:]}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def format_requests(counts: Dict[str, int]) -> str:
+    return ", ".join(f"{key} {value}" for key, value in counts.items())
+
+def compare(results: List[Dict], baseline: List[Dict], tolerance: float) -> List[str]:
+    """Regressions of wall time or total requests beyond `tolerance` against a saved run."""
+    previous = {(r["scenario"], r["operation"]): r for r in baseline}
+    regressions = []
+    for result in results:
+        base = previous.get((result["scenario"], result["operation"]))
+        if base is None:
+            continue
+        label = f"{result['scenario']}/{result['operation']}"
+        if result["wall_seconds"] > base["wall_seconds"] * (1 + tolerance):
+            regressions.append(f"{label}: wall {base['wall_seconds']}s -> {result['wall_seconds']}s")
+        total, base_total = sum(result["requests"].values()), sum(base["requests"].values())
+        if total > base_total * (1 + tolerance):
+            regressions.append(f"{label}: requests {base_total} -> {total}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks against local fake services")
+    parser.add_argument("--scenarios", default="small,medium",
+                        help="Comma-separated: small (10x1k), medium (100x10k), large (1000x100k) or FORMSxROWS")
+    parser.add_argument("--ops", default=",".join(OPERATIONS), help=f"Comma-separated subset of {OPERATIONS}")
+    parser.add_argument("--port", type=int, default=8900, help="First of the three fake service ports")
+    parser.add_argument("--throttle-every", type=int, default=200, help="Notion answers 429 every N requests")
+    parser.add_argument("--app-script-latency", type=float, default=0.05, help="Seconds per App Script call")
+    parser.add_argument("--page-latency", type=float, default=0.0, help="Seconds per Notion page GET/PATCH")
+    parser.add_argument("--realistic-rates", action="store_true", help="Keep the configured API rate limits")
+    parser.add_argument("--timeout", type=int, default=3600, help="Seconds allowed per operation")
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare with a saved JSON file and fail on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before a regression")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--stats-url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.stats_url)))
+        return
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    operations = [op for op in args.ops.split(",") if op]
+    results = []
+    for name, (forms, rows) in map(parse_scenario, args.scenarios.split(",")):
+        logger.info(f"🏁 Scenario {name}: {forms} forms, {rows} response rows")
+        process = start_services(forms, rows, args)
+        urls = {
+            "notion": f"http://127.0.0.1:{args.port}/v1",
+            "app_script": f"http://127.0.0.1:{args.port + 1}/exec",
+            "graph": f"http://127.0.0.1:{args.port + 2}/v17.0",
+            "stats": f"http://127.0.0.1:{args.port}/__stats",
+            "reset": f"http://127.0.0.1:{args.port}/__reset",
+        }
+        try:
+            for operation in operations:
+                result = {"scenario": name, "forms": forms, "rows": rows, "operation": operation}
+                result.update(run_operation(operation, urls, args))
+                results.append(result)
+                logger.info(f"⏱️  {name}/{operation}: {result['wall_seconds']}s, peak {result['peak_rss_mb']} MB, "
+                            f"{format_requests(result['requests'])}")
+        finally:
+            process.terminate()
+            process.wait()
+
+    print(f"\n{'scenario':<10} {'operation':<10} {'wall (s)':>9} {'peak MB':>8} {'requests':>9}  details")
+    for r in results:
+        print(f"{r['scenario']:<10} {r['operation']:<10} {r['wall_seconds']:>9} {r['peak_rss_mb']:>8} "
+              f"{sum(r['requests'].values()):>9}  {format_requests(r['requests'])}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        logger.info(f"💾 Results saved to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            logger.error(f"❌ Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+        logger.info("✅ No regression against the baseline")
+
+if __name__ == "__main__":
+    main()
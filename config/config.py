@@ -27,12 +27,92 @@ class Config:
             if old_path:
                 self.google_app_script_url = old_path
                 logger.warning("Using GOOGLE_SERVICE_ACCOUNT_PATH as App Script URL - consider renaming to GOOGLE_APP_SCRIPT_URL")
+        
+        # Notion query tuning (optional)
+        self.notion_page_size = self._get_int_env("NOTION_PAGE_SIZE", 100)
+        self.notion_max_concurrency = self._get_int_env("NOTION_MAX_CONCURRENCY", 8)
+        
+        # Number of forms synchronized in parallel (optional)
+        self.sync_max_workers = self._get_int_env("SYNC_MAX_WORKERS", 4)
+        
+        # Concurrent Messenger sends when delivering reminders (optional)
+        self.reminder_delivery_workers = self._get_int_env("REMINDER_DELIVERY_WORKERS", 8)
+        
+        # Write-behind buffer for Notion page updates (optional)
+        self.notion_write_buffer_size = self._get_int_env("NOTION_WRITE_BUFFER_SIZE", 100)
+        self.notion_write_workers = self._get_int_env("NOTION_WRITE_WORKERS", 4)
+        
+        # Messenger batch sending (optional)
+        self.messenger_batch_threshold = self._get_int_env("MESSENGER_BATCH_THRESHOLD", 10)
+        self.messenger_batch_size = self._get_int_env("MESSENGER_BATCH_SIZE", 50)
+        self.messenger_batch_retries = self._get_int_env("MESSENGER_BATCH_RETRIES", 2)
+        
+        # HTTP connection pooling (optional)
+        self.http_pool_connections = self._get_int_env("HTTP_POOL_CONNECTIONS", 4)
+        self.http_pool_maxsize = self._get_int_env("HTTP_POOL_MAXSIZE", 16)
+        self.http_max_retries = self._get_int_env("HTTP_MAX_RETRIES", 5)
+        
+        # Per-host rate limits in requests per second (optional)
+        self.notion_rate_limit = self._get_float_env("NOTION_RATE_LIMIT", 3.0)
+        self.messenger_rate_limit = self._get_float_env("MESSENGER_RATE_LIMIT", 20.0)
+        self.default_rate_limit = self._get_float_env("DEFAULT_RATE_LIMIT", 10.0)
+        
+        # Person page cache (optional)
+        self.person_cache_size = self._get_int_env("PERSON_CACHE_SIZE", 512)
+        self.person_cache_ttl = self._get_int_env("PERSON_CACHE_TTL", 3600)
+        self.person_cache_revalidate = self._get_int_env("PERSON_CACHE_REVALIDATE", 60)
+        
+        # Local state (incremental sync watermarks) and full scan period in seconds (optional)
+        self.state_dir = os.getenv("STATE_DIR", ".state")
+        self.notion_full_scan_interval = self._get_int_env("NOTION_FULL_SCAN_INTERVAL", 86400)
+        
+        # Period in seconds of full App Script fetches between delta fetches (optional)
+        self.app_script_full_refresh_interval = self._get_int_env("APP_SCRIPT_FULL_REFRESH_INTERVAL", 86400)
+        
+        # Webhook server (optional); when WEBHOOK_SECRET is set, calls must send it.
+        # Listening beyond localhost requires a secret unless WEBHOOK_ALLOW_INSECURE is set
+        self.webhook_host = os.getenv("WEBHOOK_HOST", "127.0.0.1")
+        self.webhook_port = self._get_int_env("WEBHOOK_PORT", 8080)
+        self.webhook_secret = os.getenv("WEBHOOK_SECRET")
+        self.webhook_allow_insecure = os.getenv("WEBHOOK_ALLOW_INSECURE", "").lower() in ("1", "true", "yes")
+        
+        # Seconds a triggered sync/reminder run waits to absorb further triggers (optional)
+        self.trigger_debounce_seconds = self._get_float_env("TRIGGER_DEBOUNCE_SECONDS", 2.0)
+        
+        # Reminder scheduler: default days between reminders and data refresh period in seconds (optional)
+        self.reminder_cadence_days = self._get_float_env("REMINDER_CADENCE_DAYS", 3.0)
+        self.scheduler_refresh_interval = self._get_int_env("SCHEDULER_REFRESH_INTERVAL", 900)
+        
+        # Rollup of the person's PSID in the responses database, used to skip unreachable people (optional)
+        self.notion_psid_rollup = os.getenv("NOTION_PSID_ROLLUP")
+        
+        # API base URLs, overridable to point at local stand-ins (optional)
+        self.notion_base_url = os.getenv("NOTION_BASE_URL", "https://api.notion.com/v1").rstrip("/")
+        self.graph_api_base_url = os.getenv("GRAPH_API_BASE_URL", "https://graph.facebook.com/v17.0").rstrip("/")
     
     def _get_required_env(self, key):
         value = os.getenv(key)
         if not value:
             raise ValueError(f"Missing required environment variable: {key}")
         return value
+    
+    def _get_int_env(self, key, default):
+        value = os.getenv(key)
+        if not value:
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            raise ValueError(f"Environment variable {key} must be an integer, got '{value}'")
+    
+    def _get_float_env(self, key, default):
+        value = os.getenv(key)
+        if not value:
+            return default
+        try:
+            return float(value)
+        except ValueError:
+            raise ValueError(f"Environment variable {key} must be a number, got '{value}'")
 
 # Global config instance
 config = Config()
\ No newline at end of file
@@ -0,0 +1,48 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, Optional, Any, Callable, Iterable
+from config.config import config
+from connections.notion_connection import NotionClient
+from connections.notion_records import PersonRecord
+
+logger = logging.getLogger(__name__)
+
+class AsyncNotionClient:
+    """
+    Asyncio front-end for NotionClient with bounded concurrency.
+
+    Each call runs the blocking NotionClient method on a dedicated worker pool
+    (sharing its pooled HTTP session and person cache); the pool size caps the
+    number of requests in flight across every thread using this client.
+    Independent requests can then be overlapped with `asyncio.gather` instead
+    of being paid for one after another.
+    """
+
+    def __init__(self, notion: Optional[NotionClient] = None, max_concurrency: Optional[int] = None):
+        self.notion = notion or NotionClient()
+        self.max_concurrency = max_concurrency or config.notion_max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="notion")
+
+    async def _call(self, func: Callable, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def get_person_by_id(self, person_id: str) -> Optional[PersonRecord]:
+        """Get a person's data by their Notion page ID."""
+        return await self._call(self.notion.get_person_by_id, person_id)
+
+    async def get_persons_by_ids(self, person_ids: Iterable[str]) -> Dict[str, Optional[PersonRecord]]:
+        """Fetch several persons concurrently. Returns {person_id: record or None}."""
+        unique_ids = list(dict.fromkeys(person_ids))
+        persons = await asyncio.gather(*(self.get_person_by_id(pid) for pid in unique_ids))
+        return dict(zip(unique_ids, persons))
+
+    def run(self, coroutine) -> Any:
+        """Run a coroutine of this client to completion from synchronous code."""
+        return asyncio.run(coroutine)
+
+    def close(self):
+        """Shut down the worker pool."""
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,74 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Dict, Iterable, Optional
+from config.config import config
+
+logger = logging.getLogger(__name__)
+
+def content_hash(values: Iterable[str]) -> str:
+    """Order-independent SHA-256 of a set of strings (e.g. normalized respondent emails)."""
+    digest = hashlib.sha256()
+    for value in sorted(set(values)):
+        digest.update(value.encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+class FormFingerprints:
+    """
+    Persisted fingerprint of each form as of its last successful synchronization.
+
+    A fingerprint combines the content hash of the Google respondent emails
+    with a marker of the form's Notion response rows; when both are unchanged
+    the synchronization of that form can be skipped.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(config.state_dir, "form_fingerprints.json")
+        self._lock = threading.Lock()
+        self._fingerprints: Optional[Dict[str, Dict]] = None
+
+    def _load(self) -> Dict[str, Dict]:
+        if self._fingerprints is None:
+            self._fingerprints = {}
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self._fingerprints = json.load(f)
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not read form fingerprints {self.path}, starting from scratch: {e}")
+        return self._fingerprints
+
+    def get(self, notion_form_id: str) -> Optional[Dict]:
+        with self._lock:
+            return self._load().get(notion_form_id)
+
+    def put(self, notion_form_id: str, fingerprint: Dict):
+        """Record a form's fingerprint and write every fingerprint to disk."""
+        with self._lock:
+            self._load()[notion_form_id] = fingerprint
+            self._save()
+
+    def forget(self, notion_form_id: str):
+        """Drop a form's fingerprint so its next synchronization runs in full."""
+        with self._lock:
+            if self._load().pop(notion_form_id, None) is not None:
+                self._save()
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._fingerprints, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.error(f"❌ Could not save form fingerprints to {self.path}: {e}")
+
+# Shared instance so that concurrent form synchronizations write one file
+form_fingerprints = FormFingerprints()
@@ -1,32 +1,104 @@
 import logging
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
 from config.config import config
+from connections.http_transport import get_session
+from connections.respondent_store import respondent_store, RespondentStore
 
 logger = logging.getLogger(__name__)
 
 class GoogleFormsAppScriptClient:
-    def __init__(self):
+    def __init__(self, store: Optional[RespondentStore] = None):
         """Initialize Google Forms client using App Script endpoint."""
         self.app_script_url = config.google_app_script_url  # Actually the App Script URL
+        self.session = get_session(self.app_script_url)
+        self.store = store or respondent_store
         logger.info("🔗 Google Forms App Script client initialized")
     
-    def get_form_responses(self, form_id: str) -> List[Dict]:
+    def get_form_responses(self, form_id: str, full_refresh: bool = False) -> List[Dict]:
         """
         Get all responses from a Google Form via App Script.
         
+        Respondents are kept in a local store per form. When the App Script
+        returns a cursor, later calls only ask for responses submitted since
+        that cursor and merge them into the store. A full fetch is made the
+        first time, every APP_SCRIPT_FULL_REFRESH_INTERVAL seconds (to forget
+        deleted responses) or when `full_refresh` is set.
+        
         Args:
             form_id: Google Form ID
+            full_refresh: Ignore the stored cursor and fetch every response
+            
+        Returns:
+            List of response dictionaries with email and names (empty if the call failed)
+        """
+        return self._load_form_responses(form_id, full_refresh) or []
+    
+    def _load_form_responses(self, form_id: str, full_refresh: bool = False) -> Optional[List[Dict]]:
+        """Same as get_form_responses, but returns None when the App Script call failed."""
+        form = self.store.form(form_id)
+        with form.lock:
+            since = None if full_refresh or self.store.full_refresh_due(form) else form.cursor
+            # The validator only applies to the exact request it was returned for
+            etag = form.etag if form.etag_since == since else None
+            delta = self._fetch_responses(form_id, since, etag)
+            if delta is None:
+                return None
             
+            if delta["not_modified"]:
+                logger.info(f"♻️  App Script answer for form {form_id} not modified, using stored respondents")
+                if since is None:
+                    form.last_full_refresh = time.time()
+            else:
+                if delta["full"]:
+                    form.replace(delta["people"])
+                    form.last_full_refresh = time.time()
+                else:
+                    added = form.merge(delta["people"])
+                    logger.info(f"🧩 Merged {len(delta['people'])} new or edited responses ({added} new emails) "
+                                f"for form {form_id}")
+                # Scripts that do not return a cursor are always fetched in full
+                form.cursor = delta["cursor"]
+                form.etag, form.etag_since = delta["etag"], since
+            self.store.save(form)
+            
+            response_list = [{
+                'email': email,
+                'firstName': person.get('firstName', ''),
+                'lastName': person.get('lastName', ''),
+                'timestamp': person.get('timestamp'),
+                'response_id': f"{form_id}_{email}"  # Create synthetic ID
+            } for email, person in form.respondents.items()]
+        
+        logger.info(f"✅ Processed {len(response_list)} valid responses")
+        return response_list
+    
+    def _fetch_responses(self, form_id: str, since: Optional[str] = None, etag: Optional[str] = None) -> Optional[Dict]:
+        """
+        Call the App Script for all responses of a form, or only those submitted since a cursor.
+        
+        Args:
+            form_id: Google Form ID
+            since: Cursor returned by the previous call
+            etag: Validator of the previous identical request, sent as If-None-Match
+        
         Returns:
-            List of response dictionaries with email and names
+            {"people": [...], "cursor": next cursor or None, "full": whether the list is complete,
+            "etag": validator or None, "not_modified": True on a 304 answer}, or None if the call failed
         """
         try:
-            # Call your App Script with the form ID
-            url = f"{self.app_script_url}?formId={form_id}"
+            # Call your App Script with the form ID (and the cursor of the previous call)
+            params = {"formId": form_id}
+            if since:
+                params["since"] = since
+            headers = {"If-None-Match": etag} if etag else None
             
-            logger.info(f"📞 Calling App Script for form {form_id}")
-            response = requests.get(url, timeout=30)
+            logger.info(f"📞 Calling App Script for form {form_id}" + (f" (since {since})" if since else ""))
+            response = self.session.get(self.app_script_url, params=params, headers=headers, timeout=30)
+            if response.status_code == 304:
+                return {"people": [], "cursor": None, "full": False, "etag": etag, "not_modified": True}
             response.raise_for_status()
             
             data = response.json()
@@ -34,7 +106,7 @@ class GoogleFormsAppScriptClient:
             # Check for errors in App Script response
             if 'error' in data:
                 logger.error(f"❌ App Script error: {data['error']}")
-                return []
+                return None
             
             # Extract emails and people data
             emails = data.get('emails', [])
@@ -43,56 +115,62 @@ class GoogleFormsAppScriptClient:
             logger.info(f"📊 Retrieved {len(emails)} unique emails from form {form_id}")
             logger.info(f"👥 Retrieved {len(people)} people with details")
             
-            # Return in expected format for compatibility with existing code
-            response_list = []
+            respondents = []
             for person in people:
                 if person.get('email'):
-                    response_data = {
+                    respondents.append({
                         'email': person['email'].lower().strip(),
                         'firstName': person.get('firstName', ''),
                         'lastName': person.get('lastName', ''),
-                        'timestamp': None,  # App Script doesn't return timestamp in current version
-                        'response_id': f"{form_id}_{person['email']}"  # Create synthetic ID
-                    }
-                    response_list.append(response_data)
+                        'timestamp': person.get('timestamp')
+                    })
             
             # If no detailed people data, fall back to just emails
-            if not response_list and emails:
-                for email in emails:
-                    response_list.append({
-                        'email': email.lower().strip(),
-                        'firstName': '',
-                        'lastName': '',
-                        'timestamp': None,
-                        'response_id': f"{form_id}_{email}"
-                    })
+            if not respondents and emails:
+                respondents = [{'email': email.lower().strip(), 'firstName': '', 'lastName': '', 'timestamp': None}
+                               for email in emails]
             
-            logger.info(f"✅ Processed {len(response_list)} valid responses")
-            return response_list
+            # Older scripts ignore `since` and send neither `full` nor `cursor`: their list is complete
+            # Deployed Apps Script web apps cannot set headers, so there is usually no ETag
+            return {
+                "people": respondents,
+                "cursor": data.get('cursor'),
+                "full": since is None or data.get('full', True),
+                "etag": response.headers.get('ETag'),
+                "not_modified": False
+            }
             
         except requests.exceptions.RequestException as e:
             logger.error(f"❌ Failed to call App Script for form {form_id}: {e}")
-            return []
+            return None
         except Exception as e:
             logger.error(f"❌ Unexpected error getting responses for form {form_id}: {e}")
-            return []
+            return None
     
-    def get_multiple_forms_responses(self, form_ids: List[str]) -> Dict[str, List[Dict]]:
+    def get_multiple_forms_responses(self, form_ids: List[str], max_workers: Optional[int] = None) -> Dict[str, List[Dict]]:
         """
-        Get responses from multiple Google Forms via App Script.
+        Get responses from multiple Google Forms via App Script, fetching forms concurrently.
         
         Args:
             form_ids: List of Google Form IDs
+            max_workers: Number of concurrent App Script calls (defaults to SYNC_MAX_WORKERS)
             
         Returns:
-            Dictionary mapping form_id to list of responses
+            Dictionary mapping form_id to list of responses; forms whose App Script
+            call failed are left out, so that callers do not mistake them for empty forms
         """
-        all_responses = {}
+        unique_form_ids = list(dict.fromkeys(form_ids))
+        logger.info(f"📋 Getting responses for {len(unique_form_ids)} forms via App Script")
+        
+        with ThreadPoolExecutor(max_workers=max_workers or config.sync_max_workers,
+                                thread_name_prefix="appscript") as executor:
+            # _load_form_responses never raises, so each form fails independently
+            results = dict(zip(unique_form_ids, executor.map(self._load_form_responses, unique_form_ids)))
         
-        for form_id in form_ids:
-            logger.info(f"📋 Getting responses for form {form_id} via App Script")
-            responses = self.get_form_responses(form_id)
-            all_responses[form_id] = responses
+        all_responses = {form_id: responses for form_id, responses in results.items() if responses is not None}
+        failed = len(results) - len(all_responses)
+        if failed:
+            logger.warning(f"⚠️  App Script call failed for {failed} form(s), left out of the results")
         
         total_responses = sum(len(responses) for responses in all_responses.values())
         logger.info(f"🎯 Total responses retrieved via App Script: {total_responses}")
@@ -117,7 +195,7 @@ class GoogleFormsAppScriptClient:
                 return True
             else:
                 # Test basic connection (will return error about missing formId but confirms script works)
-                response = requests.get(self.app_script_url, timeout=10)
+                response = self.session.get(self.app_script_url, timeout=10)
                 response.raise_for_status()
                 data = response.json()
                 
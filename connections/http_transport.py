@@ -0,0 +1,94 @@
+import logging
+import threading
+from typing import Dict
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from config.config import config
+from connections.rate_limiter import TokenBucket, get_bucket, parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+# Graph API reports rate limiting as error codes inside 4xx bodies rather than 429
+GRAPH_THROTTLE_CODES = {4, 17, 32, 613}
+
+class RateLimitedSession(requests.Session):
+    """
+    Session that takes a token from the host's shared bucket before each call.
+
+    Throttled responses (429, or Graph rate-limit error codes) are retried up to
+    `max_retries` times after honouring Retry-After; the last response is
+    returned as-is so callers keep their usual raise_for_status handling.
+    """
+
+    def __init__(self, bucket: TokenBucket, max_retries: int):
+        super().__init__()
+        self.bucket = bucket
+        self.max_retries = max_retries
+
+    def request(self, method, url, *args, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            response = super().request(method, url, *args, **kwargs)
+            
+            if not self._is_throttled(response):
+                self.bucket.on_success()
+                return response
+            
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            self.bucket.on_throttled(retry_after if retry_after is not None else 2 ** attempt)
+            if attempt < self.max_retries:
+                logger.info(f"⏳ {method} {urlsplit(url).path} throttled, retry {attempt + 1}/{self.max_retries}")
+                response.close()
+        
+        logger.error(f"❌ {method} {urlsplit(url).path} still throttled after {self.max_retries} retries")
+        return response
+
+    @staticmethod
+    def _is_throttled(response: requests.Response) -> bool:
+        if response.status_code == 429:
+            return True
+        if response.status_code in (400, 403) and response.url.startswith(config.graph_api_base_url):
+            try:
+                code = response.json().get("error", {}).get("code")
+            except ValueError:
+                return False
+            return code in GRAPH_THROTTLE_CODES
+        return False
+
+# One pooled keep-alive session per host, shared by every client in the process
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+def _host_key(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+def get_session(url: str) -> requests.Session:
+    """
+    Get the shared pooled session for the host of `url`.
+
+    Sessions keep TCP/TLS connections alive between calls, so repeated requests
+    to Notion, the Graph API or App Script skip the connection handshake. Each
+    session is also rate limited by the host's shared token bucket.
+    """
+    key = _host_key(url)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = RateLimitedSession(get_bucket(urlsplit(url).netloc), config.http_max_retries)
+            adapter = HTTPAdapter(
+                pool_connections=config.http_pool_connections,
+                pool_maxsize=config.http_pool_maxsize
+            )
+            session.mount(f"{urlsplit(url).scheme}://", adapter)
+            _sessions[key] = session
+            logger.debug(f"🔌 Created pooled session for {key} (pool size {config.http_pool_maxsize})")
+        return session
+
+def close_all_sessions():
+    """Close every pooled session (connections are reopened on next use)."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
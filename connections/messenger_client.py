@@ -1,30 +1,153 @@
+import json
 import requests
 import logging
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode
 from config.config import config
+from connections.http_transport import get_session, GRAPH_THROTTLE_CODES
 
 logger = logging.getLogger(__name__)
 
 class MessengerClient:
+    # Graph API accepts at most 50 operations per batch request
+    MAX_BATCH_SIZE = 50
+
     def __init__(self):
-        self.base_url = "https://graph.facebook.com/v17.0/me/messages"
+        self.graph_url = config.graph_api_base_url
+        self.base_url = f"{self.graph_url}/me/messages"
         self.access_token = config.page_token
-    
+        self.session = get_session(self.base_url)
+
     def send_message(self, recipient_id: str, message: str) -> bool:
         """Send a message via Facebook Messenger."""
         url = f"{self.base_url}?access_token={self.access_token}"
-        
+
         message_data = {
             "recipient": {"id": recipient_id},
             "message": {"text": message}
         }
-        
+
         try:
-            response = requests.post(url, json=message_data)
+            response = self.session.post(url, json=message_data)
             response.raise_for_status()
             logger.info(f"Message sent successfully to {recipient_id}")
             return True
-        
+
         except requests.exceptions.RequestException as e:
             logger.error(f"Failed to send message to {recipient_id}: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    def send_many(self, messages: List[Tuple[str, str]], max_retries: Optional[int] = None) -> List[Optional[bool]]:
+        """
+        Send several messages using Graph batch requests (up to 50 sends per HTTP call).
+
+        Each item's outcome is parsed separately. Only items that Graph explicitly
+        refused with a rate limit or server error are resent, after a backoff that
+        also slows down the host's token bucket. An item whose outcome is unknown
+        (transport failure, null item, truncated response) may have been delivered,
+        so it is reported as None and never resent.
+
+        Args:
+            messages: List of (recipient_id, message) tuples
+            max_retries: Number of extra attempts for throttled items (defaults to config)
+
+        Returns:
+            One entry per message, in the same order: True if delivered, False if
+            not delivered, None if it may have been delivered
+        """
+        max_retries = config.messenger_batch_retries if max_retries is None else max_retries
+        batch_size = max(1, min(config.messenger_batch_size, self.MAX_BATCH_SIZE))
+        results: List[Optional[bool]] = [False] * len(messages)
+        pending = list(range(len(messages)))
+
+        for attempt in range(max_retries + 1):
+            retry = []
+            for start in range(0, len(pending), batch_size):
+                chunk = pending[start:start + batch_size]
+                retry.extend(self._send_batch(chunk, messages, results))
+
+            if not retry:
+                break
+            if attempt == max_retries:
+                self.session.bucket.on_throttled()
+                break
+            # Back off before resending, and let the other senders of this host slow down too
+            delay = 2 ** attempt
+            self.session.bucket.on_throttled(delay)
+            logger.info(f"🔁 Retrying {len(retry)} throttled Messenger send(s) in {delay}s (attempt {attempt + 2})")
+            pending = retry
+
+        sent = sum(1 for result in results if result)
+        unknown = sum(1 for result in results if result is None)
+        logger.info(f"📨 Batch send: {sent}/{len(messages)} messages delivered"
+                    + (f", {unknown} with unknown outcome (not resent)" if unknown else ""))
+        return results
+
+    def _send_batch(self, positions: List[int], messages: List[Tuple[str, str]],
+                    results: List[Optional[bool]]) -> List[int]:
+        """Send one Graph batch request. Fills `results` and returns the throttled positions to resend."""
+        operations = []
+        for position in positions:
+            recipient_id, message = messages[position]
+            operations.append({
+                "method": "POST",
+                "relative_url": "me/messages",
+                "body": urlencode({
+                    "recipient": json.dumps({"id": recipient_id}),
+                    "message": json.dumps({"text": message})
+                })
+            })
+
+        try:
+            response = self.session.post(self.graph_url, data={
+                "access_token": self.access_token,
+                "include_headers": "false",
+                "batch": json.dumps(operations)
+            })
+            response.raise_for_status()
+            items = response.json()
+        except requests.exceptions.HTTPError as e:
+            # A 4xx rejects the whole batch before any send; after a 5xx some sends may have gone out
+            rejected = e.response is not None and e.response.status_code < 500
+            logger.error(f"Failed to send Messenger batch of {len(positions)}: {e}")
+            for position in positions:
+                results[position] = False if rejected else None
+            return []
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.error(f"Failed to send Messenger batch of {len(positions)}, outcome unknown: {e}")
+            for position in positions:
+                results[position] = None
+            return []
+
+        retry = []
+        for position, item in zip(positions, items):
+            recipient_id = messages[position][0]
+            if item is None:
+                # Graph returns null for operations that did not complete in time
+                logger.error(f"Unknown outcome of message to {recipient_id}, not resending")
+                results[position] = None
+                continue
+
+            code = item.get("code")
+            if code == 200:
+                results[position] = True
+                logger.info(f"Message sent successfully to {recipient_id}")
+                continue
+
+            error = self._parse_item_error(item)
+            logger.error(f"Failed to send message to {recipient_id}: HTTP {code} {error.get('message', '')}")
+            if code == 429 or (code is not None and code >= 500) or error.get("code") in GRAPH_THROTTLE_CODES:
+                retry.append(position)
+
+        # A truncated response leaves the remaining operations unknown
+        for position in positions[len(items):]:
+            logger.error(f"Unknown outcome of message to {messages[position][0]}, not resending")
+            results[position] = None
+        return retry
+
+    @staticmethod
+    def _parse_item_error(item: Dict) -> Dict:
+        try:
+            return json.loads(item.get("body") or "{}").get("error", {})
+        except ValueError:
+            return {}
@@ -1,7 +1,17 @@
 import requests
 import logging
-from typing import List, Dict, Optional, Any
+import time
+from typing import List, Dict, Optional, Any, Iterator
 from config.config import config
+from connections.notion_indexes import ResponsesIndex, PeopleDirectory, FormsRegistry
+from connections.notion_query import NotionQuery
+from connections.notion_records import (
+    RecordExtractor, ResponseRecord, PersonRecord, parse_notion_time,
+    build_form_extractor, build_response_extractor, build_person_extractor
+)
+from connections.notion_sync_state import notion_sync_state
+from connections.person_cache import person_cache
+from connections.http_transport import get_session
 
 logger = logging.getLogger(__name__)
 
@@ -11,6 +21,7 @@ class NotionColumns:
     # Forms database columns
     FORM_NAME = "Nom du formulaire"
     GOOGLE_FORM_ID = "Form ID"  # New field for Google Forms integration
+    REMINDER_CADENCE = "Cadence relance"  # Optional number of days between reminders
     
     # Responses database columns  
     FORMS_RELATION = "Forms"
@@ -30,28 +41,164 @@ class NotionColumns:
         return property_name in page.get("properties", {})
 
 class NotionClient:
+    # Notion never returns more than 100 pages per query
+    MAX_PAGE_SIZE = 100
+    
     def __init__(self):
-        self.base_url = "https://api.notion.com/v1"
+        self.base_url = config.notion_base_url
         self.headers = {
             "Authorization": f"Bearer {config.notion_token}",
             "Notion-Version": "2022-06-28",
             "Content-Type": "application/json"
         }
         self.columns = NotionColumns()
+        # Raw pages are parsed once into compact records by these extractors
+        self.extract_form = build_form_extractor(type(self.columns))
+        self.extract_response = build_response_extractor(type(self.columns))
+        self.extract_person = build_person_extractor(type(self.columns))
+        self.person_cache = person_cache
+        self.sync_state = notion_sync_state
+        self.session = get_session(self.base_url)
+        # {database_id: {property name: property ID}}, read once per database
+        self._property_ids: Dict[str, Dict[str, str]] = {}
     
-    def get_database_entries(self, database_id: str) -> List[Dict]:
-        """Fetch all entries from a Notion database."""
+    def iter_database_entries(self, database_id: str, page_size: Optional[int] = None,
+                              filter: Optional[Dict] = None, sorts: Optional[List[Dict]] = None,
+                              filter_properties: Optional[List[str]] = None) -> Iterator[Dict]:
+        """
+        Stream all entries from a Notion database, following pagination cursors.
+        
+        Pages are yielded as each batch arrives, so at most `page_size` pages
+        are held in memory at a time. A failed request raises
+        requests.exceptions.RequestException instead of ending the stream
+        early, so callers never mistake a partial read for the whole database.
+        
+        Args:
+            database_id: Notion database ID
+            page_size: Number of pages requested per call (1-100, defaults to config)
+            filter: Optional Notion filter object evaluated server-side
+            sorts: Optional list of Notion sort objects
+            filter_properties: Optional property IDs; pages then only carry these properties
+            
+        Yields:
+            Raw Notion page dictionaries
+        """
         url = f"{self.base_url}/databases/{database_id}/query"
+        page_size = max(1, min(page_size or config.notion_page_size, self.MAX_PAGE_SIZE))
+        payload: Dict[str, Any] = {"page_size": page_size}
+        if filter:
+            payload["filter"] = filter
+        if sorts:
+            payload["sorts"] = sorts
+        params = [("filter_properties", property_id) for property_id in filter_properties or ()]
+        batches = 0
         
-        try:
-            response = requests.post(url, headers=self.headers)
-            response.raise_for_status()
-            data = response.json()
-            return data.get("results", [])
+        while True:
+            try:
+                response = self.session.post(url, headers=self.headers, json=payload, params=params or None)
+                response.raise_for_status()
+                data = response.json()
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Failed to fetch database entries (batch {batches + 1}): {e}")
+                raise
+            
+            batches += 1
+            yield from data.get("results", [])
+            
+            next_cursor = data.get("next_cursor")
+            if not data.get("has_more") or not next_cursor:
+                logger.debug(f"Fetched {batches} batch(es) from database {database_id}")
+                return
+            payload["start_cursor"] = next_cursor
+    
+    def get_database_entries(self, database_id: str, page_size: Optional[int] = None,
+                             filter: Optional[Dict] = None, sorts: Optional[List[Dict]] = None) -> List[Dict]:
+        """
+        Fetch all entries from a Notion database (raises if any batch fails).
         
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to fetch database entries: {e}")
-            return []
+        Args:
+            database_id: Notion database ID
+            page_size: Number of pages requested per call (1-100, defaults to config)
+            filter: Optional Notion filter object evaluated server-side
+            sorts: Optional list of Notion sort objects
+            
+        Returns:
+            List of raw Notion page dictionaries
+        """
+        return list(self.iter_database_entries(database_id, page_size=page_size, filter=filter, sorts=sorts))
+    
+    def load_database_records(self, database_id: str, extract: RecordExtractor, full_scan: bool = False) -> List[Any]:
+        """
+        Get every row of a database as records, reading only what changed since the last call.
+        
+        Rows are kept in the persisted sync state together with the highest
+        `last_edited_time` seen (the watermark). Later calls only query rows
+        edited on or after the watermark, oldest first, and merge them in.
+        Rows deleted or archived in Notion are only dropped by a full scan,
+        which runs on the first call, when requested, or every
+        NOTION_FULL_SCAN_INTERVAL seconds.
+        
+        When Notion cannot be read, the rows stored by earlier runs are returned
+        and the database is flagged stale (see `is_stale`); if no full scan ever
+        completed there is nothing to fall back to and the error is raised.
+        
+        Args:
+            database_id: Notion database ID
+            extract: Record extractor for this database
+            full_scan: Re-read the whole database even if the state is fresh
+            
+        Returns:
+            List of records (the previous state if Notion could not be read)
+        """
+        state = self.sync_state.database(database_id, extract)
+        with state.lock:
+            full_scan = full_scan or self.sync_state.full_scan_due(state)
+            try:
+                if full_scan:
+                    scan_started = time.time()
+                    # Rows edited while the unsorted scan runs may be read before their edit: keep
+                    # the watermark at the scan start so the next incremental query re-reads them
+                    scan_started_minute = time.strftime("%Y-%m-%dT%H:%M:00.000Z", time.gmtime(scan_started))
+                    rows = {}
+                    for page in self.iter_database_entries(database_id):
+                        record = extract(page)
+                        rows[record.id] = record
+                    state.clear()
+                    for record in rows.values():
+                        state.merge(record)
+                    if state.watermark is not None:
+                        state.watermark = min(state.watermark, scan_started_minute)
+                    state.last_full_scan = scan_started
+                    logger.info(f"🗂️  Full scan of database {database_id}: {len(rows)} rows")
+                else:
+                    # Notion rounds last_edited_time to the minute, hence on_or_after
+                    since = state.watermark
+                    edited_filter = {
+                        "timestamp": "last_edited_time",
+                        "last_edited_time": {"on_or_after": since}
+                    }
+                    ascending = [{"timestamp": "last_edited_time", "direction": "ascending"}]
+                    changed = 0
+                    for page in self.iter_database_entries(database_id, filter=edited_filter, sorts=ascending):
+                        # Oldest first, so the watermark stays valid if a later batch fails
+                        state.merge(extract(page))
+                        changed += 1
+                    logger.info(f"🗂️  Incremental scan of database {database_id}: {changed} changed row(s) "
+                                f"since {since}, {len(state.rows)} rows in total")
+                state.stale = False
+            except requests.exceptions.RequestException as e:
+                if state.last_full_scan is None:
+                    logger.error(f"❌ Could not read database {database_id} and no rows are stored: {e}")
+                    raise
+                logger.error(f"❌ Could not refresh database {database_id}, using stored rows: {e}")
+                state.stale = True
+            
+            self.sync_state.save()
+            return list(state.rows.values())
+    
+    def is_stale(self, database_id: str) -> bool:
+        """Whether the last load_database_records of a database fell back to stored rows."""
+        return self.sync_state.is_stale(database_id)
     
     def get_property_content(self, page: Dict, property_name: str) -> str:
         """Extract content from a Notion page property."""
@@ -128,82 +275,267 @@ class NotionClient:
         """Get all forms from the forms database."""
         return self.get_database_entries(config.notion_forms_db_id)
     
-    def get_responses_for_form(self, form_id: str) -> List[Dict]:
-        """Get all responses that are related to a specific form."""
-        all_responses = self.get_database_entries(config.notion_responses_db_id)
+    def get_property_ids(self, database_id: str) -> Optional[Dict[str, str]]:
+        """
+        Map property names to property IDs (None if the schema could not be read).
         
-        form_responses = []
-        for response in all_responses:
-            # Get the form IDs this response is related to
-            related_form_ids = self.get_relation_ids(response, self.columns.FORMS_RELATION)
-            
-            # Check if our form_id is in the relations
-            if form_id in related_form_ids:
-                form_responses.append(response)
+        A schema is read once per database; failures are not cached, so the next query retries.
+        """
+        property_ids = self._property_ids.get(database_id)
+        if property_ids is not None:
+            return property_ids
+        
+        url = f"{self.base_url}/databases/{database_id}"
+        try:
+            response = self.session.get(url, headers=self.headers)
+            response.raise_for_status()
+            properties = response.json().get("properties", {})
+            property_ids = {name: prop["id"] for name, prop in properties.items()}
+        except (requests.exceptions.RequestException, KeyError, ValueError) as e:
+            logger.warning(f"Could not read the schema of database {database_id}, "
+                           f"returning every property: {e}")
+            return None
+        self._property_ids[database_id] = property_ids
+        return property_ids
+    
+    def iter_query(self, query: NotionQuery) -> Iterator[Dict]:
+        """
+        Run a NotionQuery, following pagination cursors.
+        
+        Selected property names are sent as `filter_properties` IDs; when the
+        database schema cannot be read (or a name is unknown) every property is returned.
+        """
+        filter_properties = None
+        if query.properties:
+            property_ids = self.get_property_ids(query.database_id) or {}
+            missing = [name for name in query.properties if name not in property_ids]
+            if missing:
+                logger.debug(f"Properties {missing} not found in database {query.database_id}, returning all")
+            else:
+                filter_properties = [property_ids[name] for name in query.properties]
+        
+        return self.iter_database_entries(query.database_id, filter=query.filter, sorts=query.sorts or None,
+                                          filter_properties=filter_properties)
+    
+    def get_responses_for_form(self, form_id: str, has_responded: Optional[bool] = None) -> List[ResponseRecord]:
+        """
+        Get all responses that are related to a specific form.
+        
+        The relation (and optional checkbox) filter is evaluated by Notion, so
+        only the rows of this form are transferred.
+        
+        Args:
+            form_id: Notion form page ID
+            has_responded: Optionally restrict to rows where 'A répondu' equals this value
+        """
+        query = NotionQuery(config.notion_responses_db_id).relation_contains(self.columns.FORMS_RELATION, form_id)
+        if has_responded is not None:
+            query.checkbox(self.columns.HAS_RESPONDED, has_responded)
+        query.select(*self.extract_response.property_names)
+        
+        form_responses = [self.extract_response(page) for page in self.iter_query(query)]
         
         logger.info(f"Found {len(form_responses)} responses for form {form_id}")
         return form_responses
     
+    def non_responders_query(self, form_id: str, reminded_before: Optional[str] = None) -> NotionQuery:
+        """
+        Query for the response rows of a form that need a reminder.
+        
+        'A répondu' is unchecked, 'Forms' contains the form, 'Dernier rappel' is
+        empty or before `reminded_before` (when given) and, when NOTION_PSID_ROLLUP
+        names a rollup of the person's PSID, the person can be messaged. Rows are
+        sorted least recently reminded first and only the response columns are returned.
+        
+        Args:
+            form_id: Notion form page ID
+            reminded_before: Optional ISO 8601 cutoff for the last reminder
+        """
+        query = (NotionQuery(config.notion_responses_db_id)
+                 .checkbox(self.columns.HAS_RESPONDED, False)
+                 .relation_contains(self.columns.FORMS_RELATION, form_id))
+        if reminded_before:
+            query.date_before(self.columns.DERNIER_RAPPEL, reminded_before, or_empty=True)
+        if config.notion_psid_rollup:
+            query.rollup_not_empty(config.notion_psid_rollup)
+        return (query
+                .sort_by(self.columns.DERNIER_RAPPEL)
+                .select(*self.extract_response.property_names))
 
 
-    def get_non_responders_for_form(self, form_id: str) -> List[Dict]:
-        """Get list of people who haven't responded to a specific form."""
-        responses = self.get_responses_for_form(form_id)
+    def build_responses_index(self, full_scan: bool = False) -> ResponsesIndex:
+        """Load the responses database (incrementally) and index rows by form and by person."""
+        return ResponsesIndex.build(self, full_scan=full_scan)
+    
+    def build_people_directory(self, full_scan: bool = False) -> PeopleDirectory:
+        """Load the People database (incrementally) and index persons by ID, email and PSID."""
+        return PeopleDirectory.build(self, full_scan=full_scan)
+    
+    def resolve_person(self, person_id: str, people: Optional[PeopleDirectory] = None) -> Optional[PersonRecord]:
+        """Resolve a person from a directory when available, otherwise fetch it."""
+        if people is not None:
+            person = people.get(person_id)
+            if person is not None:
+                return person
+            logger.debug(f"Person {person_id} not in directory, fetching page")
+        return self.get_person_by_id(person_id)
+    
+    def get_non_responders_for_form(self, form_id: str, responses_index: Optional[ResponsesIndex] = None,
+                                    people: Optional[PeopleDirectory] = None,
+                                    reminded_before: Optional[str] = None) -> List[Dict]:
+        """
+        Get list of people who haven't responded to a specific form.
+        
+        Args:
+            form_id: Notion form page ID
+            responses_index: Optional prebuilt index to read rows from instead of querying Notion
+            people: Optional People directory used to resolve persons without per-row fetches
+            reminded_before: Optional ISO 8601 cutoff; rows reminded on or after it are skipped
+        """
+        if responses_index is not None:
+            cutoff = parse_notion_time(reminded_before)
+            responses = [r for r in responses_index.responses_for_form(form_id) if not r.has_responded and (
+                cutoff is None or not r.dernier_rappel or (parse_notion_time(r.dernier_rappel) or 0) < cutoff)]
+        else:
+            # Only the rows that need a reminder are returned by Notion
+            responses = [self.extract_response(page)
+                         for page in self.iter_query(self.non_responders_query(form_id, reminded_before))]
         
         non_responders = []
         for response in responses:
-            # Check if "A répondu" checkbox is unchecked
-            has_responded = self.get_checkbox_value(response, self.columns.HAS_RESPONDED)
+            # Get the person related to this response (one person per response)
+            person_id = response.person_id
             
-            if not has_responded:
-                # Get the person related to this response
-                person_ids = self.get_relation_ids(response, self.columns.PERSON_RELATION)
-                
-                if person_ids:
-                    # Get the actual person data
-                    person_id = person_ids[0]  # Assuming one person per response
-                    response_id = response["id"]
-                    person = self.get_person_by_id(person_id)
-                    name_person = self.get_property_content(person, self.columns.PERSON_NAME) if person else ""
-                    if person:
-                        non_responders.append({'non_responder': person, 'ID_reponse': response_id, 'Name_person': name_person})
+            if person_id:
+                person = self.resolve_person(person_id, people)
+                if person:
+                    non_responders.append({'non_responder': person, 'ID_reponse': response.id, 'Name_person': person.name})
                 
         logger.info(f"Found {len(non_responders)} non-responders for form {form_id}")
         return non_responders
     
-    def get_person_by_id(self, person_id: str) -> Optional[Dict]:
-        """Get a person's data by their Notion page ID."""
-        url = f"{self.base_url}/pages/{person_id}"
+    def get_page(self, page_id: str) -> Optional[Dict]:
+        """Fetch a single Notion page by ID."""
+        url = f"{self.base_url}/pages/{page_id}"
         
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self.session.get(url, headers=self.headers)
             response.raise_for_status()
             return response.json()
         
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Failed to fetch page {page_id}: {e}")
+            return None
+    
+    def get_person_by_id(self, person_id: str, use_cache: bool = True) -> Optional[PersonRecord]:
+        """
+        Get a person's data by their Notion page ID.
+        
+        Persons are served from the shared person cache when possible; cached
+        entries are revalidated against Notion's last_edited_time first.
+        """
+        if use_cache:
+            self.revalidate_person_cache()
+            cached = self.person_cache.get(person_id)
+            if cached is not None:
+                return cached
+        
+        url = f"{self.base_url}/pages/{person_id}"
+        
+        try:
+            response = self.session.get(url, headers=self.headers)
+            response.raise_for_status()
+            person = self.extract_person(response.json())
+        
         except requests.exceptions.RequestException as e:
             logger.error(f"Failed to fetch person {person_id}: {e}")
             return None
+        
+        if use_cache:
+            self.person_cache.put(person)
+        return person
     
-    def get_all_non_responders(self) -> Dict[str, List[Dict]]:
-        """Get non-responders for ALL forms. Returns dict: {form_name: [non_responders]}"""
-        all_forms = self.get_all_forms()
+    def revalidate_person_cache(self, force: bool = False):
+        """
+        Refresh cached person pages that were edited in Notion since the last check.
+        
+        Args:
+            force: Check now rather than once per PERSON_CACHE_REVALIDATE seconds (start of a run)
+        """
+        since = self.person_cache.revalidation_due(force)
+        if since is None:
+            return
+        
+        edited_filter = {
+            "timestamp": "last_edited_time",
+            "last_edited_time": {"on_or_after": since}
+        }
+        try:
+            edited = list(self.iter_database_entries(config.notion_people_db_id, filter=edited_filter))
+        except requests.exceptions.RequestException as e:
+            # Without revalidation we cannot guarantee freshness, so start over
+            logger.warning(f"Could not revalidate person cache, clearing it: {e}")
+            self.person_cache.clear()
+            return
+        
+        self.person_cache.apply_revalidation(self.extract_person(page) for page in edited)
+    
+    def load_forms_registry(self) -> FormsRegistry:
+        """Load the forms database once with lookups by ID, name and Google Form ID."""
+        return FormsRegistry.load(self)
+    
+    def get_all_non_responders(self, forms: Optional[FormsRegistry] = None,
+                               reminded_before: Optional[str] = None) -> Dict[str, List[Dict]]:
+        """
+        Get non-responders for ALL forms. Returns dict: {form_name: [non_responders]}
+        
+        Args:
+            forms: Optional forms registry already loaded by the caller
+            reminded_before: Optional ISO 8601 cutoff; rows reminded on or after it are skipped
+        """
+        forms = self.load_forms_registry() if forms is None else forms
+        responses_index = self.build_responses_index()
+        people = self.build_people_directory()
+        if responses_index.stale or people.stale:
+            # Older rows may list people who answered since: do not remind from them
+            raise RuntimeError("Notion could not be read, refusing to select non-responders from stale rows")
         results = {}
         
-        for form in all_forms:
-            form_id = form["id"]
-            form_name = self.get_property_content(form, self.columns.FORM_NAME)
+        for form in forms:
+            form_id = form.id
+            form_name = form.name
             
             if not form_name:
                 logger.warning(f"Form {form_id} has no name, skipping")
                 continue
             
-            non_responders = self.get_non_responders_for_form(form_id)
+            non_responders = self.get_non_responders_for_form(form_id, responses_index, people, reminded_before)
             results[form_name] = non_responders
             
             logger.info(f"Form '{form_name}': {len(non_responders)} non-responders")
         
         return results
     
+    @staticmethod
+    def utc_now_iso() -> str:
+        """Current time in the format Notion expects (ISO 8601 / RFC3339, e.g. 2025-09-01T12:47:15Z)."""
+        from datetime import datetime, timezone
+        return datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
+    
+    def update_page_properties(self, page_id: str, properties: Dict[str, Dict]) -> bool:
+        """Update several properties of a page with a single PATCH."""
+        url = f"{self.base_url}/pages/{page_id}"
+        
+        try:
+            response = self.session.patch(url, headers=self.headers, json={"properties": properties})
+            response.raise_for_status()
+            logger.info(f"✅ Updated {', '.join(properties)} for page {page_id}")
+            return True
+        
+        except requests.exceptions.RequestException as e:
+            logger.error(f"❌ Failed to update {', '.join(properties)} for page {page_id}: {e}")
+            return False
+    
     def update_response_status(self, response_id: str, has_responded: bool) -> bool:
         """Update the 'A répondu' checkbox for a response."""
         url = f"{self.base_url}/pages/{response_id}"
@@ -217,7 +549,7 @@ class NotionClient:
         }
         
         try:
-            response = requests.patch(url, headers=self.headers, json=data)
+            response = self.session.patch(url, headers=self.headers, json=data)
             response.raise_for_status()
             logger.info(f"✅ Updated response status for {response_id}")
             return True
@@ -230,9 +562,7 @@ class NotionClient:
         """Update the 'Dernier rappel' date for a response page."""
         url = f"{self.base_url}/pages/{response_id}"
 
-        from datetime import datetime, timezone
-        # Notion expects ISO 8601 / RFC3339 (e.g., 2025-09-01T12:47:15Z)
-        date_str = datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
+        date_str = self.utc_now_iso()
         data = {
             "properties": {
                 self.columns.DERNIER_RAPPEL: {
@@ -244,7 +574,7 @@ class NotionClient:
         }
         
         try:
-            response = requests.patch(url, headers=self.headers, json=data)
+            response = self.session.patch(url, headers=self.headers, json=data)
             response.raise_for_status()
             logger.info(f"✅ Updated 'Dernier Rappel' for response {response_id} to {date_str}")
             return True
@@ -0,0 +1,188 @@
+import logging
+from collections import defaultdict
+from typing import List, Dict, Optional, TYPE_CHECKING
+from config.config import config
+from connections.notion_records import FormRecord, ResponseRecord, PersonRecord, form_url
+
+if TYPE_CHECKING:
+    from connections.notion_connection import NotionClient
+
+logger = logging.getLogger(__name__)
+
+class ResponsesIndex:
+    """
+    In-memory index of the responses database.
+
+    Rows are grouped by related form page ID and by related person page ID so
+    that all-forms operations do not have to query the responses database once
+    per form.
+    """
+
+    def __init__(self, notion: "NotionClient"):
+        self.notion = notion
+        self.by_form: Dict[str, List[ResponseRecord]] = defaultdict(list)
+        self.by_person: Dict[str, List[ResponseRecord]] = defaultdict(list)
+        self.total_rows = 0
+        # Built from rows of an earlier run because Notion could not be read
+        self.stale = False
+
+    @classmethod
+    def build(cls, notion: "NotionClient", full_scan: bool = False) -> "ResponsesIndex":
+        """
+        Index every row of the responses database.
+        
+        Args:
+            notion: Notion client
+            full_scan: Re-read the whole database instead of only the rows edited since the last run
+        """
+        index = cls(notion)
+        for response in notion.load_database_records(config.notion_responses_db_id, notion.extract_response,
+                                                     full_scan=full_scan):
+            index.add(response)
+        index.stale = notion.is_stale(config.notion_responses_db_id)
+
+        logger.info(f"📇 Indexed {index.total_rows} responses across {len(index.by_form)} forms")
+        return index
+
+    def add(self, response: ResponseRecord):
+        """Index a single response row under each of its forms and persons."""
+        self.total_rows += 1
+        for form_id in response.form_ids:
+            self.by_form[form_id].append(response)
+        for person_id in response.person_ids:
+            self.by_person[person_id].append(response)
+
+    def responses_for_form(self, form_id: str) -> List[ResponseRecord]:
+        """Get all indexed responses related to a form page."""
+        return self.by_form.get(form_id, [])
+
+    def responses_for_person(self, person_id: str) -> List[ResponseRecord]:
+        """Get all indexed responses related to a person page."""
+        return self.by_person.get(person_id, [])
+
+class PeopleDirectory:
+    """
+    In-memory directory of the People database.
+
+    Persons can be resolved by Notion page ID, normalized email or PSID without
+    fetching their pages one by one.
+    """
+
+    def __init__(self, notion: "NotionClient"):
+        self.notion = notion
+        self.by_id: Dict[str, PersonRecord] = {}
+        self.by_email: Dict[str, PersonRecord] = {}
+        self.by_psid: Dict[str, PersonRecord] = {}
+        # Built from rows of an earlier run because Notion could not be read
+        self.stale = False
+
+    @classmethod
+    def build(cls, notion: "NotionClient", full_scan: bool = False) -> "PeopleDirectory":
+        """
+        Index every person of the People database.
+        
+        Args:
+            notion: Notion client
+            full_scan: Re-read the whole database instead of only the persons edited since the last run
+        """
+        directory = cls(notion)
+        for person in notion.load_database_records(config.notion_people_db_id, notion.extract_person,
+                                                   full_scan=full_scan):
+            directory.add(person)
+        directory.stale = notion.is_stale(config.notion_people_db_id)
+
+        logger.info(f"👥 Loaded {len(directory.by_id)} people ({len(directory.by_email)} with email, "
+                    f"{len(directory.by_psid)} with PSID)")
+        return directory
+
+    @staticmethod
+    def normalize_email(email: str) -> str:
+        """Normalize an email for comparisons (same rule as the App Script client)."""
+        return email.lower().strip()
+
+    def add(self, person: PersonRecord):
+        """Index a single person by ID, email and PSID."""
+        self.by_id[person.id] = person
+        if person.email:
+            self.by_email[self.normalize_email(person.email)] = person
+        if person.psid:
+            self.by_psid[person.psid] = person
+
+    def get(self, person_id: str) -> Optional[PersonRecord]:
+        """Get a person by Notion page ID."""
+        return self.by_id.get(person_id)
+
+    def find_by_email(self, email: str) -> Optional[PersonRecord]:
+        """Get a person by email (case and whitespace insensitive)."""
+        return self.by_email.get(self.normalize_email(email))
+
+    def find_by_psid(self, psid: str) -> Optional[PersonRecord]:
+        """Get a person by Messenger PSID."""
+        return self.by_psid.get(psid)
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+class FormsRegistry:
+    """
+    Forms database loaded once per run, with O(1) lookups.
+
+    Each form is a FormRecord (Notion page ID, name, Google Form ID, 'Date envoi'
+    and precomputed Google Form URL) and can be found by Notion ID,
+    'Nom du formulaire' or 'Form ID'.
+    """
+
+    def __init__(self, notion: "NotionClient"):
+        self.notion = notion
+        self.forms: List[FormRecord] = []
+        self.by_id: Dict[str, FormRecord] = {}
+        self.by_name: Dict[str, FormRecord] = {}
+        self.by_google_id: Dict[str, FormRecord] = {}
+
+    @classmethod
+    def load(cls, notion: "NotionClient") -> "FormsRegistry":
+        """Load every form with one paginated query of the forms database."""
+        registry = cls(notion)
+        for page in notion.iter_database_entries(config.notion_forms_db_id):
+            registry.add(notion.extract_form(page))
+
+        logger.info(f"📋 Loaded {len(registry.forms)} forms")
+        return registry
+
+    @classmethod
+    def for_form(cls, notion: "NotionClient", form_id: str) -> "FormsRegistry":
+        """Build a registry holding a single form, fetched directly by page ID."""
+        registry = cls(notion)
+        page = notion.get_page(form_id)
+        if page:
+            registry.add(notion.extract_form(page))
+        return registry
+
+    form_url = staticmethod(form_url)
+
+    def add(self, form: FormRecord):
+        """Register a form."""
+        self.forms.append(form)
+        self.by_id[form.id] = form
+        if form.name:
+            self.by_name[form.name] = form
+        if form.google_form_id:
+            self.by_google_id[form.google_form_id] = form
+
+    def get(self, form_id: str) -> Optional[FormRecord]:
+        """Get a form by Notion page ID."""
+        return self.by_id.get(form_id)
+
+    def find_by_name(self, name: str) -> Optional[FormRecord]:
+        """Get a form by 'Nom du formulaire'."""
+        return self.by_name.get(name)
+
+    def find_by_google_id(self, google_form_id: str) -> Optional[FormRecord]:
+        """Get a form by its Google 'Form ID'."""
+        return self.by_google_id.get(google_form_id)
+
+    def __iter__(self):
+        return iter(self.forms)
+
+    def __len__(self) -> int:
+        return len(self.forms)
@@ -0,0 +1,87 @@
+from typing import Any, Dict, List, Optional
+
+class NotionQuery:
+    """
+    Builder for a Notion database query: compound filter, sorts and the
+    properties to return (`filter_properties`).
+
+    Conditions added with the helpers are combined with "and"; use `any_of`
+    to nest an "or" group (Notion accepts two levels of nesting).
+
+        query = (NotionQuery(database_id)
+                 .checkbox("A répondu", False)
+                 .relation_contains("Forms", form_id)
+                 .where(NotionQuery.any_of(NotionQuery.date_condition("Dernier rappel", "before", cutoff),
+                                           NotionQuery.date_condition("Dernier rappel", "is_empty", True)))
+                 .sort_by("Dernier rappel")
+                 .select("Forms", "Personnes", "A répondu", "Dernier rappel"))
+    """
+
+    def __init__(self, database_id: str):
+        self.database_id = database_id
+        self.conditions: List[Dict] = []
+        self.sorts: List[Dict] = []
+        self.properties: Optional[List[str]] = None
+
+    # ----- Conditions -----
+
+    def where(self, condition: Dict) -> "NotionQuery":
+        """Add a raw Notion filter condition (or a group built with `any_of` / `all_of`)."""
+        self.conditions.append(condition)
+        return self
+
+    def checkbox(self, property_name: str, equals: bool) -> "NotionQuery":
+        return self.where({"property": property_name, "checkbox": {"equals": equals}})
+
+    def relation_contains(self, property_name: str, page_id: str) -> "NotionQuery":
+        return self.where({"property": property_name, "relation": {"contains": page_id}})
+
+    def date_before(self, property_name: str, cutoff: str, or_empty: bool = False) -> "NotionQuery":
+        """Rows whose date is before `cutoff` (ISO 8601), optionally also rows without a date."""
+        before = self.date_condition(property_name, "before", cutoff)
+        if not or_empty:
+            return self.where(before)
+        return self.where(self.any_of(before, self.date_condition(property_name, "is_empty", True)))
+
+    def rollup_not_empty(self, property_name: str, value_type: str = "rich_text") -> "NotionQuery":
+        """Rows where at least one rolled-up value of `value_type` is not empty."""
+        return self.where({"property": property_name, "rollup": {"any": {value_type: {"is_not_empty": True}}}})
+
+    @staticmethod
+    def date_condition(property_name: str, operator: str, value: Any) -> Dict:
+        return {"property": property_name, "date": {operator: value}}
+
+    @staticmethod
+    def any_of(*conditions: Dict) -> Dict:
+        return {"or": list(conditions)}
+
+    @staticmethod
+    def all_of(*conditions: Dict) -> Dict:
+        return {"and": list(conditions)}
+
+    # ----- Sorts and properties -----
+
+    def sort_by(self, property_name: Optional[str] = None, timestamp: Optional[str] = None,
+                descending: bool = False) -> "NotionQuery":
+        """Sort by a property, or by a page timestamp ("created_time" / "last_edited_time")."""
+        sort = {"property": property_name} if property_name else {"timestamp": timestamp}
+        sort["direction"] = "descending" if descending else "ascending"
+        self.sorts.append(sort)
+        return self
+
+    def select(self, *property_names: str) -> "NotionQuery":
+        """Only return these properties of each page (sent as `filter_properties`)."""
+        self.properties = list(property_names)
+        return self
+
+    # ----- Payload -----
+
+    @property
+    def filter(self) -> Optional[Dict]:
+        if not self.conditions:
+            return None
+        return self.conditions[0] if len(self.conditions) == 1 else {"and": list(self.conditions)}
+
+    def __repr__(self) -> str:
+        return (f"NotionQuery({self.database_id!r}, filter={self.filter!r}, sorts={self.sorts!r}, "
+                f"properties={self.properties!r})")
@@ -0,0 +1,182 @@
+import logging
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, Optional, Tuple, Callable, Any
+
+logger = logging.getLogger(__name__)
+
+class _Record:
+    """Base for compact records parsed once from raw Notion pages."""
+
+    __slots__ = ("id", "created_time", "last_edited_time")
+
+    def _all_slots(self):
+        for cls in type(self).__mro__:
+            yield from getattr(cls, "__slots__", ())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {slot: getattr(self, slot, None) for slot in self._all_slots()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "_Record":
+        record = cls.__new__(cls)
+        for slot in record._all_slots():
+            value = data.get(slot)
+            setattr(record, slot, tuple(value) if isinstance(value, list) else value)
+        return record
+
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{slot}={getattr(self, slot, None)!r}" for slot in self._all_slots())
+        return f"{type(self).__name__}({fields})"
+
+class FormRecord(_Record):
+    """A row of the forms database."""
+
+    __slots__ = ("name", "google_form_id", "date_envoi", "cadence_days", "url")
+
+class ResponseRecord(_Record):
+    """A row of the responses database."""
+
+    __slots__ = ("form_ids", "person_ids", "has_responded", "dernier_rappel")
+
+    @property
+    def person_id(self) -> Optional[str]:
+        """The related person (one person per response)."""
+        return self.person_ids[0] if self.person_ids else None
+
+class PersonRecord(_Record):
+    """A row of the People database."""
+
+    __slots__ = ("name", "psid", "email")
+
+# Property parsers: each takes the raw property object of a page
+
+def parse_text(prop: Dict) -> str:
+    """Plain text of a title, rich_text, email or date property ('' if empty)."""
+    property_type = prop["type"]
+    value = prop[property_type]
+    if property_type in ("title", "rich_text"):
+        return "".join(chunk["plain_text"] for chunk in value) if value else ""
+    if property_type == "email":
+        return value or ""
+    if property_type == "date":
+        return value["start"] if value else ""
+    return ""
+
+def parse_checkbox(prop: Dict) -> bool:
+    return bool(prop["checkbox"]) if prop["type"] == "checkbox" else False
+
+def parse_relation(prop: Dict) -> Tuple[str, ...]:
+    return tuple(item["id"] for item in prop["relation"]) if prop["type"] == "relation" else ()
+
+def parse_date(prop: Dict) -> Optional[str]:
+    value = prop.get("date") if prop["type"] == "date" else None
+    return value["start"] if value else None
+
+def parse_number(prop: Dict) -> Optional[float]:
+    return prop.get("number") if prop["type"] == "number" else None
+
+def parse_notion_time(value: Optional[str]) -> Optional[float]:
+    """Epoch seconds of a Notion date or datetime ("2025-09-01", "2025-09-01T12:47:15.000Z"); dates are UTC midnight."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        logger.warning(f"Could not parse Notion date '{value}'")
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+class RecordExtractor:
+    """
+    Turns raw Notion pages into records.
+
+    The (slot, property name, parser, default) field map is built once per
+    database, so each page costs one dict lookup and one parser call per field
+    we actually read; the raw page can be dropped right after.
+    """
+
+    def __init__(self, record_type: type, fields: Tuple[Tuple[str, str, Callable, Any], ...],
+                 post_process: Optional[Callable[[Any], None]] = None, optional: Tuple[str, ...] = ()):
+        self.record_type = record_type
+        self.fields = fields
+        self.post_process = post_process
+        # Properties that may legitimately be absent from the database (no warning)
+        self._reported_missing = set(optional)
+
+    @property
+    def property_names(self) -> Tuple[str, ...]:
+        """Notion properties read by this extractor (e.g. for `filter_properties`)."""
+        return tuple(property_name for _, property_name, _, _ in self.fields)
+
+    @property
+    def signature(self) -> Tuple[Tuple[str, str], ...]:
+        """(slot, property name) pairs; records stored under another signature are stale."""
+        return tuple((slot, property_name) for slot, property_name, _, _ in self.fields)
+
+    def __call__(self, page: Dict):
+        record = self.record_type.__new__(self.record_type)
+        record.id = page["id"]
+        record.created_time = page.get("created_time")
+        record.last_edited_time = page.get("last_edited_time")
+
+        properties = page.get("properties", {})
+        for slot, property_name, parser, default in self.fields:
+            prop = properties.get(property_name)
+            if prop is None:
+                if property_name not in self._reported_missing:
+                    self._reported_missing.add(property_name)
+                    logger.warning(f"Property '{property_name}' does not exist in {self.record_type.__name__} pages")
+                value = default
+            else:
+                try:
+                    value = parser(prop)
+                except (KeyError, IndexError, TypeError) as e:
+                    logger.warning(f"Could not extract '{property_name}' from page {record.id}: {e}")
+                    value = default
+            setattr(record, slot, value)
+
+        if self.post_process:
+            self.post_process(record)
+        return record
+
+def form_url(google_form_id: str) -> Optional[str]:
+    """Public URL of a Google Form."""
+    return f"https://docs.google.com/forms/d/{google_form_id}/viewform" if google_form_id else None
+
+def _set_form_url(record: FormRecord):
+    record.url = form_url(record.google_form_id)
+
+@lru_cache(maxsize=None)
+def build_form_extractor(columns: type) -> RecordExtractor:
+    """Compile the forms database extractor from a NotionColumns class."""
+    return RecordExtractor(FormRecord, (
+        ("name", columns.FORM_NAME, parse_text, ""),
+        ("google_form_id", columns.GOOGLE_FORM_ID, parse_text, ""),
+        ("date_envoi", columns.DATE_ENVOI, parse_text, ""),
+        ("cadence_days", columns.REMINDER_CADENCE, parse_number, None),
+    ), post_process=_set_form_url, optional=(columns.REMINDER_CADENCE,))
+
+@lru_cache(maxsize=None)
+def build_response_extractor(columns: type) -> RecordExtractor:
+    """Compile the responses database extractor from a NotionColumns class."""
+    return RecordExtractor(ResponseRecord, (
+        ("form_ids", columns.FORMS_RELATION, parse_relation, ()),
+        ("person_ids", columns.PERSON_RELATION, parse_relation, ()),
+        ("has_responded", columns.HAS_RESPONDED, parse_checkbox, False),
+        ("dernier_rappel", columns.DERNIER_RAPPEL, parse_date, None),
+    ))
+
+@lru_cache(maxsize=None)
+def build_person_extractor(columns: type) -> RecordExtractor:
+    """Compile the People database extractor from a NotionColumns class."""
+    return RecordExtractor(PersonRecord, (
+        ("name", columns.PERSON_NAME, parse_text, ""),
+        ("psid", columns.PERSON_PSID, parse_text, ""),
+        ("email", columns.PERSON_EMAIL, parse_text, ""),
+    ))
@@ -0,0 +1,167 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Any
+from config.config import config
+from connections.notion_records import RecordExtractor
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS databases (
+    database_id TEXT PRIMARY KEY,
+    signature TEXT NOT NULL,
+    watermark TEXT,
+    last_full_scan REAL
+);
+
+CREATE TABLE IF NOT EXISTS rows (
+    database_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (database_id, id)
+);
+"""
+
+class DatabaseState:
+    """Locally stored copy of one Notion database and its `last_edited_time` watermark."""
+
+    def __init__(self, signature: List[List[str]], watermark: Optional[str] = None,
+                 last_full_scan: Optional[float] = None, rows: Optional[Dict[str, Any]] = None):
+        self.signature = signature
+        self.watermark = watermark
+        self.last_full_scan = last_full_scan
+        self.rows: Dict[str, Any] = rows or {}
+        # Held while the database is being refreshed from Notion
+        self.lock = threading.Lock()
+        # Rows merged since the last save, and whether the stored rows must all be replaced
+        self.dirty: Dict[str, Any] = {}
+        self.cleared = False
+        self.saved_meta = (watermark, last_full_scan)
+        # Whether the last refresh from Notion failed (rows are those of an earlier run)
+        self.stale = False
+
+    def merge(self, record):
+        """Insert or replace a row and move the watermark forward."""
+        self.rows[record.id] = record
+        self.dirty[record.id] = record
+        if record.last_edited_time and (self.watermark is None or record.last_edited_time > self.watermark):
+            self.watermark = record.last_edited_time
+
+    def clear(self):
+        """Forget every row and the watermark (before a full scan)."""
+        self.rows = {}
+        self.dirty = {}
+        self.watermark = None
+        self.cleared = True
+
+class NotionSyncState:
+    """
+    Persisted watermarks and rows for incrementally synchronized Notion databases.
+
+    The state is a SQLite file holding, per database, the records seen so far
+    (as `to_dict()` payloads keyed by page ID), the highest `last_edited_time`
+    among them and the time of the last full scan. A database's rows are read
+    only when it is first used, and `save()` only writes the rows merged since
+    the previous save, so an incremental run does work proportional to what changed.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(config.state_dir, "notion_sync_state.sqlite3")
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._databases: Dict[str, DatabaseState] = {}
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            with self._conn:
+                self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def database(self, database_id: str, extractor: RecordExtractor) -> DatabaseState:
+        """
+        Get the stored state of a database, parsed with the extractor's record type.
+
+        State stored for another column mapping is discarded, which forces a full scan.
+        """
+        signature = [list(pair) for pair in extractor.signature]
+        with self._lock:
+            state = self._databases.get(database_id)
+            if state is not None and state.signature == signature:
+                return state
+
+            state = DatabaseState(signature)
+            try:
+                conn = self._connection()
+                stored = conn.execute("SELECT signature, watermark, last_full_scan FROM databases "
+                                      "WHERE database_id = ?", (database_id,)).fetchone()
+                if stored and json.loads(stored[0]) == signature:
+                    record_type = extractor.record_type
+                    rows = {row_id: record_type.from_dict(json.loads(data)) for row_id, data in conn.execute(
+                        "SELECT id, data FROM rows WHERE database_id = ?", (database_id,))}
+                    state = DatabaseState(signature, stored[1], stored[2], rows)
+                elif stored:
+                    state.cleared = True
+            except (sqlite3.Error, ValueError) as e:
+                logger.warning(f"Could not read sync state of database {database_id}, starting from scratch: {e}")
+                state.cleared = True
+
+            self._databases[database_id] = state
+            return state
+
+    def save(self):
+        """Write what changed in the loaded database states since the previous save."""
+        with self._lock:
+            try:
+                conn = self._connection()
+                with conn:
+                    for database_id, state in self._databases.items():
+                        meta = (state.watermark, state.last_full_scan)
+                        if not state.dirty and not state.cleared and meta == state.saved_meta:
+                            continue
+                        if state.cleared:
+                            conn.execute("DELETE FROM rows WHERE database_id = ?", (database_id,))
+                        conn.executemany("INSERT OR REPLACE INTO rows(database_id, id, data) VALUES (?, ?, ?)",
+                                         [(database_id, row_id, json.dumps(record.to_dict()))
+                                          for row_id, record in state.dirty.items()])
+                        conn.execute("INSERT OR REPLACE INTO databases(database_id, signature, watermark, "
+                                     "last_full_scan) VALUES (?, ?, ?, ?)",
+                                     (database_id, json.dumps(state.signature)) + meta)
+                        state.dirty = {}
+                        state.cleared = False
+                        state.saved_meta = meta
+            except sqlite3.Error as e:
+                logger.error(f"❌ Could not save sync state to {self.path}: {e}")
+
+    def is_stale(self, database_id: str) -> bool:
+        """Whether the last load of a database served stored rows because Notion could not be read."""
+        with self._lock:
+            state = self._databases.get(database_id)
+        return state is not None and state.stale
+
+    def full_scan_due(self, state: DatabaseState) -> bool:
+        """Whether a database has never been scanned or its last full scan is too old."""
+        if state.watermark is None or state.last_full_scan is None:
+            return True
+        return time.time() - state.last_full_scan >= config.notion_full_scan_interval
+
+    def reset(self):
+        """Forget every stored database (the next load of each one is a full scan)."""
+        with self._lock:
+            self._databases.clear()
+            try:
+                with self._connection() as conn:
+                    conn.execute("DELETE FROM rows")
+                    conn.execute("DELETE FROM databases")
+            except sqlite3.Error as e:
+                logger.error(f"❌ Could not reset sync state {self.path}: {e}")
+
+# Shared instance so that every NotionClient reads and writes the same state
+notion_sync_state = NotionSyncState()
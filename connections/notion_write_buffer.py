@@ -0,0 +1,108 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Any, TYPE_CHECKING
+from config.config import config
+
+if TYPE_CHECKING:
+    from connections.notion_connection import NotionClient
+
+logger = logging.getLogger(__name__)
+
+class NotionWriteBuffer:
+    """
+    Write-behind buffer for Notion page property updates.
+
+    Pending changes are merged per page, so a page that receives several
+    property updates during a stage is written with a single PATCH. The buffer
+    is flushed with bounded concurrency when it grows past `max_pending` pages
+    or when the caller ends a stage with `flush()`.
+    """
+
+    def __init__(self, notion: "NotionClient", max_pending: Optional[int] = None, max_workers: Optional[int] = None):
+        self.notion = notion
+        self.max_pending = max_pending or config.notion_write_buffer_size
+        self.max_workers = max_workers or config.notion_write_workers
+        self._pending: Dict[str, Dict[str, Dict]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+        # Cumulative results across every flush of this buffer
+        self.written: List[str] = []
+        self.failed: List[str] = []
+        self.coalesced = 0
+
+    def set_property(self, page_id: str, property_name: str, value: Dict):
+        """Queue a property value (Notion payload such as {"checkbox": True}) for a page."""
+        with self._lock:
+            properties = self._pending.setdefault(page_id, {})
+            if properties:
+                self.coalesced += 1
+            properties[property_name] = value
+            should_flush = len(self._pending) >= self.max_pending
+
+        if should_flush:
+            self.flush()
+
+    def mark_responded(self, response_id: str, has_responded: bool = True):
+        """Queue an 'A répondu' checkbox update."""
+        self.set_property(response_id, self.notion.columns.HAS_RESPONDED, {"checkbox": has_responded})
+
+    def mark_reminded(self, response_id: str, when: Optional[str] = None):
+        """Queue a 'Dernier rappel' date update (defaults to now)."""
+        self.set_property(response_id, self.notion.columns.DERNIER_RAPPEL,
+                          {"date": {"start": when or self.notion.utc_now_iso()}})
+
+    def pending_value(self, page_id: str, property_name: str) -> Optional[Dict]:
+        """Return the queued value of a property, if any."""
+        with self._lock:
+            return self._pending.get(page_id, {}).get(property_name)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> Dict[str, List[str]]:
+        """
+        Write every pending page (one PATCH per page) with bounded concurrency.
+
+        Returns:
+            {"written": [page IDs], "failed": [page IDs]} for this flush
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch = self._pending
+                self._pending = {}
+
+            if not batch:
+                return {"written": [], "failed": []}
+
+            page_ids = list(batch)
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="notion-flush") as executor:
+                outcomes = list(executor.map(self._write_page, page_ids, (batch[pid] for pid in page_ids)))
+
+            written = [pid for pid, ok in zip(page_ids, outcomes) if ok]
+            failed = [pid for pid, ok in zip(page_ids, outcomes) if not ok]
+            with self._lock:
+                self.written.extend(written)
+                self.failed.extend(failed)
+
+            logger.info(f"💾 Flushed {len(page_ids)} page update(s): {len(written)} written, {len(failed)} failed")
+            return {"written": written, "failed": failed}
+
+    def _write_page(self, page_id: str, properties: Dict[str, Dict]) -> bool:
+        try:
+            return self.notion.update_page_properties(page_id, properties)
+        except Exception as e:
+            logger.error(f"❌ Unexpected error writing page {page_id}: {e}")
+            return False
+
+    def report(self) -> Dict[str, Any]:
+        """Cumulative write report for this buffer."""
+        with self._lock:
+            return {
+                "written": len(self.written),
+                "failed_pages": list(self.failed),
+                "coalesced_updates": self.coalesced,
+                "pending": len(self._pending)
+            }
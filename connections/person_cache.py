@@ -0,0 +1,140 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple, Iterable
+from config.config import config
+from connections.notion_records import PersonRecord
+
+logger = logging.getLogger(__name__)
+
+class PersonCache:
+    """
+    Bounded LRU cache of person records with a per-entry TTL.
+
+    Entries are also revalidated against Notion's `last_edited_time`: the client
+    asks Notion which person pages were edited since the previous check (see
+    `revalidation_due` / `apply_revalidation`) and replaces those entries with
+    the fresh records parsed from that single query. This happens at the start
+    of every sync and reminder run, and then at most every `revalidate_seconds`
+    while a run goes on, so an edit made during a run may be served stale for
+    up to that long.
+    """
+
+    # Notion rounds last_edited_time to the minute, so look back a little further
+    REVALIDATION_SLACK = timedelta(seconds=60)
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 3600, revalidate_seconds: float = 60):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.revalidate_seconds = revalidate_seconds
+        self._entries: "OrderedDict[str, Tuple[float, PersonRecord]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_check_monotonic: Optional[float] = None
+        self._last_check_wall: Optional[datetime] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.refreshes = 0
+
+    def get(self, person_id: str) -> Optional[PersonRecord]:
+        """Return a cached person if present and not expired."""
+        with self._lock:
+            entry = self._entries.get(person_id)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, person = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[person_id]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(person_id)
+            self.hits += 1
+            return person
+
+    def put(self, person: PersonRecord):
+        """Store a person, evicting the least recently used entries if full."""
+        with self._lock:
+            person_id = person.id
+            self._entries[person_id] = (time.monotonic(), person)
+            self._entries.move_to_end(person_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, person_id: str):
+        """Drop a single entry."""
+        with self._lock:
+            self._entries.pop(person_id, None)
+
+    def clear(self):
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def revalidation_due(self, force: bool = False) -> Optional[str]:
+        """
+        Check whether cached entries must be revalidated before being served.
+
+        Args:
+            force: Revalidate even if the last check is more recent than `revalidate_seconds`
+
+        Returns:
+            ISO timestamp to query edits from, or None if no query is needed
+        """
+        with self._lock:
+            now = time.monotonic()
+            if (not force and self._last_check_monotonic is not None
+                    and now - self._last_check_monotonic < self.revalidate_seconds):
+                return None
+
+            previous_check = self._last_check_wall
+            self._last_check_monotonic = now
+            self._last_check_wall = datetime.now(timezone.utc)
+
+            if previous_check is None or not self._entries:
+                # Nothing cached before this point, every later fetch is fresh
+                return None
+
+            since = previous_check - self.REVALIDATION_SLACK
+            return since.isoformat(timespec="seconds").replace("+00:00", "Z")
+
+    def apply_revalidation(self, edited_persons: Iterable[PersonRecord]):
+        """Replace cached entries with the fresh records edited since the last check."""
+        refreshed = 0
+        with self._lock:
+            for person in edited_persons:
+                if person.id in self._entries:
+                    self._entries[person.id] = (time.monotonic(), person)
+                    refreshed += 1
+            self.refreshes += refreshed
+
+        if refreshed:
+            logger.info(f"♻️  Refreshed {refreshed} edited person page(s) in cache")
+
+    def stats(self) -> Dict[str, int]:
+        """Expose cache counters."""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "refreshes": self.refreshes
+            }
+
+# Shared instance so that every NotionClient (and every webhook run) reuses it
+person_cache = PersonCache(
+    max_entries=config.person_cache_size,
+    ttl_seconds=config.person_cache_ttl,
+    revalidate_seconds=config.person_cache_revalidate
+)
@@ -0,0 +1,124 @@
+import logging
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+from config.config import config
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """
+    Thread-safe token bucket whose refill rate adapts to throttling (AIMD).
+
+    Every successful call nudges the rate up additively towards `max_rate`;
+    a 429 halves it (down to `min_rate`) and, when the server sent a
+    Retry-After header, blocks all callers until that delay has passed.
+    Concurrent 429s from the same burst only count as one decrease.
+    """
+
+    # Throttles closer together than this are treated as the same event
+    DECREASE_COOLDOWN = 1.0
+
+    def __init__(self, rate: float, capacity: Optional[float] = None, max_rate: Optional[float] = None,
+                 min_rate: float = 0.2, increase_step: float = 0.05, decrease_factor: float = 0.5):
+        self.rate = rate
+        self.max_rate = max_rate or rate
+        self.min_rate = min_rate
+        self.capacity = capacity or max(1.0, rate)
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._last_decrease = float("-inf")
+        self._lock = threading.Lock()
+
+        self.throttled_count = 0
+        self.waited_seconds = 0.0
+
+    def _refill(self, now: float):
+        elapsed = now - self._last_refill
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._last_refill = now
+
+    def acquire(self):
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._blocked_until:
+                    wait = self._blocked_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                else:
+                    wait = (1 - self._tokens) / self.rate
+                self.waited_seconds += wait
+            time.sleep(wait)
+
+    def on_success(self):
+        """Additive increase after a call that was not throttled."""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_throttled(self, retry_after: Optional[float] = None):
+        """Multiplicative decrease after a 429, honouring Retry-After if provided."""
+        with self._lock:
+            now = time.monotonic()
+            self.throttled_count += 1
+            self._tokens = 0
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+            if now - self._last_decrease < self.DECREASE_COOLDOWN + (retry_after or 0):
+                return
+            self._last_decrease = now
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            logger.warning(f"🐢 Throttled, rate lowered to {self.rate:.2f} req/s"
+                           + (f", pausing {retry_after:.1f}s" if retry_after else ""))
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "rate": round(self.rate, 3),
+                "max_rate": self.max_rate,
+                "throttled_count": self.throttled_count,
+                "waited_seconds": round(self.waited_seconds, 3)
+            }
+
+# One bucket per host, shared by every client in the process
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+def _default_rate(host: str) -> float:
+    if "notion" in host or host == urlsplit(config.notion_base_url).netloc:
+        return config.notion_rate_limit
+    if "graph.facebook" in host or host == urlsplit(config.graph_api_base_url).netloc:
+        return config.messenger_rate_limit
+    return config.default_rate_limit
+
+def get_bucket(host: str) -> TokenBucket:
+    """Get the shared token bucket for a host, creating it with the configured rate."""
+    with _buckets_lock:
+        bucket = _buckets.get(host)
+        if bucket is None:
+            rate = _default_rate(host)
+            bucket = TokenBucket(rate=rate, capacity=max(1.0, rate))
+            _buckets[host] = bucket
+        return bucket
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds (HTTP-date values are ignored)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+def get_all_stats() -> Dict[str, Dict[str, float]]:
+    """Expose limiter state for every host seen so far."""
+    with _buckets_lock:
+        buckets = dict(_buckets)
+    return {host: bucket.stats() for host, bucket in buckets.items()}
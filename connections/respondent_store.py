@@ -0,0 +1,112 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+from config.config import config
+
+logger = logging.getLogger(__name__)
+
+class FormRespondents:
+    """Respondents seen so far for one Google Form, with the App Script delta cursor."""
+
+    def __init__(self, form_id: str, cursor: Optional[str] = None, last_full_refresh: Optional[float] = None,
+                 respondents: Optional[Dict[str, Dict]] = None, etag: Optional[str] = None,
+                 etag_since: Optional[str] = None):
+        self.form_id = form_id
+        self.cursor = cursor
+        self.last_full_refresh = last_full_refresh
+        # HTTP validator of the last answer and the `since` it was requested with
+        self.etag = etag
+        self.etag_since = etag_since
+        # {normalized email: {"firstName", "lastName", "timestamp"}}
+        self.respondents: Dict[str, Dict] = respondents or {}
+        self.lock = threading.Lock()
+
+    def merge(self, people: List[Dict]) -> int:
+        """Insert or update respondents. Returns the number of new emails."""
+        added = 0
+        for person in people:
+            email = person["email"]
+            if email not in self.respondents:
+                added += 1
+            self.respondents[email] = {
+                "firstName": person.get("firstName", ""),
+                "lastName": person.get("lastName", ""),
+                "timestamp": person.get("timestamp")
+            }
+        return added
+
+    def replace(self, people: List[Dict]):
+        """Drop every stored respondent and keep only `people`."""
+        self.respondents = {}
+        self.merge(people)
+
+class RespondentStore:
+    """
+    Local store of Google Form respondents, one JSON file per form.
+
+    Lets the App Script client ask only for responses submitted after its
+    last cursor and merge them into what it already knows.
+    """
+
+    VERSION = 1
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or os.path.join(config.state_dir, "app_script")
+        self._lock = threading.Lock()
+        self._forms: Dict[str, FormRespondents] = {}
+
+    def _path(self, form_id: str) -> str:
+        return os.path.join(self.directory, f"{form_id}.json")
+
+    def form(self, form_id: str) -> FormRespondents:
+        """Get the stored respondents of a form (empty if never fetched)."""
+        with self._lock:
+            form = self._forms.get(form_id)
+            if form is not None:
+                return form
+
+            form = FormRespondents(form_id)
+            try:
+                with open(self._path(form_id), encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == self.VERSION:
+                    form = FormRespondents(form_id, data.get("cursor"), data.get("last_full_refresh"),
+                                           data.get("respondents", {}), data.get("etag"), data.get("etag_since"))
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not read respondents of form {form_id}, starting from scratch: {e}")
+
+            self._forms[form_id] = form
+            return form
+
+    def save(self, form: FormRespondents):
+        """Write a form's respondents to disk (atomically)."""
+        path = self._path(form.form_id)
+        tmp_path = f"{path}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "version": self.VERSION,
+                    "cursor": form.cursor,
+                    "last_full_refresh": form.last_full_refresh,
+                    "etag": form.etag,
+                    "etag_since": form.etag_since,
+                    "respondents": form.respondents
+                }, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error(f"❌ Could not save respondents of form {form.form_id}: {e}")
+
+    def full_refresh_due(self, form: FormRespondents) -> bool:
+        """Whether the form must be fetched in full (no cursor yet, or last full fetch too old)."""
+        if form.cursor is None or form.last_full_refresh is None:
+            return True
+        return time.time() - form.last_full_refresh >= config.app_script_full_refresh_interval
+
+# Shared instance so that every App Script client reuses the loaded forms
+respondent_store = RespondentStore()
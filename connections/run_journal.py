@@ -0,0 +1,166 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Any
+from config.config import config
+from connections.notion_connection import NotionClient
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scope TEXT NOT NULL,
+    custom_message TEXT,
+    status TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_scope ON runs(scope, status);
+
+CREATE TABLE IF NOT EXISTS stages (
+    run_id INTEGER NOT NULL,
+    stage TEXT NOT NULL,
+    completed_at TEXT NOT NULL,
+    details TEXT,
+    PRIMARY KEY (run_id, stage)
+);
+
+CREATE TABLE IF NOT EXISTS recipients (
+    run_id INTEGER NOT NULL,
+    response_id TEXT NOT NULL,
+    form_name TEXT,
+    name TEXT,
+    state TEXT NOT NULL,
+    dernier_rappel_updated INTEGER,
+    error TEXT,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (run_id, response_id)
+);
+"""
+
+class RunJournal:
+    """
+    Local SQLite journal of reminder runs, used to resume a run that stopped halfway.
+
+    A run records each completed stage ("sync", "deliveries") and the state of
+    every recipient:
+        sending    the message is being sent (outcome unknown if the run stops here)
+        unknown    the send was attempted but its outcome was lost (never resent)
+        delivered  Messenger accepted the message
+        failed     the message was not delivered and may be retried
+
+    `dernier_rappel_updated` tells whether the 'Dernier rappel' write of a
+    delivered reminder succeeded (NULL until known).
+    """
+
+    # A recipient in these states must never be messaged again by the same run
+    DONE_STATES = ("sending", "unknown", "delivered")
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(config.state_dir, "run_journal.sqlite3")
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    # ----- Runs -----
+
+    def start_run(self, scope: str, custom_message: Optional[str] = None) -> int:
+        """Open a new run for `scope` ("ALL" or a Notion form ID) and return its ID."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO runs(scope, custom_message, status, started_at) VALUES (?, ?, 'running', ?)",
+                (scope, custom_message, NotionClient.utc_now_iso()))
+            return cursor.lastrowid
+
+    def unfinished_run(self, scope: str) -> Optional[Dict[str, Any]]:
+        """Latest run of `scope` that never finished, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM runs WHERE scope = ? AND status = 'running' ORDER BY id DESC LIMIT 1",
+                (scope,)).fetchone()
+        return dict(row) if row else None
+
+    def finish_run(self, run_id: int):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE runs SET status = 'done', finished_at = ? WHERE id = ?",
+                               (NotionClient.utc_now_iso(), run_id))
+
+    def abandon_runs(self, scope: str):
+        """Close the unfinished runs of `scope` so they can no longer be resumed."""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE runs SET status = 'abandoned', finished_at = ? "
+                               "WHERE scope = ? AND status = 'running'", (NotionClient.utc_now_iso(), scope))
+
+    # ----- Stages -----
+
+    def complete_stage(self, run_id: int, stage: str, details: Any = None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO stages(run_id, stage, completed_at, details) VALUES (?, ?, ?, ?)",
+                (run_id, stage, NotionClient.utc_now_iso(),
+                 json.dumps(details, default=str) if details is not None else None))
+
+    def stage_completed(self, run_id: int, stage: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM stages WHERE run_id = ? AND stage = ?",
+                                     (run_id, stage)).fetchone()
+        return row is not None
+
+    # ----- Recipients -----
+
+    def mark_sending(self, run_id: int, outcomes: Iterable[Dict]):
+        """Record that the reminders of these outcomes (see ReminderService) are about to be sent."""
+        now = NotionClient.utc_now_iso()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO recipients(run_id, response_id, form_name, name, state, updated_at) "
+                "VALUES (?, ?, ?, ?, 'sending', ?)",
+                [(run_id, o["response_id"], o["form_name"], o["name"], now) for o in outcomes if o["response_id"]])
+
+    def record_deliveries(self, run_id: int, outcomes: Iterable[Dict]):
+        """Record the delivery result of each outcome (`delivered` is None when the outcome is unknown)."""
+        now = NotionClient.utc_now_iso()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO recipients(run_id, response_id, form_name, name, state, error, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, o["response_id"], o["form_name"], o["name"],
+                  "delivered" if o["delivered"] else "unknown" if o["delivered"] is None else "failed",
+                  o["error"], now)
+                 for o in outcomes if o["response_id"]])
+
+    def record_dernier_rappel(self, run_id: int, results: Dict[str, bool]):
+        """Record whether the 'Dernier rappel' write of each delivered response succeeded."""
+        now = NotionClient.utc_now_iso()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE recipients SET dernier_rappel_updated = ?, updated_at = ? WHERE run_id = ? AND response_id = ?",
+                [(int(updated), now, run_id, response_id) for response_id, updated in results.items()])
+
+    def recipients(self, run_id: int) -> Dict[str, Dict[str, Any]]:
+        """{response_id: recipient row} of a run."""
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM recipients WHERE run_id = ?", (run_id,)).fetchall()
+        return {row["response_id"]: dict(row) for row in rows}
+
+    def recent_runs(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Latest runs with their recipient counts per state."""
+        with self._lock:
+            runs = [dict(row) for row in self._conn.execute(
+                "SELECT * FROM runs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()]
+            for run in runs:
+                run["recipients"] = {row["state"]: row["count"] for row in self._conn.execute(
+                    "SELECT state, COUNT(*) AS count FROM recipients WHERE run_id = ? GROUP BY state",
+                    (run["id"],)).fetchall()}
+        return runs
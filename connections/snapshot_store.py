@@ -0,0 +1,254 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Any, Iterable, TYPE_CHECKING
+from config.config import config
+from connections.notion_records import FormRecord, PersonRecord
+
+if TYPE_CHECKING:
+    from connections.notion_connection import NotionClient
+    from connections.google_forms_client import GoogleFormsAppScriptClient
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS forms (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    google_form_id TEXT NOT NULL,
+    date_envoi TEXT NOT NULL,
+    url TEXT,
+    last_edited_time TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_forms_name ON forms(name);
+CREATE INDEX IF NOT EXISTS idx_forms_google_form_id ON forms(google_form_id);
+
+CREATE TABLE IF NOT EXISTS people (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    psid TEXT NOT NULL,
+    email TEXT NOT NULL,
+    email_normalized TEXT NOT NULL,
+    last_edited_time TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_people_email ON people(email_normalized);
+
+CREATE TABLE IF NOT EXISTS responses (
+    id TEXT PRIMARY KEY,
+    person_id TEXT,
+    has_responded INTEGER NOT NULL,
+    dernier_rappel TEXT,
+    last_edited_time TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_responses_person ON responses(person_id);
+
+CREATE TABLE IF NOT EXISTS response_forms (
+    response_id TEXT NOT NULL,
+    form_id TEXT NOT NULL,
+    PRIMARY KEY (response_id, form_id)
+);
+CREATE INDEX IF NOT EXISTS idx_response_forms_form ON response_forms(form_id);
+
+CREATE TABLE IF NOT EXISTS respondents (
+    google_form_id TEXT NOT NULL,
+    email TEXT NOT NULL,
+    first_name TEXT,
+    last_name TEXT,
+    timestamp TEXT,
+    PRIMARY KEY (google_form_id, email)
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+class SnapshotStore:
+    """
+    Local SQLite snapshot of the forms, responses and People databases and of
+    the App Script respondents of each form.
+
+    `refresh()` reads Notion incrementally (see NotionClient.load_database_records)
+    and only rewrites the rows that changed, so reports and
+    non-responder lookups can then run offline against indexed tables.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(config.state_dir, "snapshot.sqlite3")
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    # ----- Refresh -----
+
+    def refresh(self, notion: "NotionClient", google_forms: Optional["GoogleFormsAppScriptClient"] = None,
+                full_scan: bool = False) -> Dict[str, Any]:
+        """
+        Bring the snapshot up to date.
+
+        Args:
+            notion: Notion client used to read the three databases
+            google_forms: Optional App Script client; when given, respondent sets are refreshed too
+            full_scan: Re-read every Notion row instead of only the rows edited since the last run
+
+        Returns:
+            Number of rows written and deleted per table
+        """
+        started = time.monotonic()
+        forms = notion.load_database_records(config.notion_forms_db_id, notion.extract_form, full_scan=full_scan)
+        people = notion.load_database_records(config.notion_people_db_id, notion.extract_person, full_scan=full_scan)
+        responses = notion.load_database_records(config.notion_responses_db_id, notion.extract_response,
+                                                 full_scan=full_scan)
+        stale = [database_id for database_id in (config.notion_forms_db_id, config.notion_people_db_id,
+                                                 config.notion_responses_db_id) if notion.is_stale(database_id)]
+        if stale:
+            # Keep the snapshot (and its refresh time) as of the last successful read
+            raise RuntimeError(f"Could not read Notion database(s) {', '.join(stale)}, snapshot left unchanged")
+
+        respondents = None
+        if google_forms is not None:
+            google_form_ids = [form.google_form_id for form in forms if form.google_form_id]
+            respondents = google_forms.get_multiple_forms_responses(google_form_ids)
+
+        with self._lock, self._conn:
+            stats = {
+                "forms": self._sync_rows("forms", forms, lambda f: (
+                    f.id, f.name, f.google_form_id, f.date_envoi, f.url, f.last_edited_time)),
+                "people": self._sync_rows("people", people, lambda p: (
+                    p.id, p.name, p.psid, p.email, p.email.lower().strip(), p.last_edited_time)),
+                "responses": self._sync_rows("responses", responses, lambda r: (
+                    r.id, r.person_id, int(r.has_responded), r.dernier_rappel, r.last_edited_time),
+                    on_change=self._write_response_forms)
+            }
+            if respondents is not None:
+                stats["respondents"] = self._sync_respondents(respondents)
+            self._conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES ('refreshed_at', ?)",
+                               (notion.utc_now_iso(),))
+
+        elapsed = time.monotonic() - started
+        logger.info(f"🗄️  Snapshot refreshed in {elapsed:.1f}s: " +
+                    ", ".join(f"{table} +{s['written']}/-{s['deleted']}" for table, s in stats.items()))
+        return stats
+
+    def _sync_rows(self, table: str, records: List[Any], to_row, on_change=None) -> Dict[str, int]:
+        """Upsert records whose row differs from the stored one and delete rows that disappeared."""
+        # last_edited_time is rounded to the minute, so two edits in the same minute
+        # share it: compare the whole row instead
+        stored = {row[0]: tuple(row) for row in self._conn.execute(f"SELECT * FROM {table}")}
+        changed, rows = [], []
+        for record in records:
+            row = to_row(record)
+            if stored.get(record.id) != row:
+                changed.append(record)
+                rows.append(row)
+        current_ids = {record.id for record in records}
+        deleted = [(row_id,) for row_id in stored if row_id not in current_ids]
+
+        if changed:
+            placeholders = ", ".join("?" * len(rows[0]))
+            self._conn.executemany(f"INSERT OR REPLACE INTO {table} VALUES ({placeholders})", rows)
+        if deleted:
+            self._conn.executemany(f"DELETE FROM {table} WHERE id = ?", deleted)
+        if on_change:
+            on_change(changed, deleted)
+        return {"written": len(changed), "deleted": len(deleted)}
+
+    def _write_response_forms(self, changed: List[Any], deleted: List[tuple]):
+        stale = [(record.id,) for record in changed] + deleted
+        self._conn.executemany("DELETE FROM response_forms WHERE response_id = ?", stale)
+        self._conn.executemany("INSERT OR IGNORE INTO response_forms(response_id, form_id) VALUES (?, ?)",
+                               [(record.id, form_id) for record in changed for form_id in record.form_ids])
+
+    def _sync_respondents(self, respondents: Dict[str, List[Dict]]) -> Dict[str, int]:
+        """
+        Replace each form's respondent set by its latest App Script answer (diffed by email).
+
+        Forms missing from `respondents` (their App Script call failed) keep their stored set.
+        """
+        written = deleted = 0
+        for google_form_id, responses in respondents.items():
+            stored = {row[0]: tuple(row[1:]) for row in self._conn.execute(
+                "SELECT email, first_name, last_name, timestamp FROM respondents WHERE google_form_id = ?",
+                (google_form_id,))}
+            current = {r["email"]: (r.get("firstName", ""), r.get("lastName", ""), r.get("timestamp"))
+                       for r in responses}
+            changed_rows = [(google_form_id, email) + values
+                            for email, values in current.items() if stored.get(email) != values]
+            gone = [(google_form_id, email) for email in stored if email not in current]
+            self._conn.executemany("INSERT OR REPLACE INTO respondents VALUES (?, ?, ?, ?, ?)", changed_rows)
+            self._conn.executemany("DELETE FROM respondents WHERE google_form_id = ? AND email = ?", gone)
+            written += len(changed_rows)
+            deleted += len(gone)
+        return {"written": written, "deleted": deleted}
+
+    # ----- Queries -----
+
+    def _query(self, sql: str, params: Iterable = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, tuple(params)).fetchall()
+
+    @staticmethod
+    def _form(row: sqlite3.Row) -> FormRecord:
+        return FormRecord.from_dict(dict(row))
+
+    @staticmethod
+    def _person(row: sqlite3.Row) -> PersonRecord:
+        return PersonRecord.from_dict({key: row[key] for key in ("id", "name", "psid", "email", "last_edited_time")})
+
+    def refreshed_at(self) -> Optional[str]:
+        """When the snapshot was last refreshed (None if never)."""
+        rows = self._query("SELECT value FROM meta WHERE key = 'refreshed_at'")
+        return rows[0]["value"] if rows else None
+
+    def forms(self) -> List[FormRecord]:
+        """Every form, ordered by name."""
+        return [self._form(row) for row in self._query("SELECT * FROM forms ORDER BY name")]
+
+    def get_form(self, form_id: str) -> Optional[FormRecord]:
+        rows = self._query("SELECT * FROM forms WHERE id = ?", (form_id,))
+        return self._form(rows[0]) if rows else None
+
+    def response_counts(self, form_id: str) -> Dict[str, int]:
+        """Number of response rows of a form and how many are marked as responded."""
+        row = self._query(
+            "SELECT COUNT(*) AS total, COALESCE(SUM(r.has_responded), 0) AS responded "
+            "FROM response_forms rf JOIN responses r ON r.id = rf.response_id WHERE rf.form_id = ?",
+            (form_id,))[0]
+        return {"total": row["total"], "responded": row["responded"]}
+
+    def respondent_count(self, google_form_id: str) -> int:
+        """Number of distinct emails that answered a Google Form (as of the last refresh)."""
+        return self._query("SELECT COUNT(*) AS n FROM respondents WHERE google_form_id = ?",
+                           (google_form_id,))[0]["n"]
+
+    def non_responders_for_form(self, form_id: str) -> List[Dict]:
+        """
+        Non-responders of a form, shaped like NotionClient.get_non_responders_for_form.
+
+        Returns:
+            List of {'non_responder': PersonRecord, 'ID_reponse', 'Name_person'}
+        """
+        rows = self._query(
+            "SELECT r.id AS response_id, p.id, p.name, p.psid, p.email, p.last_edited_time "
+            "FROM response_forms rf "
+            "JOIN responses r ON r.id = rf.response_id "
+            "JOIN people p ON p.id = r.person_id "
+            "WHERE rf.form_id = ? AND r.has_responded = 0 "
+            "ORDER BY p.name", (form_id,))
+        return [{'non_responder': self._person(row), 'ID_reponse': row["response_id"], 'Name_person': row["name"]}
+                for row in rows]
+
+    def all_non_responders(self) -> Dict[str, List[Dict]]:
+        """Non-responders of every named form. Returns {form_name: [non_responders]}."""
+        return {form.name: self.non_responders_for_form(form.id) for form in self.forms() if form.name}
@@ -1,5 +1,10 @@
+import argparse
+import json
 import logging
 from utils.reminder_service import ReminderService
+from utils.trigger_coalescer import TriggerCoalescer
+from connections.snapshot_store import SnapshotStore
+from connections.run_journal import RunJournal
 from typing import Optional
 
 # Configure logging
@@ -14,6 +19,24 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+_service: Optional[ReminderService] = None
+
+def get_service() -> ReminderService:
+    """Process-wide ReminderService, so repeated webhook calls reuse warm clients and caches."""
+    global _service
+    if _service is None:
+        _service = ReminderService()
+    return _service
+
+_coalescer: Optional[TriggerCoalescer] = None
+
+def get_coalescer() -> TriggerCoalescer:
+    """Process-wide trigger coalescer, so bursts of webhook calls share runs."""
+    global _coalescer
+    if _coalescer is None:
+        _coalescer = TriggerCoalescer()
+    return _coalescer
+
 def main():
     """Main application entry point with App Script integration."""
     logger.info("🚀 Starting Enhanced Reminder Application with Google App Script Integration")
@@ -65,7 +88,8 @@ def main():
 def webhook_sync_handler(form_id: Optional[str] = None):
     """
     Handler function for webhook-triggered synchronization via App Script.
-    This can be called by external webhook systems.
+    This can be called by external webhook systems. Concurrent calls for the
+    same form (or ALL) are coalesced and get the shared result.
     
     Args:
         form_id: Optional specific form ID. If None, syncs all forms.
@@ -73,16 +97,16 @@ def webhook_sync_handler(form_id: Optional[str] = None):
     logger.info(f"🔗 Webhook triggered App Script sync - Form ID: {form_id or 'ALL'}")
     
     try:
-        service = ReminderService()
+        service = get_service()
         
         if form_id:
             # Sync specific form via App Script
-            result = service.sync_only_specific_form(form_id)
+            result = get_coalescer().run(f"sync:{form_id}", lambda: service.sync_only_specific_form(form_id))
             logger.info(f"✅ Webhook App Script sync completed for form {form_id}: {result}")
             return result
         else:
             # Sync all forms via App Script
-            results = service.sync_only_all_forms()
+            results = get_coalescer().run("sync:ALL", service.sync_only_all_forms)
             total_updated = sum(r.get("updated_count", 0) for r in results.values() 
                               if isinstance(r, dict))
             logger.info(f"✅ Webhook App Script sync completed for all forms: {total_updated} updates")
@@ -95,7 +119,8 @@ def webhook_sync_handler(form_id: Optional[str] = None):
 def webhook_reminder_handler(form_id: Optional[str] = None):
     """
     Handler function for webhook-triggered reminders with App Script sync.
-    This can be called by external webhook systems.
+    This can be called by external webhook systems. Calls arriving while the
+    same run is pending or in progress share it instead of reminding twice.
     
     Args:
         form_id: Optional specific form ID. If None, sends for all forms.
@@ -103,16 +128,24 @@ def webhook_reminder_handler(form_id: Optional[str] = None):
     logger.info(f"🔗 Webhook triggered reminders with App Script - Form ID: {form_id or 'ALL'}")
     
     try:
-        service = ReminderService()
+        service = get_service()
         
         if form_id:
             # Send reminders for specific form (with App Script sync)
-            result = service.send_reminders_for_specific_form(form_id, sync_first=True)
+            result = get_coalescer().run(
+                f"remind:{form_id}",
+                lambda: service.send_reminders_for_specific_form(form_id, sync_first=True),
+                follow_up=False
+            )
             logger.info(f"✅ Webhook reminders completed for form {form_id}: {result}")
             return result
         else:
             # Send reminders for all forms (with App Script sync)
-            result = service.send_reminders_for_all_forms(sync_first=True)
+            result = get_coalescer().run(
+                "remind:ALL",
+                lambda: service.send_reminders_for_all_forms(sync_first=True),
+                follow_up=False
+            )
             total_sent = sum(count for count in result["reminders"].values())
             logger.info(f"✅ Webhook reminders completed: {total_sent} reminders sent")
             return result
@@ -121,6 +154,31 @@ def webhook_reminder_handler(form_id: Optional[str] = None):
         logger.error(f"❌ Webhook reminders failed: {e}")
         return {"status": "error", "error": str(e)}
 
+def snapshot_refresh_handler(full_scan: bool = False):
+    """
+    Update the local SQLite snapshot used for offline reports.
+    Only rows edited since the previous refresh are read from Notion.
+    
+    Args:
+        full_scan: Re-read every Notion row (drops rows deleted in Notion)
+    """
+    logger.info("🗄️  Refreshing local snapshot")
+    
+    try:
+        service = ReminderService()
+        stats = service.refresh_snapshot(full_scan=full_scan)
+        logger.info(f"✅ Snapshot refreshed: {stats}")
+        return stats
+    
+    except Exception as e:
+        logger.error(f"❌ Snapshot refresh failed: {e}")
+        return {"status": "error", "error": str(e)}
+
+def offline_report() -> str:
+    """Summary report read from the local snapshot only (no Notion or App Script calls)."""
+    service = ReminderService()
+    return service.get_summary_report(include_sync_report=True, snapshot=SnapshotStore())
+
 def test_app_script_setup():
     """
     Quick test function to verify App Script integration is working.
@@ -148,8 +206,72 @@ def test_app_script_setup():
         return False
 
 if __name__ == "__main__":
-    # For manual execution
-    main()
+    parser = argparse.ArgumentParser(description="Reminder application with App Script integration")
+    subparsers = parser.add_subparsers(dest="command")
+    sync_parser = subparsers.add_parser("sync", help="Synchronize Notion with Google Forms (no reminders)")
+    sync_parser.add_argument("--form", help="Notion form ID (default: all forms)")
+    sync_parser.add_argument("--dry-run", action="store_true", help="Print the change plan, write nothing")
+    sync_parser.add_argument("--full", action="store_true", help="Re-read every Notion row and compare every form")
+    refresh_parser = subparsers.add_parser("refresh-snapshot", help="Update the local SQLite snapshot")
+    refresh_parser.add_argument("--full", action="store_true", help="Re-read every Notion row")
+    subparsers.add_parser("report", help="Print the summary report from the local snapshot")
+    remind_parser = subparsers.add_parser("remind", help="Synchronize, then send reminders to non-responders")
+    remind_parser.add_argument("--form", help="Notion form ID (default: all forms)")
+    remind_parser.add_argument("--resume", action="store_true", help="Continue the last unfinished run")
+    remind_parser.add_argument("--no-sync", action="store_true", help="Skip the App Script synchronization")
+    remind_parser.add_argument("--min-days", type=float, help="Skip people reminded less than N days ago")
+    subparsers.add_parser("runs", help="List the latest journaled reminder runs")
+    schedule_parser = subparsers.add_parser("schedule", help="Send each reminder when it is due (runs until stopped)")
+    schedule_parser.add_argument("--once", action="store_true", help="Run a single tick and exit")
+    serve_parser = subparsers.add_parser("serve", help="Run the webhook server (/sync, /remind, /health)")
+    serve_parser.add_argument("--host", help="Listen address (default: WEBHOOK_HOST)")
+    serve_parser.add_argument("--port", type=int, help="Listen port (default: WEBHOOK_PORT)")
+    serve_parser.add_argument("--insecure", action="store_true",
+                              help="Allow listening beyond localhost without WEBHOOK_SECRET")
+    args = parser.parse_args()
+    
+    if args.command == "sync":
+        service = ReminderService()
+        if args.form:
+            result = service.sync_only_specific_form(args.form, dry_run=args.dry_run)
+        else:
+            result = service.sync_only_all_forms(full_scan=args.full, dry_run=args.dry_run)
+        print(f"\n🔄 App Script Sync Summary: {json.dumps(result, indent=2, ensure_ascii=False)}")
+    elif args.command == "refresh-snapshot":
+        snapshot_refresh_handler(full_scan=args.full)
+    elif args.command == "report":
+        print("\n" + offline_report())
+    elif args.command == "remind":
+        service = ReminderService()
+        if args.form:
+            result = service.send_reminders_for_specific_form(args.form, sync_first=not args.no_sync, resume=args.resume,
+                                                              min_days_since_reminder=args.min_days)
+        else:
+            result = service.send_reminders_for_all_forms(sync_first=not args.no_sync, resume=args.resume,
+                                                          min_days_since_reminder=args.min_days)
+        print(f"\n📊 Complete App Script Summary: {json.dumps(result, indent=2, ensure_ascii=False, default=str)}")
+    elif args.command == "runs":
+        for run in RunJournal().recent_runs():
+            print(f"#{run['id']} {run['scope']} {run['status']} {run['started_at']} -> "
+                  f"{run['finished_at'] or '…'} {run['recipients']}")
+    elif args.command == "schedule":
+        from utils.reminder_scheduler import ReminderScheduler
+        scheduler = ReminderScheduler(ReminderService())
+        if args.once:
+            result = scheduler.tick()
+            print(f"\n⏰ Scheduler Tick: {json.dumps(result, indent=2, ensure_ascii=False, default=str)}")
+        else:
+            try:
+                scheduler.run_forever()
+            except KeyboardInterrupt:
+                logger.info("🛑 Reminder scheduler stopped")
+    elif args.command == "serve":
+        from utils.webhook_server import WebhookServer
+        WebhookServer(get_service(), host=args.host, port=args.port,
+                      allow_insecure=args.insecure or None).serve_forever()
+    else:
+        # For manual execution
+        main()
     
     # For App Script testing (uncomment to test):
     # test_app_script_setup()
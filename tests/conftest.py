@@ -0,0 +1,24 @@
+"""
+Offline test setup: dummy credentials and a throwaway STATE_DIR.
+
+config.config reads the environment at import time, so this runs before any
+test module imports the application.
+"""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+for key, value in {
+    "NOTION_TOKEN": "test",
+    "NOTION_FORMS_DB_ID": "forms-db",
+    "NOTION_PEOPLE_DB_ID": "people-db",
+    "NOTION_RESPONSES_DB_ID": "responses-db",
+    "PAGE_TOKEN": "test",
+    "GOOGLE_APP_SCRIPT_URL": "http://127.0.0.1:9/exec",
+}.items():
+    os.environ.setdefault(key, value)
+os.environ["STATE_DIR"] = tempfile.mkdtemp(prefix="tests-state-")
@@ -0,0 +1,72 @@
+import time
+import pytest
+import requests
+from connections.notion_connection import NotionClient
+from connections.notion_sync_state import NotionSyncState
+
+def page(page_id, edited, responded=False):
+    return {"id": page_id, "last_edited_time": edited,
+            "properties": {"A répondu": {"type": "checkbox", "checkbox": responded}}}
+
+class FakeDatabase:
+    """Serves pages to iter_database_entries; `fail` makes the next reads raise."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.fail = False
+        self.filters = []
+
+    def __call__(self, database_id, filter=None, sorts=None, **kwargs):
+        self.filters.append(filter)
+        if self.fail:
+            raise requests.exceptions.ConnectionError("Notion is down")
+        since = filter["last_edited_time"]["on_or_after"] if filter else None
+        return iter([p for p in self.pages if since is None or p["last_edited_time"] >= since])
+
+@pytest.fixture
+def notion(tmp_path, monkeypatch):
+    notion = NotionClient()
+    notion.sync_state = NotionSyncState(str(tmp_path / "state.sqlite3"))
+    return notion
+
+def load(notion, database, monkeypatch):
+    monkeypatch.setattr(notion, "iter_database_entries", database)
+    return notion.load_database_records("db", notion.extract_response)
+
+def test_failure_without_stored_rows_raises(notion, monkeypatch):
+    database = FakeDatabase([page("r1", "2024-01-01T10:00:00.000Z")])
+    database.fail = True
+    with pytest.raises(requests.exceptions.RequestException):
+        load(notion, database, monkeypatch)
+
+def test_failure_serves_stored_rows_flagged_stale(notion, monkeypatch):
+    database = FakeDatabase([page("r1", "2024-01-01T10:00:00.000Z")])
+    assert [r.id for r in load(notion, database, monkeypatch)] == ["r1"]
+    assert not notion.is_stale("db")
+
+    database.fail = True
+    assert [r.id for r in load(notion, database, monkeypatch)] == ["r1"]
+    assert notion.is_stale("db")
+
+    database.fail = False
+    load(notion, database, monkeypatch)
+    assert not notion.is_stale("db")
+
+def test_full_scan_watermark_is_capped_at_the_scan_start(notion, monkeypatch):
+    # A row edited after the scan started (read late) must not hide rows edited during the scan
+    future = time.strftime("%Y-%m-%dT%H:%M:00.000Z", time.gmtime(time.time() + 3600))
+    database = FakeDatabase([page("r1", "2024-01-01T10:00:00.000Z"), page("r2", future)])
+    load(notion, database, monkeypatch)
+
+    load(notion, database, monkeypatch)
+    since = database.filters[-1]["last_edited_time"]["on_or_after"]
+    assert "2024-01-01T10:00:00.000Z" < since < future
+
+def test_incremental_load_merges_edits(notion, monkeypatch):
+    database = FakeDatabase([page("r1", "2024-01-01T10:00:00.000Z"), page("r2", "2024-01-01T10:00:00.000Z")])
+    load(notion, database, monkeypatch)
+
+    database.pages[1] = page("r2", "2024-01-01T10:00:00.000Z", responded=True)
+    records = {r.id: r for r in load(notion, database, monkeypatch)}
+    assert database.filters[-1] is not None
+    assert records["r2"].has_responded and not records["r1"].has_responded
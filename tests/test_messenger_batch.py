@@ -0,0 +1,78 @@
+import json
+import pytest
+import requests
+from urllib.parse import parse_qs
+from connections.messenger_client import MessengerClient
+
+class FakeBucket:
+    def __init__(self):
+        self.throttled = []
+
+    def on_throttled(self, retry_after=None):
+        self.throttled.append(retry_after)
+
+class FakeResponse:
+    def __init__(self, items, status_code=200):
+        self.items = items
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"HTTP {self.status_code}", response=self)
+
+    def json(self):
+        return self.items
+
+class FakeSession:
+    """Answers each batch POST with the next scripted reply: a function of the recipients, or an exception."""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.batches = []
+        self.bucket = FakeBucket()
+
+    def post(self, url, data):
+        recipients = [json.loads(parse_qs(op["body"])["recipient"][0])["id"] for op in json.loads(data["batch"])]
+        self.batches.append(recipients)
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply(recipients)
+
+def ok(recipient):
+    return {"code": 200, "body": "{}"}
+
+def throttled(recipient):
+    return {"code": 400, "body": json.dumps({"error": {"code": 613, "message": "Calls limited"}})}
+
+@pytest.fixture
+def client():
+    return MessengerClient()
+
+def test_only_throttled_items_are_resent_after_backoff(client):
+    client.session = FakeSession(
+        lambda recipients: FakeResponse([ok(recipients[0]), throttled(recipients[1]),
+                                         {"code": 400, "body": "{}"}]),
+        lambda recipients: FakeResponse([ok(recipient) for recipient in recipients]))
+    results = client.send_many([("a", "hi"), ("b", "hi"), ("c", "hi")], max_retries=2)
+    assert results == [True, True, False]
+    assert client.session.batches == [["a", "b", "c"], ["b"]]
+    assert client.session.bucket.throttled == [1]
+
+def test_unknown_outcomes_are_not_resent(client):
+    client.session = FakeSession(
+        lambda recipients: FakeResponse([None, throttled(recipients[1])]),
+        requests.exceptions.ReadTimeout("timed out"))
+    results = client.send_many([("a", "hi"), ("b", "hi"), ("c", "hi")], max_retries=2)
+    # "a" came back null, "c" was missing from the reply, "b" was lost in transit on its retry
+    assert results == [None, None, None]
+    assert client.session.batches == [["a", "b", "c"], ["b"]]
+
+def test_rejected_batch_is_failed_and_still_throttled_items_give_up(client):
+    client.session = FakeSession(lambda recipients: FakeResponse([], status_code=400))
+    assert client.send_many([("a", "hi")], max_retries=2) == [False]
+
+    client.session = FakeSession(*[lambda recipients: FakeResponse([throttled(recipients[0])])] * 2)
+    assert client.send_many([("a", "hi")], max_retries=1) == [False]
+    assert len(client.session.batches) == 2
+    assert client.session.bucket.throttled == [1, None]
@@ -0,0 +1,78 @@
+import requests
+from config.config import config
+from connections.notion_connection import NotionClient
+from connections.notion_query import NotionQuery
+
+def test_single_condition_is_not_wrapped():
+    query = NotionQuery("db").checkbox("A répondu", False)
+    assert query.filter == {"property": "A répondu", "checkbox": {"equals": False}}
+
+def test_conditions_are_combined_with_and():
+    query = (NotionQuery("db")
+             .checkbox("A répondu", False)
+             .relation_contains("Forms", "form-1")
+             .date_before("Dernier rappel", "2024-01-01T00:00:00Z", or_empty=True))
+    assert query.filter == {"and": [
+        {"property": "A répondu", "checkbox": {"equals": False}},
+        {"property": "Forms", "relation": {"contains": "form-1"}},
+        {"or": [
+            {"property": "Dernier rappel", "date": {"before": "2024-01-01T00:00:00Z"}},
+            {"property": "Dernier rappel", "date": {"is_empty": True}},
+        ]},
+    ]}
+
+def test_empty_query():
+    query = NotionQuery("db")
+    assert query.filter is None and query.sorts == [] and query.properties is None
+
+def test_sorts_and_selected_properties():
+    query = (NotionQuery("db")
+             .sort_by("Dernier rappel")
+             .sort_by(timestamp="last_edited_time", descending=True)
+             .select("Forms", "A répondu"))
+    assert query.sorts == [{"property": "Dernier rappel", "direction": "ascending"},
+                           {"timestamp": "last_edited_time", "direction": "descending"}]
+    assert query.properties == ["Forms", "A répondu"]
+
+def test_rollup_condition():
+    query = NotionQuery("db").rollup_not_empty("PSID")
+    assert query.filter == {"property": "PSID", "rollup": {"any": {"rich_text": {"is_not_empty": True}}}}
+
+def test_non_responders_query(monkeypatch):
+    notion = NotionClient()
+    monkeypatch.setattr(config, "notion_psid_rollup", None)
+    query = notion.non_responders_query("form-1")
+    assert query.database_id == config.notion_responses_db_id
+    assert query.filter == {"and": [
+        {"property": "A répondu", "checkbox": {"equals": False}},
+        {"property": "Forms", "relation": {"contains": "form-1"}},
+    ]}
+    assert query.sorts == [{"property": "Dernier rappel", "direction": "ascending"}]
+
+    monkeypatch.setattr(config, "notion_psid_rollup", "PSID (rollup)")
+    conditions = notion.non_responders_query("form-1", reminded_before="2024-01-01T00:00:00Z").filter["and"]
+    assert len(conditions) == 4
+    assert conditions[-1]["property"] == "PSID (rollup)"
+
+class SchemaResponse:
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"properties": {"Forms": {"id": "a%3Bb"}, "A répondu": {"id": "c"}}}
+
+def test_failed_schema_read_is_retried(monkeypatch):
+    notion = NotionClient()
+    calls = []
+
+    def get(url, **kwargs):
+        calls.append(url)
+        if len(calls) == 1:
+            raise requests.exceptions.ConnectionError("down")
+        return SchemaResponse()
+
+    monkeypatch.setattr(notion.session, "get", get)
+    assert notion.get_property_ids("db") is None
+    assert notion.get_property_ids("db") == {"Forms": "a%3Bb", "A répondu": "c"}
+    assert notion.get_property_ids("db") == {"Forms": "a%3Bb", "A répondu": "c"}
+    assert len(calls) == 2
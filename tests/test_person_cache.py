@@ -0,0 +1,12 @@
+from connections.notion_records import PersonRecord
+from connections.person_cache import PersonCache
+
+def test_forced_revalidation_ignores_the_interval():
+    cache = PersonCache(revalidate_seconds=3600)
+    # Nothing was cached before the first check
+    assert cache.revalidation_due() is None
+    cache.put(PersonRecord.from_dict({"id": "alice", "name": "Alice", "email": "alice@example.com"}))
+
+    assert cache.revalidation_due() is None
+    since = cache.revalidation_due(force=True)
+    assert since is not None and since.endswith("Z")
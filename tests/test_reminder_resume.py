@@ -0,0 +1,115 @@
+import pytest
+from connections.notion_records import PersonRecord
+from connections.run_journal import RunJournal
+from utils.reminder_service import ReminderService
+
+class FakeMessenger:
+    """Records sends; PSIDs in `failing` are not delivered."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.sent = []
+
+    def send_message(self, psid, message):
+        self.sent.append(psid)
+        return psid not in self.failing
+
+    def send_many(self, messages):
+        return [self.send_message(psid, message) for psid, message in messages]
+
+@pytest.fixture
+def journal(tmp_path):
+    return RunJournal(str(tmp_path / "journal.sqlite3"))
+
+@pytest.fixture
+def service(journal, monkeypatch):
+    service = ReminderService(journal=journal)
+    service.messenger = FakeMessenger()
+    service.written = []
+
+    def update_page_properties(page_id, properties):
+        service.written.append((page_id, tuple(properties)))
+        return True
+
+    monkeypatch.setattr(service.notion, "update_page_properties", update_page_properties)
+    return service
+
+def job(response_id, psid=None):
+    person = PersonRecord.from_dict({"id": f"person-{response_id}", "name": response_id,
+                                     "psid": psid if psid is not None else f"psid-{response_id}", "email": ""})
+    return "Form", {"non_responder": person, "ID_reponse": response_id, "Name_person": person.name}, None
+
+def outcome(response_id, delivered=False):
+    return {"form_name": "Form", "response_id": response_id, "name": response_id,
+            "delivered": delivered, "dernier_rappel_updated": None, "error": None if delivered else "Send failed"}
+
+def interrupted_run(journal):
+    """A run that stopped with r1 being sent, r2 delivered without its 'Dernier rappel' write and r3 failed."""
+    run_id = journal.start_run("ALL", "Hello")
+    journal.complete_stage(run_id, "sync")
+    journal.mark_sending(run_id, [outcome("r1"), outcome("r2"), outcome("r3")])
+    journal.record_deliveries(run_id, [outcome("r2", delivered=True), outcome("r3")])
+    journal.record_dernier_rappel(run_id, {"r2": False})
+    return run_id
+
+def test_deliveries_are_journaled(service, journal):
+    service.messenger.failing = {"psid-r2"}
+    outcomes = service.deliver_reminders([job("r1"), job("r2"), job("r3", psid="")])
+
+    assert [o["delivered"] for o in outcomes] == [True, False, False]
+    assert outcomes[2]["error"] == ReminderService.NO_PSID
+    run = journal.recent_runs()[0]
+    assert run["status"] == "done"
+    recipients = journal.recipients(run["id"])
+    assert {rid: r["state"] for rid, r in recipients.items()} == {"r1": "delivered", "r2": "failed", "r3": "failed"}
+    assert recipients["r1"]["dernier_rappel_updated"] == 1
+    assert service.written == [("r1", ("Dernier rappel",))]
+
+def test_resume_continues_the_unfinished_run(service, journal):
+    run_id = interrupted_run(journal)
+    run = service._begin_run("ALL", None, resume=True)
+
+    assert run["id"] == run_id and run["resumed"]
+    assert run["custom_message"] == "Hello"
+    assert run["unrecorded_reminders"] == ["r2"]
+
+def test_resume_skips_sending_and_delivered_and_retries_failed(service, journal):
+    run_id = interrupted_run(journal)
+    run = service._begin_run("ALL", None, resume=True)
+
+    jobs, skipped = service._skip_journaled(run, [job("r1"), job("r2"), job("r3"), job("r4")])
+    assert skipped == 2
+    assert [j[1]["ID_reponse"] for j in jobs] == ["r3", "r4"]
+
+    service._run_delivery_pipeline(jobs, run["custom_message"], run["id"], run["unrecorded_reminders"])
+    assert sorted(service.messenger.sent) == ["psid-r3", "psid-r4"]
+    # The 'Dernier rappel' of r2, delivered before the interruption, is written again
+    assert sorted(page_id for page_id, _ in service.written) == ["r2", "r3", "r4"]
+
+    recipients = journal.recipients(run_id)
+    assert recipients["r1"]["state"] == "sending"
+    assert {rid: recipients[rid]["state"] for rid in ("r2", "r3", "r4")} == dict.fromkeys(("r2", "r3", "r4"), "delivered")
+    assert all(recipients[rid]["dernier_rappel_updated"] == 1 for rid in ("r2", "r3", "r4"))
+
+def test_new_run_abandons_unfinished_runs(service, journal):
+    old_run = interrupted_run(journal)
+    run = service._begin_run("ALL", None, resume=False)
+
+    assert run["id"] != old_run and not run["resumed"]
+    assert run["recipients"] == {} and run["unrecorded_reminders"] == []
+    statuses = {r["id"]: r["status"] for r in journal.recent_runs()}
+    assert statuses == {old_run: "abandoned", run["id"]: "running"}
+
+def test_resume_without_unfinished_run_starts_a_new_one(service, journal):
+    finished = journal.start_run("ALL")
+    journal.finish_run(finished)
+    run = service._begin_run("ALL", "Hi", resume=True)
+
+    assert run["id"] != finished and not run["resumed"]
+    assert run["custom_message"] == "Hi"
+
+def test_resume_is_scoped_to_the_form(service, journal):
+    interrupted_run(journal)
+    run = service._begin_run("form-1", None, resume=True)
+    assert not run["resumed"]
+    assert journal.unfinished_run("ALL") is not None
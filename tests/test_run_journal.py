@@ -0,0 +1,51 @@
+from connections.run_journal import RunJournal
+
+def outcome(response_id, delivered=False, error=None):
+    return {"form_name": "Form", "response_id": response_id, "name": response_id,
+            "delivered": delivered, "dernier_rappel_updated": None, "error": error}
+
+def test_recipient_states(tmp_path):
+    journal = RunJournal(str(tmp_path / "journal.sqlite3"))
+    run_id = journal.start_run("ALL")
+
+    journal.mark_sending(run_id, [outcome("r1"), outcome("r2"), outcome("r3"), outcome("r4")])
+    journal.record_deliveries(run_id, [outcome("r2", delivered=True), outcome("r3", error="Send failed"),
+                                       outcome("r4", delivered=None, error="Delivery unknown")])
+    journal.record_dernier_rappel(run_id, {"r2": False})
+
+    recipients = journal.recipients(run_id)
+    assert {rid: r["state"] for rid, r in recipients.items()} == {"r1": "sending", "r2": "delivered", "r3": "failed",
+                                                                   "r4": "unknown"}
+    assert recipients["r2"]["dernier_rappel_updated"] == 0
+    assert recipients["r3"]["error"] == "Send failed"
+    assert journal.recent_runs()[0]["recipients"] == {"sending": 1, "delivered": 1, "failed": 1, "unknown": 1}
+
+def test_outcomes_without_response_id_are_not_journaled(tmp_path):
+    journal = RunJournal(str(tmp_path / "journal.sqlite3"))
+    run_id = journal.start_run("ALL")
+    journal.mark_sending(run_id, [outcome(None)])
+    assert journal.recipients(run_id) == {}
+
+def test_unfinished_runs_are_scoped(tmp_path):
+    journal = RunJournal(str(tmp_path / "journal.sqlite3"))
+    all_run = journal.start_run("ALL", "message")
+    form_run = journal.start_run("form-1")
+
+    assert journal.unfinished_run("ALL")["id"] == all_run
+    assert journal.unfinished_run("ALL")["custom_message"] == "message"
+
+    journal.abandon_runs("ALL")
+    assert journal.unfinished_run("ALL") is None
+    assert journal.unfinished_run("form-1")["id"] == form_run
+
+    journal.finish_run(form_run)
+    assert journal.unfinished_run("form-1") is None
+    assert {run["id"]: run["status"] for run in journal.recent_runs()} == {all_run: "abandoned", form_run: "done"}
+
+def test_stages(tmp_path):
+    journal = RunJournal(str(tmp_path / "journal.sqlite3"))
+    run_id = journal.start_run("ALL")
+    assert not journal.stage_completed(run_id, "sync")
+    journal.complete_stage(run_id, "sync", {"updated": 3})
+    assert journal.stage_completed(run_id, "sync")
+    assert not journal.stage_completed(journal.start_run("ALL"), "sync")
@@ -0,0 +1,50 @@
+from connections.notion_records import PersonRecord, ResponseRecord
+from utils.sync_plan import build_sync_plan
+
+def person(person_id, email):
+    return PersonRecord.from_dict({"id": person_id, "name": person_id.title(), "psid": "", "email": email})
+
+def response(response_id, person_id=None, has_responded=False):
+    return ResponseRecord.from_dict({"id": response_id, "form_ids": ["form"], "has_responded": has_responded,
+                                     "person_ids": [person_id] if person_id else []})
+
+PEOPLE = {
+    "alice": person("alice", " Alice@Example.com "),
+    "bob": person("bob", "bob@example.com"),
+    "carol": person("carol", "carol@example.com"),
+    "dan": person("dan", ""),
+}
+
+def plan_for(google_emails, responses):
+    return build_sync_plan("form", "Form", set(google_emails), responses, PEOPLE.get)
+
+def test_marks_only_unchecked_rows_of_google_respondents():
+    plan = plan_for({"alice@example.com", "bob@example.com"}, [
+        response("r-alice", "alice"),
+        response("r-bob", "bob", has_responded=True),
+        response("r-carol", "carol"),
+    ])
+    assert list(plan.pending_updates) == ["r-alice"]
+    # The raw Notion email is reported, the comparison is normalized
+    assert plan.summary()["to_mark_responded"] == [" Alice@Example.com "]
+    assert plan.people_checked == 3
+
+def test_reports_rows_that_need_attention():
+    plan = plan_for({"alice@example.com"}, [
+        response("r-carol", "carol", has_responded=True),
+        response("r-dan", "dan"),
+        response("r-none"),
+        response("r-ghost", "ghost"),
+    ])
+    assert plan.pending_updates == {}
+    assert plan.summary() == {
+        "to_mark_responded": [],
+        "responded_not_in_google": ["carol@example.com"],
+        "missing_email": ["Dan"],
+        "missing_person": 2
+    }
+    assert (plan.google_responses, plan.notion_responses, plan.people_checked) == (1, 4, 1)
+
+def test_every_row_of_a_person_is_marked():
+    plan = plan_for({"bob@example.com"}, [response("r1", "bob"), response("r2", "bob")])
+    assert sorted(plan.pending_updates) == ["r1", "r2"]
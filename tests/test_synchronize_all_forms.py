@@ -0,0 +1,37 @@
+from types import SimpleNamespace
+from connections.form_fingerprints import FormFingerprints
+from connections.notion_records import FormRecord
+from utils.synchronizer_service import SynchronizerService
+
+class FakeNotion:
+    def build_responses_index(self, full_scan=False):
+        return SimpleNamespace(stale=False)
+
+    def build_people_directory(self, full_scan=False):
+        return SimpleNamespace(stale=False)
+
+    def revalidate_person_cache(self, force=False):
+        pass
+
+def form(form_id, name, google_form_id="google"):
+    return FormRecord.from_dict({"id": form_id, "name": name, "google_form_id": google_form_id})
+
+def test_forms_sharing_a_name_are_kept_apart(tmp_path):
+    fingerprints = FormFingerprints(str(tmp_path / "fingerprints.json"))
+    service = SynchronizerService(FakeNotion(), fingerprints=fingerprints)
+
+    def synchronize_form(form_id, google_form_id, form_name, *args):
+        result = {"status": "success", "people_checked": 1, "updated_count": 0}
+        return result, {}, {"form": form_id}
+    service._synchronize_form = synchronize_form
+
+    try:
+        summary = service.synchronize_all_forms(forms=[form("f1", "Survey"), form("f2", "Survey"),
+                                                       form("f3", "", google_form_id=None)])
+    finally:
+        service.close()
+
+    assert list(summary) == ["f1", "f2", "f3"]
+    assert [result["form_name"] for result in summary.values()] == ["Survey", "Survey", ""]
+    assert summary["f3"]["status"] == "skipped"
+    assert fingerprints.get("f1") == {"form": "f1"} and fingerprints.get("f2") == {"form": "f2"}
@@ -0,0 +1,80 @@
+import threading
+import pytest
+from utils.trigger_coalescer import TriggerCoalescer
+
+class BlockingJob:
+    """Counts calls; each call blocks until released."""
+
+    def __init__(self):
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        assert self.release.wait(5)
+        return self.calls
+
+@pytest.fixture
+def coalescer():
+    coalescer = TriggerCoalescer(debounce=0)
+    yield coalescer
+    coalescer.shutdown()
+
+def test_triggers_within_the_debounce_window_share_one_run():
+    coalescer = TriggerCoalescer(debounce=0.2)
+    calls = []
+    flights = [coalescer.submit("sync:ALL", lambda: calls.append(1) or len(calls)) for _ in range(3)]
+
+    assert flights[0] is flights[1] is flights[2]
+    assert flights[0].triggers == 3
+    assert flights[0].future.result(5) == 1
+    assert len(calls) == 1
+    coalescer.shutdown()
+
+def test_keys_are_independent(coalescer):
+    first, second = BlockingJob(), BlockingJob()
+    a = coalescer.submit("sync:form-1", first)
+    b = coalescer.submit("sync:form-2", second)
+    assert a is not b
+    first.release.set()
+    second.release.set()
+    assert a.future.result(5) == b.future.result(5) == 1
+
+def test_triggers_during_a_run_fold_into_one_follow_up(coalescer):
+    job = BlockingJob()
+    running = coalescer.submit("sync:ALL", job)
+    assert job.started.wait(5)
+
+    follow_up = coalescer.submit("sync:ALL", job)
+    assert coalescer.submit("sync:ALL", job) is follow_up
+    assert follow_up is not running and follow_up.triggers == 2
+
+    job.release.set()
+    assert running.future.result(5) == 1
+    assert follow_up.future.result(5) == 2
+    assert job.calls == 2
+
+def test_without_follow_up_triggers_share_the_running_run(coalescer):
+    job = BlockingJob()
+    running = coalescer.submit("remind:ALL", job, follow_up=False)
+    assert job.started.wait(5)
+
+    assert coalescer.submit("remind:ALL", job, follow_up=False) is running
+    assert running.triggers == 2
+    job.release.set()
+    assert running.future.result(5) == 1
+    assert job.calls == 1
+
+def test_errors_reach_every_folded_trigger():
+    coalescer = TriggerCoalescer(debounce=0.2)
+
+    def fail():
+        raise ValueError("boom")
+
+    flight = coalescer.submit("sync:ALL", fail)
+    assert coalescer.submit("sync:ALL", fail) is flight
+    with pytest.raises(ValueError):
+        coalescer.run("sync:ALL", fail)
+    coalescer.shutdown()
@@ -0,0 +1,120 @@
+"""
+Local stand-in for the "Link Forms - Notion" App Script web app.
+
+Serves form responses from a JSON file with the same protocol as the
+deployed script, so the synchronization can be run without Google:
+
+    GET ?formId=<id>              -> every response of the form
+    GET ?formId=<id>&since=<c>    -> responses submitted on or after cursor <c>
+
+Both answer {"emails": [...], "people": [{email, firstName, lastName, timestamp}],
+"cursor": <latest timestamp>, "full": <true when every response is listed>}
+with an ETag, and 304 Not Modified when If-None-Match still matches.
+
+The data file maps each form ID to its responses, for example
+{"1FAIpQL...": [{"email": "a@b.fr", "firstName": "A", "timestamp": "2025-09-01T12:00:00.000Z"}]}
+and is re-read on every request so it can be edited while the server runs.
+
+Usage:
+    python -m utils.app_script_standin responses.json --port 8080
+    GOOGLE_APP_SCRIPT_URL=http://127.0.0.1:8080/exec
+"""
+import argparse
+import hashlib
+import json
+import logging
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, List, Optional
+from urllib.parse import urlparse, parse_qs
+
+logger = logging.getLogger(__name__)
+
+def build_payload(responses: List[Dict], since: Optional[str] = None) -> Dict:
+    """Build the App Script answer for a form's responses, optionally since a cursor."""
+    # ISO 8601 UTC timestamps compare correctly as strings
+    selected = [r for r in responses if since is None or (r.get("timestamp") or "") >= since]
+
+    people = {}
+    for response in sorted(selected, key=lambda r: r.get("timestamp") or ""):
+        email = (response.get("email") or "").lower().strip()
+        if email:
+            # Latest response of each respondent wins
+            people[email] = {
+                "email": email,
+                "firstName": response.get("firstName", ""),
+                "lastName": response.get("lastName", ""),
+                "timestamp": response.get("timestamp")
+            }
+
+    timestamps = [r["timestamp"] for r in selected if r.get("timestamp")]
+    return {
+        "emails": list(people),
+        "people": list(people.values()),
+        "cursor": max(timestamps) if timestamps else since,
+        "full": since is None
+    }
+
+class AppScriptStandinHandler(BaseHTTPRequestHandler):
+    data_path = "responses.json"
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def _send_json(self, payload: Dict, etag: Optional[str] = None):
+        body = json.dumps(payload).encode("utf-8")
+        # Apps Script web apps always answer 200, errors are in the body
+        self.send_response(200)
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        form_id = query.get("formId", [None])[0]
+        since = query.get("since", [None])[0]
+        if not form_id:
+            return self._send_json({"error": "missing formId"})
+
+        try:
+            with open(self.data_path, encoding="utf-8") as f:
+                forms = json.load(f)
+        except (OSError, ValueError) as e:
+            return self._send_json({"error": f"cannot read {self.data_path}: {e}"})
+
+        if form_id not in forms:
+            return self._send_json({"error": f"form not found: {form_id}"})
+
+        payload = build_payload(forms[form_id], since)
+        etag = '"' + hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()[:32] + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        logger.info(f"📤 Form {form_id}: {len(payload['people'])} respondent(s)" + (f" since {since}" if since else ""))
+        self._send_json(payload, etag)
+
+def serve(data_path: str, host: str = "127.0.0.1", port: int = 8080):
+    """Serve the stand-in until interrupted."""
+    AppScriptStandinHandler.data_path = data_path
+    server = ThreadingHTTPServer((host, port), AppScriptStandinHandler)
+    logger.info(f"🧪 App Script stand-in serving {data_path} on http://{host}:{port}/exec")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Local stand-in for the App Script web app")
+    parser.add_argument("data", help="JSON file mapping form IDs to their responses")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+    serve(args.data, args.host, args.port)
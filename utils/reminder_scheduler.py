@@ -0,0 +1,223 @@
+import heapq
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Any, Tuple
+from config.config import config
+from connections.notion_records import FormRecord, ResponseRecord, parse_notion_time
+from utils.reminder_service import ReminderService
+
+logger = logging.getLogger(__name__)
+
+DAY = 86400
+
+class ReminderScheduler:
+    """
+    Sends each reminder when it is due instead of reminding everyone on every run.
+
+    A response row that has not been answered is due `cadence` days after its
+    last reminder ('Dernier rappel'), or after the form's 'Date envoi' when it
+    was never reminded (right away when the form has no date). The cadence is
+    the form's optional 'Cadence relance' column, else REMINDER_CADENCE_DAYS.
+
+    Due times are kept in a min-heap. The forms and responses databases are
+    re-read (incrementally) every SCHEDULER_REFRESH_INTERVAL seconds and only
+    rows whose page changed are rescheduled. A tick with nothing due makes no
+    API call; otherwise only the due forms are synchronized and only the due
+    rows are reminded.
+    """
+
+    SCOPE = "SCHEDULED"
+
+    def __init__(self, service: Optional[ReminderService] = None, refresh_interval: Optional[int] = None):
+        self.service = service or ReminderService()
+        self.notion = self.service.notion
+        self.refresh_interval = config.scheduler_refresh_interval if refresh_interval is None else refresh_interval
+        # (due time, response ID); entries superseded in `_entries` are skipped when popped
+        self._heap: List[Tuple[float, str]] = []
+        # {response_id: (due time, form ID, version)} where version identifies the row and form pages used
+        self._entries: Dict[str, Tuple[float, str, Tuple]] = {}
+        self._forms: Dict[str, FormRecord] = {}
+        self._last_refresh: Optional[float] = None
+
+    # ----- Due times -----
+
+    def cadence_seconds(self, form: FormRecord) -> float:
+        days = form.cadence_days if form.cadence_days and form.cadence_days > 0 else config.reminder_cadence_days
+        return days * DAY
+
+    def due_time(self, response: ResponseRecord, form: FormRecord) -> float:
+        """When the next reminder of a response row is due (epoch seconds)."""
+        last = parse_notion_time(response.dernier_rappel) or parse_notion_time(form.date_envoi)
+        if last is None:
+            return 0.0
+        return last + self.cadence_seconds(form)
+
+    def _schedule(self, response_id: str, due: float, form_id: str, version: Tuple):
+        self._entries[response_id] = (due, form_id, version)
+        heapq.heappush(self._heap, (due, response_id))
+
+    def next_due(self) -> Optional[float]:
+        """Due time of the earliest scheduled reminder, if any."""
+        while self._heap:
+            due, response_id = self._heap[0]
+            entry = self._entries.get(response_id)
+            if entry is not None and entry[0] == due:
+                return due
+            heapq.heappop(self._heap)
+        return None
+
+    def _pop_due(self, now: float) -> Dict[str, str]:
+        """Remove and return the reminders due at `now` as {response_id: form_id}."""
+        due_rows = {}
+        while True:
+            due = self.next_due()
+            if due is None or due > now:
+                return due_rows
+            _, response_id = heapq.heappop(self._heap)
+            due_rows[response_id] = self._entries[response_id][1]
+
+    # ----- Refresh -----
+
+    def refresh(self, full_scan: bool = False) -> Dict[str, int]:
+        """
+        Re-read the forms and responses databases (incrementally) and reschedule changed rows.
+
+        Returns:
+            Number of rows scheduled, rescheduled and dropped
+        """
+        forms = self.notion.load_database_records(config.notion_forms_db_id, self.notion.extract_form,
+                                                  full_scan=full_scan)
+        responses = self.notion.load_database_records(config.notion_responses_db_id, self.notion.extract_response,
+                                                      full_scan=full_scan)
+        self._forms = {form.id: form for form in forms}
+        self._last_refresh = time.time()
+
+        stats = {"scheduled": 0, "rescheduled": 0, "dropped": 0}
+        seen = set()
+        for response in responses:
+            form = next((self._forms[form_id] for form_id in response.form_ids if form_id in self._forms), None)
+            if response.has_responded or form is None or not response.person_id:
+                continue
+            seen.add(response.id)
+
+            version = (response.last_edited_time, form.last_edited_time)
+            entry = self._entries.get(response.id)
+            if entry is not None and entry[2] == version:
+                continue
+            stats["rescheduled" if entry else "scheduled"] += 1
+            self._schedule(response.id, self.due_time(response, form), form.id, version)
+
+        for response_id in set(self._entries) - seen:
+            del self._entries[response_id]
+            stats["dropped"] += 1
+
+        next_due = self.next_due()
+        logger.info(f"🗓️  Scheduler refreshed: {len(self._entries)} pending reminder(s), "
+                    f"{stats['scheduled']} new, {stats['rescheduled']} rescheduled, {stats['dropped']} dropped; "
+                    f"next due {self._format_time(next_due)}")
+        return stats
+
+    @staticmethod
+    def _format_time(when: Optional[float]) -> str:
+        if when is None:
+            return "never"
+        return datetime.fromtimestamp(max(when, 0), timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+
+    # ----- Ticks -----
+
+    def tick(self, now: Optional[float] = None, custom_message: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Send the reminders due at `now`.
+
+        The due forms are synchronized with Google Forms first; rows marked as
+        responded by that synchronization are dropped. Delivered reminders and
+        recipients without a PSID are due again one cadence later; other failures
+        are retried after the next refresh.
+
+        Returns:
+            {"due", "reminders_sent", "forms": {form_name: sent}, "deliveries"}
+        """
+        now = time.time() if now is None else now
+        if self._last_refresh is None or now - self._last_refresh >= self.refresh_interval:
+            self.refresh()
+
+        summary = {"due": 0, "reminders_sent": 0, "forms": {}, "deliveries": []}
+        due_rows = self._pop_due(now)
+        if not due_rows:
+            return summary
+        summary["due"] = len(due_rows)
+
+        rows_by_form: Dict[str, List[str]] = defaultdict(list)
+        for response_id, form_id in due_rows.items():
+            rows_by_form[form_id].append(response_id)
+        logger.info(f"⏰ {len(due_rows)} reminder(s) due across {len(rows_by_form)} form(s)")
+
+        responses_index = self.notion.build_responses_index()
+        people = self.notion.build_people_directory()
+        for form_id in rows_by_form:
+            form = self._forms[form_id]
+            if form.google_form_id:
+                self.service.synchronizer.synchronize_single_form(form_id, form.google_form_id, form.name,
+                                                                  responses_index, people)
+
+        # Re-read the rows the synchronization just edited
+        responses = {response.id: response for response in self.notion.load_database_records(
+            config.notion_responses_db_id, self.notion.extract_response)}
+        if self.notion.is_stale(config.notion_responses_db_id):
+            logger.warning("⚠️  Notion could not be read, due reminders postponed to the next refresh")
+            for response_id in due_rows:
+                _, form_id, version = self._entries[response_id]
+                self._schedule(response_id, now + self.refresh_interval, form_id, version)
+            return summary
+        jobs = []
+        for form_id, response_ids in rows_by_form.items():
+            form = self._forms[form_id]
+            for response_id in response_ids:
+                response = responses.get(response_id)
+                person = self.notion.resolve_person(response.person_id, people) \
+                    if response is not None and not response.has_responded and response.person_id else None
+                if person is None:
+                    self._entries.pop(response_id, None)
+                    continue
+                jobs.append((form.name, {'non_responder': person, 'ID_reponse': response_id,
+                                         'Name_person': person.name}, form))
+
+        outcomes = self.service.deliver_reminders(jobs, custom_message, scope=self.SCOPE)
+        summary["deliveries"] = outcomes
+        retry_at = now + self.refresh_interval
+        for outcome in outcomes:
+            response_id = outcome["response_id"]
+            due, form_id, version = self._entries[response_id]
+            form = self._forms[form_id]
+            if outcome["delivered"]:
+                summary["reminders_sent"] += 1
+                summary["forms"][form.name] = summary["forms"].get(form.name, 0) + 1
+                self._schedule(response_id, now + self.cadence_seconds(form), form_id, version)
+            elif outcome["error"] in (ReminderService.NO_PSID, ReminderService.DELIVERY_UNKNOWN):
+                # Retrying soon cannot help (or may message twice): try again one cadence later
+                self._schedule(response_id, now + self.cadence_seconds(form), form_id, version)
+            else:
+                self._schedule(response_id, retry_at, form_id, version)
+
+        logger.info(f"⏰ Tick: {summary['reminders_sent']}/{len(jobs)} due reminder(s) sent; "
+                    f"next due {self._format_time(self.next_due())}")
+        return summary
+
+    def run_forever(self, stop: Optional[threading.Event] = None):
+        """Tick whenever a reminder is due or a refresh is needed, until `stop` is set."""
+        stop = stop or threading.Event()
+        logger.info(f"🗓️  Reminder scheduler started (refresh every {self.refresh_interval}s)")
+        while not stop.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error(f"❌ Scheduler tick failed: {e}")
+            now = time.time()
+            wake_at = (self._last_refresh or now) + self.refresh_interval
+            next_due = self.next_due()
+            if next_due is not None:
+                wake_at = min(wake_at, next_due)
+            stop.wait(min(max(wake_at - now, 1.0), self.refresh_interval))
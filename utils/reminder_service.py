@@ -1,83 +1,336 @@
 import logging
-from typing import List, Dict, Optional, Any
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Optional, Any, Tuple
+from config.config import config
 from connections.notion_connection import NotionClient
 from connections.messenger_client import MessengerClient
+from connections.notion_write_buffer import NotionWriteBuffer
+from connections.notion_indexes import FormsRegistry
+from connections.notion_records import FormRecord, PersonRecord
+from connections.run_journal import RunJournal
+from connections.snapshot_store import SnapshotStore
 from utils.synchronizer_service import SynchronizerService
 
 logger = logging.getLogger(__name__)
 
 class ReminderService:
-    def __init__(self):
+    # Outcome error of recipients without a PSID: resending cannot succeed until People is edited
+    NO_PSID = "No PSID"
+    # Outcome error of batch sends that may have been delivered: they must not be sent again
+    DELIVERY_UNKNOWN = "Delivery unknown"
+    
+    def __init__(self, journal: Optional[RunJournal] = None):
         self.notion = NotionClient()
         self.messenger = MessengerClient()
-        self.synchronizer = SynchronizerService()
+        self.synchronizer = SynchronizerService(self.notion)
+        self.journal = journal or RunJournal()
     
-    def send_reminders_for_all_forms(self, custom_message: Optional[str] = None, sync_first: bool = True) -> Dict[str, Any]:
+    def send_reminders_for_all_forms(self, custom_message: Optional[str] = None, sync_first: bool = True,
+                                     resume: bool = False, min_days_since_reminder: Optional[float] = None) -> Dict[str, Any]:
         """
         Send reminders for all forms. Returns summary of sync and sent messages.
         
+        summary["reminders"] maps each form to its number of delivered reminders and
+        summary["deliveries"] holds one outcome per recipient (delivered, error,
+        'Dernier rappel' write status); `delivered` is None when a batch send may
+        have gone out without being confirmed.
+        
+        Every run is journaled (see RunJournal); with `resume`, the last unfinished
+        run continues where it stopped: completed stages are skipped and nobody it
+        already messaged is messaged again.
+        
         Args:
             custom_message: Optional custom message template
             sync_first: Whether to synchronize with Google Forms via App Script first
+            resume: Continue the last unfinished run instead of starting a new one
+            min_days_since_reminder: Skip people reminded less than this many days ago
         """
-        summary = {"sync_results": None, "reminders": {}}
+        run = self._begin_run("ALL", custom_message, resume)
+        custom_message = run["custom_message"]
+        summary = {"run_id": run["id"], "resumed": run["resumed"], "sync_results": None,
+                   "reminders": {}, "deliveries": [], "skipped": 0}
+        
+        # The forms database is read once for the whole run
+        forms = self.notion.load_forms_registry()
         
         # Step 1: Synchronize with Google Forms via App Script first (if enabled)
-        if sync_first:
+        if sync_first and self.journal.stage_completed(run["id"], "sync"):
+            logger.info(f"⏭️  Synchronization already completed by run {run['id']}, skipping")
+        elif sync_first:
             logger.info("🔄 Starting App Script synchronization before sending reminders")
-            sync_results = self.synchronizer.synchronize_all_forms()
+            sync_results = self.synchronizer.synchronize_all_forms(forms=forms)
             summary["sync_results"] = sync_results
             
             # Log sync summary
             total_updated = sum(result.get("updated_count", 0) for result in sync_results.values() 
                               if isinstance(result, dict))
             logger.info(f"✅ App Script synchronization completed: {total_updated} responses updated")
+            self.journal.complete_stage(run["id"], "sync", {"updated": total_updated})
         
         # Step 2: Send reminders based on updated data
-        all_non_responders = self.notion.get_all_non_responders()
-        
-        # Get form details for personalized messages
-        all_forms = self.notion.get_all_forms()
-        forms_data = {}
-        for form in all_forms:
-            form_id = form["id"]
-            form_name = self.notion.get_property_content(form, self.notion.columns.FORM_NAME)
-            google_form_id = self.notion.get_property_content(form, self.notion.columns.GOOGLE_FORM_ID)
-            form_url = f"https://docs.google.com/forms/d/{google_form_id}/viewform" if google_form_id else None
-            forms_data[form_name] = {
-                "date_envoi": self.notion.get_property_content(form, self.notion.columns.DATE_ENVOI),
-                "id": form_id,
-                "google_form_id": google_form_id,
-                "url": form_url
-            }
+        all_non_responders = self.notion.get_all_non_responders(forms, self._reminder_cutoff(min_days_since_reminder))
         
+        jobs = []
         for form_name, people in all_non_responders.items():
+            summary["reminders"][form_name] = 0
             if not people:
                 logger.info(f"Form '{form_name}': No reminders needed")
-                summary["reminders"][form_name] = 0
                 continue
             
             # Get form data for this form
-            form_data = forms_data.get(form_name, {})
+            form_data = forms.find_by_name(form_name)
+            jobs.extend((form_name, person_entry, form_data) for person_entry in people)
+        
+        # Step 3: Deliver all reminders concurrently, recording 'Dernier rappel' as they succeed
+        jobs, skipped = self._skip_journaled(run, jobs)
+        summary["skipped"] = skipped
+        outcomes = self._run_delivery_pipeline(jobs, custom_message, run["id"], run["unrecorded_reminders"])
+        summary["deliveries"] = outcomes
+        
+        for outcome in outcomes:
+            if outcome["delivered"]:
+                summary["reminders"][outcome["form_name"]] += 1
+        
+        for form_name, people in all_non_responders.items():
+            if people:
+                logger.info(f"Form '{form_name}': {summary['reminders'][form_name]}/{len(people)} reminders sent")
+        
+        self._finish_run(run)
+        return summary
+    
+    @staticmethod
+    def _reminder_cutoff(min_days_since_reminder: Optional[float]) -> Optional[str]:
+        """ISO 8601 'Dernier rappel' cutoff for a minimum number of days between reminders."""
+        if not min_days_since_reminder:
+            return None
+        cutoff = datetime.now(timezone.utc) - timedelta(days=min_days_since_reminder)
+        return cutoff.isoformat(timespec="seconds").replace("+00:00", "Z")
+    
+    def deliver_reminders(self, jobs: List[Tuple[str, Dict, Optional[FormRecord]]], custom_message: Optional[str] = None,
+                          scope: str = "ALL") -> List[Dict]:
+        """
+        Deliver an explicit list of reminders as one journaled run (no synchronization).
+        
+        Args:
+            jobs: List of (form_name, non-responder entry, form record) tuples
+            custom_message: Optional custom message template
+            scope: Journal scope of the run
             
-            # Send reminders to each person
-            sent_count = 0
-
-            for person_entry in people:
-                person = person_entry.get('non_responder', {})
-                success = self._send_personalized_reminder(person, form_name, form_data, custom_message)
-                if success:
-                    sent_count += 1
-                    response_id = person_entry.get('ID_reponse')
-                    if response_id:
-                        self.notion.update_Dernier_rappel(response_id)
+        Returns:
+            One outcome dict per recipient, in the order of `jobs`
+        """
+        run = self._begin_run(scope, custom_message, resume=False)
+        outcomes = self._run_delivery_pipeline(jobs, custom_message, run["id"])
+        self._finish_run(run)
+        return outcomes
+    
+    def _begin_run(self, scope: str, custom_message: Optional[str], resume: bool) -> Dict[str, Any]:
+        """
+        Open the journaled run of a reminder operation.
+        
+        Returns:
+            {"id", "resumed", "custom_message", "recipients": {response_id: journal row},
+            "unrecorded_reminders": [response IDs delivered without a 'Dernier rappel' write]}
+        """
+        previous = self.journal.unfinished_run(scope) if resume else None
+        if previous is None:
+            if resume:
+                logger.info(f"No unfinished run to resume for {scope}, starting a new one")
+            # A fresh run starts from scratch, older unfinished runs can no longer be resumed
+            self.journal.abandon_runs(scope)
+            return {"id": self.journal.start_run(scope, custom_message), "resumed": False,
+                    "custom_message": custom_message, "recipients": {}, "unrecorded_reminders": []}
+        
+        recipients = self.journal.recipients(previous["id"])
+        logger.info(f"⏯️  Resuming run {previous['id']} ({scope}) started at {previous['started_at']}: "
+                    f"{len(recipients)} recipient(s) already processed")
+        return {
+            "id": previous["id"],
+            "resumed": True,
+            "custom_message": custom_message or previous["custom_message"],
+            "recipients": recipients,
+            "unrecorded_reminders": [response_id for response_id, recipient in recipients.items()
+                                     if recipient["state"] == "delivered" and recipient["dernier_rappel_updated"] != 1]
+        }
+    
+    def _skip_journaled(self, run: Dict[str, Any], jobs: List[Tuple[str, Dict, Optional[FormRecord]]]) -> Tuple[List, int]:
+        """Drop the recipients a resumed run already messaged (or may have). Returns (jobs left, skipped count)."""
+        remaining = []
+        skipped = 0
+        for job in jobs:
+            recipient = run["recipients"].get(job[1].get('ID_reponse'))
+            if recipient is None or recipient["state"] not in RunJournal.DONE_STATES:
+                remaining.append(job)
+                continue
+            skipped += 1
+            if recipient["state"] == "sending":
+                logger.warning(f"⚠️  Run {run['id']} stopped while messaging {recipient['name']}, not sending again")
+            elif recipient["state"] == "unknown":
+                logger.warning(f"⚠️  Run {run['id']} may have messaged {recipient['name']}, not sending again")
+        if skipped:
+            logger.info(f"⏭️  {skipped} recipient(s) already processed by run {run['id']}")
+        return remaining, skipped
+    
+    def _finish_run(self, run: Dict[str, Any]):
+        self.journal.complete_stage(run["id"], "deliveries")
+        self.journal.finish_run(run["id"])
+    
+    def _run_delivery_pipeline(self, jobs: List[Tuple[str, Dict, Optional[FormRecord]]], custom_message: Optional[str] = None,
+                               run_id: Optional[int] = None, unrecorded_reminders: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Send reminders on a bounded worker pool and queue 'Dernier rappel' writes.
+        
+        Each successful delivery queues its 'Dernier rappel' update in a write-behind
+        buffer; the buffer flushes concurrently whenever it fills up, and once more at
+        the end of the stage.
+        
+        Args:
+            jobs: List of (form_name, non-responder entry, form record) tuples
+            custom_message: Optional custom message template
+            run_id: Journaled run recording each recipient before and after sending
+            unrecorded_reminders: Response IDs already messaged whose 'Dernier rappel' write must be retried
             
-            summary["reminders"][form_name] = sent_count
-            logger.info(f"Form '{form_name}': {sent_count}/{len(people)} reminders sent")
+        Returns:
+            One outcome dict per recipient, in the order of `jobs`
+        """
+        unrecorded_reminders = unrecorded_reminders or []
+        if not jobs and not unrecorded_reminders:
+            return []
+        
+        outcomes: List[Optional[Dict]] = [None] * len(jobs)
+        write_buffer = NotionWriteBuffer(self.notion)
+        for response_id in unrecorded_reminders:
+            write_buffer.mark_reminded(response_id)
+        
+        with ThreadPoolExecutor(max_workers=config.reminder_delivery_workers, thread_name_prefix="deliver") as delivery_pool:
+            deliveries = [
+                delivery_pool.submit(self._deliver_journaled_unit, [(position, jobs[position]) for position in unit],
+                                     custom_message, run_id)
+                for unit in self._plan_delivery_units(jobs)
+            ]
+            
+            for future in as_completed(deliveries):
+                for position, outcome in future.result():
+                    outcomes[position] = outcome
+                    if outcome["delivered"] and outcome["response_id"]:
+                        write_buffer.mark_reminded(outcome["response_id"])
+        
+        write_buffer.flush()
+        failed_pages = set(write_buffer.failed)
+        for outcome in outcomes:
+            if outcome["delivered"] and outcome["response_id"]:
+                outcome["dernier_rappel_updated"] = outcome["response_id"] not in failed_pages
+                if not outcome["dernier_rappel_updated"]:
+                    logger.error(f"❌ Failed to update 'Dernier rappel' for response {outcome['response_id']}")
+        
+        if run_id is not None:
+            written = {outcome["response_id"]: outcome["dernier_rappel_updated"]
+                       for outcome in outcomes if outcome["delivered"] and outcome["response_id"]}
+            written.update((response_id, response_id not in failed_pages) for response_id in unrecorded_reminders)
+            self.journal.record_dernier_rappel(run_id, written)
+        
+        return outcomes
+    
+    def _deliver_journaled_unit(self, unit: List[Tuple[int, Tuple[str, Dict, Optional[FormRecord]]]],
+                                custom_message: Optional[str] = None, run_id: Optional[int] = None) -> List[Tuple[int, Dict]]:
+        """Deliver one unit, recording its recipients in the run journal right before and after sending."""
+        if run_id is not None:
+            self.journal.mark_sending(run_id, [self._new_outcome(form_name, entry) for _, (form_name, entry, _) in unit])
+        results = self._deliver_reminder_batch(unit, custom_message)
+        if run_id is not None:
+            self.journal.record_deliveries(run_id, [outcome for _, outcome in results])
+        return results
+    
+    def _plan_delivery_units(self, jobs: List[Tuple[str, Dict, Optional[FormRecord]]]) -> List[List[int]]:
+        """
+        Group job positions into delivery units.
         
-        return summary
+        Forms with at least MESSENGER_BATCH_THRESHOLD non-responders are split into
+        Graph batches; every other reminder is its own unit.
+        """
+        positions_by_form: Dict[str, List[int]] = {}
+        for position, (form_name, _, _) in enumerate(jobs):
+            positions_by_form.setdefault(form_name, []).append(position)
+        
+        batch_size = max(1, min(config.messenger_batch_size, MessengerClient.MAX_BATCH_SIZE))
+        units = []
+        for positions in positions_by_form.values():
+            if len(positions) >= config.messenger_batch_threshold:
+                units.extend(positions[i:i + batch_size] for i in range(0, len(positions), batch_size))
+            else:
+                units.extend([position] for position in positions)
+        return units
     
-    def send_reminders_for_specific_form(self, form_id: str, custom_message: Optional[str] = None, sync_first: bool = True) -> Dict[str, Any]:
+    def _new_outcome(self, form_name: str, person_entry: Dict) -> Dict:
+        return {
+            "form_name": form_name,
+            "response_id": person_entry.get('ID_reponse'),
+            "name": person_entry.get('Name_person', ""),
+            "delivered": False,
+            "dernier_rappel_updated": None,
+            "error": None
+        }
+    
+    def _deliver_reminder_batch(self, unit: List[Tuple[int, Tuple[str, Dict, Optional[FormRecord]]]],
+                                custom_message: Optional[str] = None) -> List[Tuple[int, Dict]]:
+        """Deliver one unit (single send or Graph batch) and describe each outcome (never raises)."""
+        if len(unit) == 1:
+            position, (form_name, entry, form_data) = unit[0]
+            return [(position, self._deliver_reminder(form_name, entry, form_data, custom_message))]
+        
+        results = []
+        sendable = []
+        for position, (form_name, entry, form_data) in unit:
+            outcome = self._new_outcome(form_name, entry)
+            results.append((position, outcome))
+            name, psid, message = self._build_reminder_message(entry['non_responder'], form_name,
+                                                               form_data, custom_message)
+            if not psid:
+                logger.warning(f"No PSID found for {name}")
+                outcome["error"] = self.NO_PSID
+                continue
+            sendable.append((outcome, psid, message))
+        
+        try:
+            delivered = self.messenger.send_many([(psid, message) for _, psid, message in sendable])
+        except Exception as e:
+            logger.error(f"❌ Unexpected error sending reminder batch: {e}")
+            delivered = [None] * len(sendable)
+        
+        for (outcome, _, _), success in zip(sendable, delivered):
+            outcome["delivered"] = success
+            if success:
+                logger.info(f"✅ Personalized reminder sent to {outcome['name']}")
+            elif success is None:
+                outcome["error"] = self.DELIVERY_UNKNOWN
+                logger.warning(f"⚠️  Reminder to {outcome['name']} may have been sent, not sending again")
+            else:
+                outcome["error"] = "Send failed"
+                logger.error(f"❌ Failed to send personalized reminder to {outcome['name']}")
+        return results
+    
+    def _deliver_reminder(self, form_name: str, person_entry: Dict, form_data: Optional[FormRecord],
+                          custom_message: Optional[str] = None) -> Dict:
+        """Send one reminder and describe what happened (never raises)."""
+        person = person_entry['non_responder']
+        outcome = self._new_outcome(form_name, person_entry)
+        
+        if not person.psid:
+            outcome["error"] = self.NO_PSID
+        
+        try:
+            outcome["delivered"] = self._send_personalized_reminder(person, form_name, form_data, custom_message)
+        except Exception as e:
+            logger.error(f"❌ Unexpected error sending reminder to {outcome['name']}: {e}")
+            outcome["error"] = str(e)
+        
+        if not outcome["delivered"] and not outcome["error"]:
+            outcome["error"] = "Send failed"
+        return outcome
+    
+    def send_reminders_for_specific_form(self, form_id: str, custom_message: Optional[str] = None, sync_first: bool = True,
+                                         resume: bool = False, min_days_since_reminder: Optional[float] = None) -> Dict[str, Any]:
         """
         Send reminders for a specific form. Returns summary with sync and reminder info.
         
@@ -85,112 +338,112 @@ class ReminderService:
             form_id: Notion form ID
             custom_message: Optional custom message template
             sync_first: Whether to synchronize with Google Forms via App Script first
+            resume: Continue the last unfinished run of this form instead of starting a new one
+            min_days_since_reminder: Skip people reminded less than this many days ago
         """
-        summary = {"sync_result": None, "reminders_sent": 0}
+        run = self._begin_run(form_id, custom_message, resume)
+        custom_message = run["custom_message"]
+        summary = {"run_id": run["id"], "resumed": run["resumed"], "sync_result": None,
+                   "reminders_sent": 0, "deliveries": [], "skipped": 0}
         
-        # Get form name and Google Form ID
-        form_name = self._get_form_name(form_id)
+        # Get form name and Google Form ID (single page fetch)
+        form_data = FormsRegistry.for_form(self.notion, form_id).get(form_id)
+        form_name = (form_data.name if form_data else "") or "Unknown Form"
         
         # Step 1: Synchronize this specific form first (if enabled)
-        if sync_first:
+        if sync_first and self.journal.stage_completed(run["id"], "sync"):
+            logger.info(f"⏭️  Synchronization already completed by run {run['id']}, skipping")
+        elif sync_first:
             logger.info(f"🔄 Synchronizing form '{form_name}' via App Script before sending reminders")
             
-            # Get Google Form ID from Notion
-            all_forms = self.notion.get_all_forms()
-            google_form_id = None
-            for form in all_forms:
-                if form["id"] == form_id:
-                    google_form_id = self.notion.get_property_content(form, self.notion.columns.GOOGLE_FORM_ID)
-                    break
-            
+            google_form_id = form_data.google_form_id if form_data else None
             if google_form_id:
                 sync_result = self.synchronizer.synchronize_single_form(form_id, google_form_id, form_name)
                 summary["sync_result"] = sync_result
                 logger.info(f"✅ App Script sync completed: {sync_result.get('updated_count', 0)} responses updated")
+                self.journal.complete_stage(run["id"], "sync", {"updated": sync_result.get("updated_count", 0)})
             else:
                 logger.warning(f"⚠️  No Google Form ID found for '{form_name}', skipping sync")
                 summary["sync_result"] = {"status": "skipped", "reason": "No Google Form ID"}
         
-        # Step 2: Send reminders based on updated data
-        non_responders_raw = self.notion.get_non_responders_for_form(form_id)
+        # Step 2: Send reminders based on updated data (persons are read through the cache)
+        self.notion.revalidate_person_cache(force=True)
+        non_responders_raw = self.notion.get_non_responders_for_form(
+            form_id, reminded_before=self._reminder_cutoff(min_days_since_reminder))
         non_responders_list = [d['non_responder'] for d in non_responders_raw if 'non_responder' in d]
 
-        if not non_responders_list:
+        if not non_responders_list and not run["unrecorded_reminders"]:
             logger.info(f"No reminders needed for form '{form_name}'")
+            self._finish_run(run)
             return summary
 
-        # Get form data for personalized messages
-        all_forms = self.notion.get_all_forms()
-        form_data = {}
-        for form in all_forms:
-            if form["id"] == form_id:
-                google_form_id = self.notion.get_property_content(form, self.notion.columns.GOOGLE_FORM_ID)
-                form_data = {
-                    "date_envoi": self.notion.get_property_content(form, self.notion.columns.DATE_ENVOI),
-                    "id": form_id,
-                    "google_form_id": google_form_id,
-                    "url": f"https://docs.google.com/forms/d/{google_form_id}/viewform" if google_form_id else None
-                }
-                break
-
-        sent_count = 0
-
-        for non_responder in non_responders_raw:
-            person = non_responder.get('non_responder', {})
-            response_id = non_responder.get('ID_reponse')
-            name_person = non_responder.get('Name_person')
-
-            success = self._send_personalized_reminder(person, form_name, form_data, custom_message)
-            if success:
-                sent_count += 1
-            success_b = self.notion.update_Dernier_rappel(response_id) if response_id else False
-            if success_b:
-                logger.info(f"✅ Updated 'Dernier Rappel' for response '{name_person}' in Notion")
+        jobs = [(form_name, non_responder, form_data) for non_responder in non_responders_raw]
+        jobs, summary["skipped"] = self._skip_journaled(run, jobs)
+        outcomes = self._run_delivery_pipeline(jobs, custom_message, run["id"], run["unrecorded_reminders"])
+        summary["deliveries"] = outcomes
+        sent_count = sum(1 for outcome in outcomes if outcome["delivered"])
 
         summary["reminders_sent"] = sent_count
         logger.info(f"Sent {sent_count}/{len(non_responders_list)} reminders for form '{form_name}'")
+        self._finish_run(run)
         return summary
     
-    def sync_only_all_forms(self) -> Dict[str, Dict]:
+    def sync_only_all_forms(self, full_scan: bool = False, dry_run: bool = False) -> Dict[str, Dict]:
         """
         Only synchronize all forms via App Script without sending reminders.
         Useful for webhook-triggered sync operations.
+        
+        Args:
+            full_scan: Re-read every Notion row instead of only the rows edited since the last run
+            dry_run: Only plan the changes for review, write nothing to Notion
         """
-        logger.info("🔄 Starting sync-only operation for all forms via App Script")
-        return self.synchronizer.synchronize_all_forms()
+        logger.info("🔄 Starting sync-only operation for all forms via App Script" + (" (dry run)" if dry_run else ""))
+        return self.synchronizer.synchronize_all_forms(full_scan=full_scan, dry_run=dry_run)
     
-    def sync_only_specific_form(self, form_id: str) -> Dict:
+    def sync_only_specific_form(self, form_id: str, dry_run: bool = False) -> Dict:
         """
         Only synchronize a specific form via App Script without sending reminders.
         Useful for webhook-triggered sync operations.
-        """
-        # Get form details
-        form_name = self._get_form_name(form_id)
-        all_forms = self.notion.get_all_forms()
-        google_form_id = None
         
-        for form in all_forms:
-            if form["id"] == form_id:
-                google_form_id = self.notion.get_property_content(form, self.notion.columns.GOOGLE_FORM_ID)
-                break
+        Args:
+            form_id: Notion form ID
+            dry_run: Only plan the changes for review, write nothing to Notion
+        """
+        # Get form details (single page fetch)
+        form = FormsRegistry.for_form(self.notion, form_id).get(form_id)
+        form_name = (form.name if form else "") or "Unknown Form"
+        google_form_id = form.google_form_id if form else None
         
         if not google_form_id:
             logger.warning(f"⚠️  No Google Form ID found for '{form_name}'")
             return {"status": "error", "error": "No Google Form ID found"}
         
         logger.info(f"🔄 Starting sync-only operation for form '{form_name}' via App Script")
-        return self.synchronizer.synchronize_single_form(form_id, google_form_id, form_name)
+        return self.synchronizer.synchronize_single_form(form_id, google_form_id, form_name, dry_run=dry_run)
     
-    def _send_personalized_reminder(self, person: dict, form_name: str, form_data: dict, custom_message: Optional[str] = None) -> bool:
+    def _send_personalized_reminder(self, person: PersonRecord, form_name: str, form_data: Optional[FormRecord],
+                                    custom_message: Optional[str] = None) -> bool:
         """Send personalized reminder to a specific person."""
-        name = self.notion.get_property_content(person, self.notion.columns.PERSON_NAME)
-        psid = self.notion.get_property_content(person, self.notion.columns.PERSON_PSID)
-        date_envoi = form_data.get("date_envoi", "N/A")
+        name, psid, message = self._build_reminder_message(person, form_name, form_data, custom_message)
         
         if not psid:
             logger.warning(f"No PSID found for {name}")
             return False
         
+        success = self.messenger.send_message(psid, message)
+        if success:
+            logger.info(f"✅ Personalized reminder sent to {name}")
+        else:
+            logger.error(f"❌ Failed to send personalized reminder to {name}")
+        return success
+    
+    def _build_reminder_message(self, person: PersonRecord, form_name: str, form_data: Optional[FormRecord],
+                                custom_message: Optional[str] = None) -> Tuple[str, str, str]:
+        """Build the personalized reminder for a person. Returns (name, psid, message)."""
+        name = person.name
+        psid = person.psid
+        date_envoi = form_data.date_envoi if form_data else "N/A"
+        
         # Create personalized message
         if custom_message:
             message = custom_message
@@ -199,22 +452,17 @@ class ReminderService:
             message = f"Hello {name},\n\nPetit rappel pour remplir le formulaire *{form_name}*, diffusé le {date_envoi}."
             
             # Add form link if available
-            if form_data.get("url"):
-                message += f"\n\n Lien du formulaire 👉👉 {form_data['url']}."
+            if form_data and form_data.url:
+                message += f"\n\n Lien du formulaire 👉👉 {form_data.url}."
             
             message += "\n\nBien à toi,\nLa bise Santana"
         
-        success = self.messenger.send_message(psid, message)
-        if success:
-            logger.info(f"✅ Personalized reminder sent to {name}")
-        else:
-            logger.error(f"❌ Failed to send personalized reminder to {name}")
-        return success
+        return name, psid, message
     
-    def _send_reminder_to_person(self, person: dict, message: str) -> bool:
+    def _send_reminder_to_person(self, person: PersonRecord, message: str) -> bool:
         """Send reminder to a specific person (legacy method for backward compatibility)."""
-        name = self.notion.get_property_content(person, self.notion.columns.PERSON_NAME)
-        psid = self.notion.get_property_content(person, self.notion.columns.PERSON_PSID)
+        name = person.name
+        psid = person.psid
         
         if not psid:
             logger.warning(f"No PSID found for {name}")
@@ -230,30 +478,31 @@ class ReminderService:
     
     def _get_form_name(self, form_id: str) -> str:
         """Get form name by ID."""
-        all_forms = self.notion.get_all_forms()
-        for form in all_forms:
-            if form["id"] == form_id:
-                return self.notion.get_property_content(form, self.notion.columns.FORM_NAME)
-        return "Unknown Form"
+        form = FormsRegistry.for_form(self.notion, form_id).get(form_id)
+        return form.name if form else "Unknown Form"
     
-    def get_summary_report(self, include_sync_report: bool = True) -> str:
+    def get_summary_report(self, include_sync_report: bool = True, snapshot: Optional[SnapshotStore] = None) -> str:
         """
         Get a comprehensive summary of all forms, their sync status, and non-responder counts.
         
         Args:
             include_sync_report: Whether to include Google Forms App Script sync information
+            snapshot: Optional local snapshot to read from instead of calling Notion and App Script
         """
         report = "📊 COMPREHENSIVE REMINDER & SYNC REPORT (APP SCRIPT)\n"
         report += "=" * 55 + "\n\n"
         
         # Sync report section
         if include_sync_report:
-            sync_report = self.synchronizer.get_sync_report()
+            sync_report = self.synchronizer.get_sync_report(snapshot)
             report += sync_report + "\n\n"
             report += "=" * 55 + "\n\n"
         
         # Reminder report section
-        all_non_responders = self.notion.get_all_non_responders()
+        if snapshot is not None:
+            all_non_responders = snapshot.all_non_responders()
+        else:
+            all_non_responders = self.notion.get_all_non_responders()
         
         report += "📋 REMINDER STATUS:\n\n"
         
@@ -264,12 +513,11 @@ class ReminderService:
             
             if count > 0:
                 report += f"📋 {form_name}: {count} people need reminders\n"
-                for person in people:
-                    name = self.notion.get_property_content(person, self.notion.columns.PERSON_NAME)
-                    email = self.notion.get_property_content(person, self.notion.columns.PERSON_EMAIL)
-                    report += f"   • {name}"
-                    if email:
-                        report += f" ({email})"
+                for entry in people:
+                    person = entry['non_responder']
+                    report += f"   • {person.name}"
+                    if person.email:
+                        report += f" ({person.email})"
                     report += "\n"
                 report += "\n"
             else:
@@ -292,6 +540,17 @@ class ReminderService:
         
         return report
     
+    def refresh_snapshot(self, snapshot: Optional[SnapshotStore] = None, full_scan: bool = False) -> Dict[str, Any]:
+        """
+        Update the local snapshot (Notion databases and App Script respondents) incrementally.
+        
+        Args:
+            snapshot: Snapshot to refresh (defaults to the one in STATE_DIR)
+            full_scan: Re-read every Notion row instead of only the rows edited since the last run
+        """
+        snapshot = snapshot or SnapshotStore()
+        return snapshot.refresh(self.notion, self.synchronizer.google_forms, full_scan=full_scan)
+    
     def test_app_script_connection(self) -> Dict[str, Any]:
         """
         Test the App Script connection with all configured forms.
@@ -301,12 +560,12 @@ class ReminderService:
         """
         logger.info("🧪 Testing App Script connection for all forms")
         
-        notion_forms = self.notion.get_all_forms()
+        notion_forms = self.notion.load_forms_registry()
         test_results = {}
         
         for form in notion_forms:
-            form_name = self.notion.get_property_content(form, self.notion.columns.FORM_NAME)
-            google_form_id = self.notion.get_property_content(form, self.notion.columns.GOOGLE_FORM_ID)
+            form_name = form.name
+            google_form_id = form.google_form_id
             
             if not google_form_id:
                 test_results[form_name] = {
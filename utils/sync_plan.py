@@ -0,0 +1,96 @@
+import logging
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from connections.notion_indexes import PeopleDirectory
+from connections.notion_records import ResponseRecord, PersonRecord
+
+logger = logging.getLogger(__name__)
+
+class SyncPlan:
+    """
+    Minimal set of changes that brings one form's Notion rows in line with Google Forms.
+
+    Only `to_mark` is written when the plan is applied; the other lists are
+    reported for review.
+    """
+
+    def __init__(self, form_id: str, form_name: str):
+        self.form_id = form_id
+        self.form_name = form_name
+        # (response_id, person, email) to mark as responded
+        self.to_mark: List[Tuple[str, PersonRecord, str]] = []
+        # (response_id, person, email) marked as responded in Notion but absent from Google
+        self.responded_not_in_google: List[Tuple[str, PersonRecord, str]] = []
+        # (response_id, person) whose person has no email
+        self.missing_email: List[Tuple[str, PersonRecord]] = []
+        # response IDs without a (resolvable) person
+        self.missing_person: List[str] = []
+        self.google_responses = 0
+        self.notion_responses = 0
+        self.people_checked = 0
+
+    @property
+    def pending_updates(self) -> Dict[str, Tuple[PersonRecord, str]]:
+        """{response_id: (person, email)} of the rows to mark as responded."""
+        return {response_id: (person, email) for response_id, person, email in self.to_mark}
+
+    def summary(self) -> Dict:
+        """Counts and the people concerned, for logs and dry-run reviews."""
+        return {
+            "to_mark_responded": [email for _, _, email in self.to_mark],
+            "responded_not_in_google": [email for _, _, email in self.responded_not_in_google],
+            "missing_email": [person.name for _, person in self.missing_email],
+            "missing_person": len(self.missing_person)
+        }
+
+    def log(self):
+        for _, person, email in self.to_mark:
+            logger.info(f"📝 Plan: mark {person.name} ({email}) as responded")
+        for _, _, email in self.responded_not_in_google:
+            logger.warning(f"⚠️  {email} marked as responded in Notion but not found in Google Forms")
+        for response_id, person in self.missing_email:
+            logger.warning(f"No email found for person '{person.name}' in response {response_id}")
+        for response_id in self.missing_person:
+            logger.warning(f"No person relation found for response {response_id}")
+        logger.info(f"📋 Plan for '{self.form_name}': {len(self.to_mark)} to mark, "
+                    f"{len(self.responded_not_in_google)} responded in Notion only, "
+                    f"{len(self.missing_email)} without email")
+
+def build_sync_plan(form_id: str, form_name: str, google_emails: Set[str],
+                    notion_responses: Iterable[ResponseRecord],
+                    resolve_person: Callable[[str], Optional[PersonRecord]]) -> SyncPlan:
+    """
+    Join a form's response rows, their persons' emails and the Google respondent set.
+
+    Args:
+        form_id: Notion form page ID
+        form_name: Name of the form
+        google_emails: Normalized emails of the Google Form respondents
+        notion_responses: Response rows of the form
+        resolve_person: Person lookup by Notion page ID (directory or cached fetch)
+    """
+    plan = SyncPlan(form_id, form_name)
+    plan.google_responses = len(google_emails)
+
+    rows_by_email: Dict[str, List[Tuple[ResponseRecord, PersonRecord, str]]] = defaultdict(list)
+    for response in notion_responses:
+        plan.notion_responses += 1
+        person = resolve_person(response.person_id) if response.person_id else None
+        if person is None:
+            plan.missing_person.append(response.id)
+        elif not person.email:
+            plan.missing_email.append((response.id, person))
+        else:
+            rows_by_email[PeopleDirectory.normalize_email(person.email)].append((response, person, person.email))
+
+    plan.people_checked = sum(len(rows) for rows in rows_by_email.values())
+
+    notion_emails = rows_by_email.keys()
+    for email in sorted(notion_emails & google_emails):
+        plan.to_mark.extend((response.id, person, raw_email)
+                            for response, person, raw_email in rows_by_email[email] if not response.has_responded)
+    for email in sorted(notion_emails - google_emails):
+        plan.responded_not_in_google.extend((response.id, person, raw_email)
+                                            for response, person, raw_email in rows_by_email[email]
+                                            if response.has_responded)
+    return plan
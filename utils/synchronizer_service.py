@@ -1,49 +1,119 @@
 import logging
-from typing import List, Dict, Set
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Dict, Set, Optional, Tuple
 from connections.notion_connection import NotionClient
+from connections.notion_indexes import ResponsesIndex, PeopleDirectory, FormsRegistry
+from connections.async_notion_client import AsyncNotionClient
+from connections.notion_write_buffer import NotionWriteBuffer
+from connections.notion_records import PersonRecord
+from connections.snapshot_store import SnapshotStore
+from connections.form_fingerprints import FormFingerprints, form_fingerprints, content_hash
+from utils.sync_plan import SyncPlan, build_sync_plan
 from connections.google_forms_client import GoogleFormsAppScriptClient
-from config import config
+from config.config import config
 
 logger = logging.getLogger(__name__)
 
 class SynchronizerService:
-    def __init__(self):
-        self.notion = NotionClient()
+    def __init__(self, notion: Optional[NotionClient] = None, async_notion: Optional[AsyncNotionClient] = None,
+                 fingerprints: Optional[FormFingerprints] = None):
+        # Reuse the caller's Notion clients (and their pooled session) when provided
+        self.notion = notion or NotionClient()
+        self.async_notion = async_notion or AsyncNotionClient(self.notion)
         self.google_forms = GoogleFormsAppScriptClient()
+        self.fingerprints = fingerprints or form_fingerprints
     
-    def synchronize_all_forms(self) -> Dict[str, Dict]:
+    def close(self):
+        """Shut down the worker pool used to read person records."""
+        self.async_notion.close()
+    
+    def synchronize_all_forms(self, max_workers: Optional[int] = None,
+                              forms: Optional[FormsRegistry] = None, full_scan: bool = False,
+                              dry_run: bool = False) -> Dict[str, Dict]:
         """
         Synchronize all forms by updating Notion responses based on Google Forms data via App Script.
         
+        Forms are synchronized in parallel; a failure in one form does not affect the others.
+        Forms whose Google respondents and Notion rows did not change since their last
+        successful synchronization are reported as "unchanged" without being compared.
+        
+        Args:
+            max_workers: Number of forms synchronized at once (defaults to SYNC_MAX_WORKERS)
+            forms: Optional forms registry already loaded by the caller
+            full_scan: Re-read the responses and People databases instead of only rows edited
+                since the last run, and compare every form even if unchanged
+            dry_run: Only plan the changes (each result holds its plan), write nothing
+            
         Returns:
-            Summary dictionary with sync results for each form
+            {Notion form ID: sync result}, each result also holding the form's name under "form_name"
         """
         logger.info("🔄 Starting full synchronization process via App Script")
         
         # Get all forms from Notion
-        notion_forms = self.notion.get_all_forms()
+        notion_forms = self.notion.load_forms_registry() if forms is None else forms
+        # One (incremental) load of the responses and People databases shared by every form
+        responses_index = self.notion.build_responses_index(full_scan=full_scan)
+        people = self.notion.build_people_directory(full_scan=full_scan)
+        # Persons missing from the directory are fetched through the cache, which may predate this run
+        self.notion.revalidate_person_cache(force=True)
+        stale = responses_index.stale or people.stale
+        if stale:
+            # Marking rows from older data is safe, but the next run must compare every form again
+            logger.warning("⚠️  Notion could not be read, comparing against rows from an earlier run")
         sync_summary = {}
+        # Status updates of every form are merged per page and written at the end of the stage
+        write_buffer = NotionWriteBuffer(self.notion)
+        pending_by_form = {}
+        fingerprint_by_form = {}
         
-        for form in notion_forms:
-            form_id = form["id"]
-            form_name = self.notion.get_property_content(form, self.notion.columns.FORM_NAME)
-            
-            # Get Google Form ID from Notion form
-            google_form_id = self.notion.get_property_content(form, self.notion.columns.GOOGLE_FORM_ID)
-            
-            if not google_form_id:
-                logger.warning(f"⚠️  No Google Form ID found for '{form_name}', skipping")
-                sync_summary[form_name] = {"status": "skipped", "reason": "No Google Form ID"}
-                continue
+        with ThreadPoolExecutor(max_workers=max_workers or config.sync_max_workers,
+                                thread_name_prefix="sync") as executor:
+            # Keyed by Notion form ID: form names are for display and need not be unique
+            futures = {}
+            for form in notion_forms:
+                form_id = form.id
+                form_name = form.name
+                google_form_id = form.google_form_id
+                
+                if not google_form_id:
+                    logger.warning(f"⚠️  No Google Form ID found for '{form_name}', skipping")
+                    sync_summary[form_id] = {"form_name": form_name, "status": "skipped",
+                                             "reason": "No Google Form ID"}
+                    continue
+                
+                # Synchronize this specific form in a worker
+                sync_summary[form_id] = None  # keep the forms' order in the summary
+                futures[form_id] = (form_name, executor.submit(
+                    self._synchronize_form, form_id, google_form_id, form_name, write_buffer, responses_index, people,
+                    full_scan, dry_run
+                ))
             
-            # Synchronize this specific form
-            result = self.synchronize_single_form(form_id, google_form_id, form_name)
-            sync_summary[form_name] = result
+            for form_id, (form_name, future) in futures.items():
+                try:
+                    result, pending_by_form[form_id], fingerprint_by_form[form_id] = future.result()
+                except Exception as e:
+                    logger.error(f"❌ Synchronization worker failed for form '{form_name}': {e}")
+                    result = {"status": "error", "error": str(e)}
+                sync_summary[form_id] = {"form_name": form_name, **result}
+        
+        write_buffer.flush()
+        failed_pages = set(write_buffer.failed)
+        for form_id, pending_updates in pending_by_form.items():
+            self._confirm_updates(futures[form_id][0], sync_summary[form_id], pending_updates, failed_pages)
+        for form_id, fingerprint in fingerprint_by_form.items():
+            self._record_fingerprint(form_id, sync_summary[form_id], None if stale else fingerprint)
+        
+        write_report = write_buffer.report()
+        logger.info(f"💾 Sync writes: {write_report['written']} pages written, "
+                    f"{len(write_report['failed_pages'])} failed, {write_report['coalesced_updates']} updates merged")
         
         logger.info(f"✅ Synchronization completed for {len(sync_summary)} forms via App Script")
         return sync_summary
     
-    def synchronize_single_form(self, notion_form_id: str, google_form_id: str, form_name: str) -> Dict:
+    def synchronize_single_form(self, notion_form_id: str, google_form_id: str, form_name: str,
+                                responses_index: Optional[ResponsesIndex] = None,
+                                people: Optional[PeopleDirectory] = None, force: bool = False,
+                                dry_run: bool = False) -> Dict:
         """
         Synchronize a single form between Google Forms (via App Script) and Notion.
         
@@ -51,10 +121,36 @@ class SynchronizerService:
             notion_form_id: Notion form page ID
             google_form_id: Google Form ID
             form_name: Name of the form for logging
+            responses_index: Optional prebuilt responses index (avoids a per-form query)
+            people: Optional People directory (avoids one page fetch per response)
+            force: Compare the form even if nothing changed since its last synchronization
+            dry_run: Only plan the changes (returned under "plan"), write nothing
             
         Returns:
             Dictionary with sync results
         """
+        # Persons cached by an earlier run may have been edited since
+        self.notion.revalidate_person_cache(force=True)
+        write_buffer = NotionWriteBuffer(self.notion)
+        result, pending_updates, fingerprint = self._synchronize_form(notion_form_id, google_form_id, form_name,
+                                                                      write_buffer, responses_index, people, force,
+                                                                      dry_run)
+        write_buffer.flush()
+        self._confirm_updates(form_name, result, pending_updates, set(write_buffer.failed))
+        self._record_fingerprint(notion_form_id, result, fingerprint)
+        return result
+    
+    def _synchronize_form(self, notion_form_id: str, google_form_id: str, form_name: str,
+                          write_buffer: NotionWriteBuffer, responses_index: Optional[ResponsesIndex] = None,
+                          people: Optional[PeopleDirectory] = None, force: bool = False, dry_run: bool = False
+                          ) -> Tuple[Dict, Dict[str, Tuple[PersonRecord, str]], Optional[Dict]]:
+        """
+        Plan one form against Google Forms and queue the planned status updates in `write_buffer`.
+        
+        Returns:
+            (sync result, {response_id: (person, email)} of queued updates, fingerprint of the
+            compared data or None)
+        """
         logger.info(f"🔄 Synchronizing form '{form_name}' via App Script")
         
         try:
@@ -72,109 +168,181 @@ class SynchronizerService:
                     "notion_responses": 0,
                     "updated_count": 0,
                     "message": "No emails found in Google Form responses"
-                }
+                }, {}, None
             
             # Step 2: Get Notion responses for this form
-            notion_responses = self.notion.get_responses_for_form(notion_form_id)
+            if responses_index is not None:
+                notion_responses = responses_index.responses_for_form(notion_form_id)
+            else:
+                notion_responses = self.notion.get_responses_for_form(notion_form_id)
             
             logger.info(f"📊 Found {len(notion_responses)} responses in Notion for this form")
             
-            # Step 3: Compare and update
-            updated_count = 0
-            people_checked = 0
+            if people is None:
+                # Fetch this form's persons concurrently; the fingerprint and the plan then hit the person cache
+                person_ids = [r.person_id for r in notion_responses if r.person_id]
+                self.async_notion.run(self.async_notion.get_persons_by_ids(person_ids))
+            resolve_person = lambda person_id: self.notion.resolve_person(person_id, people)
             
-            for response in notion_responses:
-                # Get person data for this response
-                person_ids = self.notion.get_relation_ids(response, self.notion.columns.PERSON_RELATION)
-                
-                if not person_ids:
-                    logger.warning(f"No person relation found for response {response['id']}")
-                    continue
-                
-                person = self.notion.get_person_by_id(person_ids[0])
-                if not person:
-                    continue
-                
-                # Get person's email
-                person_email = self.notion.get_property_content(person, self.notion.columns.PERSON_EMAIL)
-                
-                if not person_email:
-                    person_name = self.notion.get_property_content(person, self.notion.columns.PERSON_NAME)
-                    logger.warning(f"No email found for person '{person_name}' in response {response['id']}")
-                    continue
-                
-                people_checked += 1
-                
-                # Check if this email has responded in Google Forms
-                person_email_normalized = person_email.lower().strip()
-                has_responded_google = person_email_normalized in google_emails
-                has_responded_notion = self.notion.get_checkbox_value(response, self.notion.columns.HAS_RESPONDED)
-                
-                # Update if status doesn't match
-                if has_responded_google and not has_responded_notion:
-                    success = self.notion.update_response_status(response['id'], True)
-                    if success:
-                        updated_count += 1
-                        person_name = self.notion.get_property_content(person, self.notion.columns.PERSON_NAME)
-                        logger.info(f"✅ Updated response status for {person_name} ({person_email})")
-                    else:
-                        logger.error(f"❌ Failed to update response status for {person_email}")
-                elif has_responded_google and has_responded_notion:
-                    logger.debug(f"✓ {person_email} already marked as responded")
-                elif not has_responded_google and not has_responded_notion:
-                    logger.debug(f"- {person_email} still needs to respond")
-                elif not has_responded_google and has_responded_notion:
-                    logger.warning(f"⚠️  {person_email} marked as responded in Notion but not found in Google Forms")
+            # Skip the comparison when neither side changed since the last successful run
+            fingerprint = self._fingerprint(google_form_id, google_emails, notion_responses, resolve_person)
+            stored = self.fingerprints.get(notion_form_id)
+            if not force and stored is not None and all(stored.get(k) == v for k, v in fingerprint.items()):
+                logger.info(f"⏭️  Form '{form_name}' unchanged since its last synchronization, skipping")
+                return {
+                    "status": "unchanged",
+                    "google_responses": len(google_responses),
+                    "notion_responses": len(notion_responses),
+                    "people_checked": 0,
+                    "updated_count": 0
+                }, {}, None
+            
+            # Step 3: Plan the changes (set operations on emails)
+            plan = build_sync_plan(notion_form_id, form_name, google_emails, notion_responses, resolve_person)
+            plan.log()
             
             result = {
-                "status": "success",
+                "status": "dry_run" if dry_run else "success",
                 "google_responses": len(google_responses),
                 "notion_responses": len(notion_responses),
-                "people_checked": people_checked,
-                "updated_count": updated_count
+                "people_checked": plan.people_checked,
+                "updated_count": 0
             }
+            if dry_run:
+                result["plan"] = plan.summary()
+                return result, {}, None
             
-            logger.info(f"✅ Form '{form_name}': {updated_count} responses updated ({people_checked} people checked)")
-            return result
+            # Step 4: Apply the plan; updates are written when the buffer is flushed
+            pending_updates = self.apply_plan(plan, write_buffer)
+            # Recorded only if every update succeeds, so describe the rows as they will be then
+            fingerprint = self._fingerprint(google_form_id, google_emails, notion_responses, resolve_person,
+                                            responded_ids=set(pending_updates))
+            return result, pending_updates, fingerprint
             
         except Exception as e:
             logger.error(f"❌ Failed to synchronize form '{form_name}' via App Script: {e}")
-            return {"status": "error", "error": str(e)}
+            return {"status": "error", "error": str(e)}, {}, None
+    
+    def apply_plan(self, plan: SyncPlan, write_buffer: NotionWriteBuffer) -> Dict[str, Tuple[PersonRecord, str]]:
+        """
+        Queue a plan's status updates in a write buffer (written when it is flushed).
+        
+        Returns:
+            {response_id: (person, email)} of the queued updates
+        """
+        pending_updates = plan.pending_updates
+        for response_id in pending_updates:
+            write_buffer.mark_responded(response_id, True)
+        return pending_updates
+    
+    @staticmethod
+    def _fingerprint(google_form_id: str, google_emails: Set[str], notion_responses: List,
+                     resolve_person: Callable[[str], Optional[PersonRecord]],
+                     responded_ids: Set[str] = frozenset()) -> Dict:
+        """
+        Describe what a form's comparison depends on.
+        
+        The Google side is a content hash of the normalized respondent emails; the
+        Notion side hashes each response row's (ID, person, 'A répondu') and the
+        email of each related person, so unchecked boxes, re-pointed relations
+        and email edits in People all trigger a new comparison. Rows in
+        `responded_ids` are described as already marked responded.
+        """
+        rows = []
+        person_emails = []
+        for response in notion_responses:
+            responded = response.has_responded or response.id in responded_ids
+            rows.append(f"{response.id}:{response.person_id or ''}:{int(responded)}")
+            person = resolve_person(response.person_id) if response.person_id else None
+            person_emails.append(f"{response.person_id}:{person.email if person else ''}")
+        return {
+            "google_form_id": google_form_id,
+            "google_emails_hash": content_hash(google_emails),
+            "notion_rows_hash": content_hash(rows),
+            "person_emails_hash": content_hash(person_emails)
+        }
+    
+    def _record_fingerprint(self, notion_form_id: str, result: Dict, fingerprint: Optional[Dict]):
+        """Remember the fingerprint of a form once its comparison and every update succeeded."""
+        if fingerprint is None or result.get("status") != "success":
+            return
+        if result.get("failed_updates"):
+            # Retry the whole comparison next time
+            self.fingerprints.forget(notion_form_id)
+            return
+        self.fingerprints.put(notion_form_id, fingerprint)
+    
+    def _confirm_updates(self, form_name: str, result: Dict, pending_updates: Dict[str, Tuple[PersonRecord, str]],
+                         failed_pages: Set[str]):
+        """Fill the form's result from the outcome of its flushed status updates."""
+        if result.get("status") != "success":
+            return
+        
+        updated_count = 0
+        for response_id, (person, person_email) in pending_updates.items():
+            if response_id in failed_pages:
+                logger.error(f"❌ Failed to update response status for {person_email}")
+                continue
+            updated_count += 1
+            logger.info(f"✅ Updated response status for {person.name} ({person_email})")
+        
+        result["updated_count"] = updated_count
+        result["failed_updates"] = len(pending_updates) - updated_count
+        logger.info(f"✅ Form '{form_name}': {updated_count} responses updated ({result['people_checked']} people checked)")
     
-    def get_sync_report(self) -> str:
-        """Get a detailed synchronization report without actually syncing."""
+    def get_sync_report(self, snapshot: Optional[SnapshotStore] = None) -> str:
+        """
+        Get a detailed synchronization report without actually syncing.
+        
+        Args:
+            snapshot: Optional local snapshot to read from instead of calling Notion and App Script
+        """
         logger.info("📊 Generating synchronization report for App Script integration")
         
-        notion_forms = self.notion.get_all_forms()
+        if snapshot is not None:
+            notion_forms = snapshot.forms()
+            responses_index = None
+        else:
+            notion_forms = self.notion.load_forms_registry()
+            responses_index = self.notion.build_responses_index()
         
         report = "🔄 APP SCRIPT SYNCHRONIZATION REPORT\n"
         report += "=" * 45 + "\n\n"
+        if snapshot is not None:
+            report += f"🗄️  From local snapshot (refreshed {snapshot.refreshed_at() or 'never'})\n\n"
+        elif responses_index.stale:
+            report += "⚠️  Notion could not be read: response counts are those of an earlier run\n\n"
         
         total_forms = len(notion_forms)
         forms_with_google_id = 0
         
         for form in notion_forms:
-            form_name = self.notion.get_property_content(form, self.notion.columns.FORM_NAME)
-            google_form_id = self.notion.get_property_content(form, self.notion.columns.GOOGLE_FORM_ID)
+            form_name = form.name
+            google_form_id = form.google_form_id
             
             if google_form_id:
                 forms_with_google_id += 1
                 report += f"✅ {form_name}\n"
                 report += f"   Google Form ID: {google_form_id}\n"
                 
-                # Test App Script connection for this form
-                test_result = self._test_form_access(google_form_id)
-                if test_result["accessible"]:
-                    report += f"   App Script access: ✅ OK ({test_result.get('email_count', 0)} emails found)\n"
+                if snapshot is not None:
+                    report += f"   App Script emails (snapshot): {snapshot.respondent_count(google_form_id)}\n"
+                    counts = snapshot.response_counts(form.id)
+                    total_responses, responded_count = counts["total"], counts["responded"]
                 else:
-                    report += f"   App Script access: ❌ {test_result.get('error', 'Unknown error')}\n"
-                
-                # Get response counts
-                notion_responses = self.notion.get_responses_for_form(form["id"])
-                responded_count = sum(1 for r in notion_responses 
-                                    if self.notion.get_checkbox_value(r, self.notion.columns.HAS_RESPONDED))
+                    # Test App Script connection for this form
+                    test_result = self._test_form_access(google_form_id)
+                    if test_result["accessible"]:
+                        report += f"   App Script access: ✅ OK ({test_result.get('email_count', 0)} emails found)\n"
+                    else:
+                        report += f"   App Script access: ❌ {test_result.get('error', 'Unknown error')}\n"
+                    
+                    # Get response counts
+                    notion_responses = responses_index.responses_for_form(form.id)
+                    total_responses = len(notion_responses)
+                    responded_count = sum(1 for r in notion_responses if r.has_responded)
                 
-                report += f"   Notion responses: {len(notion_responses)} ({responded_count} marked as responded)\n\n"
+                report += f"   Notion responses: {total_responses} ({responded_count} marked as responded)\n\n"
             else:
                 report += f"⚠️  {form_name}\n"
                 report += f"   Missing Google Form ID - will be skipped\n\n"
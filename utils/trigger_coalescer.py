@@ -0,0 +1,111 @@
+import logging
+import threading
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from config.config import config
+
+logger = logging.getLogger(__name__)
+
+class Flight:
+    """One coalesced run: every trigger folded into it shares its future."""
+
+    def __init__(self, key: str, func: Callable[[], Any], start_after: float, context: Any = None):
+        self.key = key
+        self.func = func
+        self.start_after = start_after
+        # Caller data attached by whoever created the flight (e.g. the webhook job)
+        self.context = context
+        self.triggers = 1
+        self.future: Future = Future()
+
+class TriggerCoalescer:
+    """
+    Single-flight coordinator for triggered runs, keyed by form ID or "ALL".
+
+    The first trigger for a key opens a flight that starts after the debounce
+    window; triggers arriving before it starts join it. Triggers arriving while
+    it runs are folded into one follow-up flight that starts when it ends
+    (`follow_up=True`, for syncs that must see the latest data), or simply share
+    the running flight's result (`follow_up=False`, for runs that must not be
+    repeated, like sending reminders).
+    """
+
+    def __init__(self, debounce: Optional[float] = None, executor: Optional[Executor] = None):
+        self.debounce = config.trigger_debounce_seconds if debounce is None else debounce
+        self._executor = executor or ThreadPoolExecutor(thread_name_prefix="trigger")
+        self._lock = threading.Lock()
+        self._running: Dict[str, Flight] = {}
+        self._pending: Dict[str, Flight] = {}
+
+    def submit(self, key: str, func: Callable[[], Any], follow_up: bool = True, context: Any = None) -> Flight:
+        """
+        Trigger a run of `func` for `key`, or join the flight that already covers it.
+
+        Args:
+            key: Coalescing key (form ID, "ALL", or a kind-prefixed variant)
+            func: Work to run, called without arguments
+            follow_up: Whether a trigger during a running flight schedules a new run
+            context: Data attached to the flight if a new one is created
+
+        Returns:
+            The flight the trigger was folded into (check `flight.triggers`)
+        """
+        with self._lock:
+            flight = self._pending.get(key)
+            if flight is None and not follow_up:
+                flight = self._running.get(key)
+            if flight is not None:
+                flight.triggers += 1
+                logger.info(f"🔀 Trigger for {key} folded into pending run ({flight.triggers} triggers)")
+                return flight
+
+            flight = Flight(key, func, time.monotonic() + self.debounce, context)
+            self._pending[key] = flight
+            if key in self._running:
+                # Started when the running flight ends
+                logger.info(f"⏳ Trigger for {key} queued as a follow-up run")
+                return flight
+
+        self._launch(flight)
+        return flight
+
+    def run(self, key: str, func: Callable[[], Any], follow_up: bool = True) -> Any:
+        """Blocking variant of `submit`: wait for the shared result (re-raises its error)."""
+        return self.submit(key, func, follow_up).future.result()
+
+    def _launch(self, flight: Flight):
+        try:
+            self._executor.submit(self._fly, flight)
+        except RuntimeError as e:
+            # Executor shut down while the follow-up was waiting
+            with self._lock:
+                if self._pending.get(flight.key) is flight:
+                    del self._pending[flight.key]
+            flight.future.set_exception(e)
+
+    def _fly(self, flight: Flight):
+        delay = flight.start_after - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+        with self._lock:
+            # Later triggers now start a follow-up instead of joining this flight
+            del self._pending[flight.key]
+            self._running[flight.key] = flight
+
+        if flight.triggers > 1:
+            logger.info(f"🔀 Running {flight.key} once for {flight.triggers} triggers")
+        try:
+            flight.future.set_result(flight.func())
+        except BaseException as e:
+            flight.future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._running[flight.key]
+                follow_up = self._pending.get(flight.key)
+            if follow_up is not None:
+                self._launch(follow_up)
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
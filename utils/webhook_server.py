@@ -0,0 +1,290 @@
+import hmac
+import ipaddress
+import itertools
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Optional, Any, Callable
+from urllib.parse import urlparse, parse_qs
+from config.config import config
+from connections.notion_connection import NotionClient
+from connections.rate_limiter import get_all_stats
+from utils.reminder_service import ReminderService
+from utils.trigger_coalescer import TriggerCoalescer
+
+logger = logging.getLogger(__name__)
+
+class JobRunner:
+    """
+    Runs webhook-triggered work in the background and remembers recent results.
+
+    Jobs share one worker pool (one worker by default, so syncs and reminder
+    runs never overlap) and the last `history` jobs stay queryable by ID.
+    Triggers are coalesced per kind and form: a trigger that arrives while an
+    equivalent job is still queued returns that job instead of a new one.
+    """
+
+    def __init__(self, max_workers: int = 1, history: int = 100, debounce: Optional[float] = None):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="webhook-job")
+        self.coalescer = TriggerCoalescer(debounce, self._executor)
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.history = history
+
+    def submit(self, kind: str, form_id: Optional[str], func: Callable[[], Any],
+               follow_up: bool = True) -> Dict[str, Any]:
+        """
+        Queue a job, or fold the trigger into the equivalent queued job.
+
+        Args:
+            kind: Job kind ("sync" or "remind")
+            form_id: Targeted form, None for all forms
+            func: Work to run
+            follow_up: Whether a trigger during a running job of the same kind and
+                form queues one more run (see TriggerCoalescer)
+
+        Returns:
+            Description of the job the trigger belongs to
+        """
+        with self._lock:
+            job = {
+                "id": None,
+                "kind": kind,
+                "form_id": form_id,
+                "status": "queued",
+                "triggers": 1,
+                "submitted_at": NotionClient.utc_now_iso(),
+                "started_at": None,
+                "finished_at": None,
+                "result": None,
+                "error": None
+            }
+            flight = self.coalescer.submit(f"{kind}:{form_id or 'ALL'}", lambda: self._run(job, func),
+                                           follow_up, context=job)
+            job = flight.context
+            if job["id"] is None:
+                job["id"] = str(next(self._ids))
+                self._jobs[job["id"]] = job
+                while len(self._jobs) > self.history:
+                    self._jobs.popitem(last=False)
+            job["triggers"] = flight.triggers
+            return dict(job)
+
+    def _run(self, job: Dict[str, Any], func: Callable[[], Any]):
+        with self._lock:
+            job["status"] = "running"
+            job["started_at"] = NotionClient.utc_now_iso()
+        logger.info(f"⚙️  Job {job['id']} ({job['kind']}, form {job['form_id'] or 'ALL'}) started")
+        try:
+            result = func()
+            with self._lock:
+                job["status"] = "done"
+                job["result"] = result
+        except Exception as e:
+            logger.error(f"❌ Job {job['id']} ({job['kind']}) failed: {e}")
+            with self._lock:
+                job["status"] = "error"
+                job["error"] = str(e)
+        finally:
+            with self._lock:
+                job["finished_at"] = NotionClient.utc_now_iso()
+        logger.info(f"✅ Job {job['id']} ({job['kind']}) finished: {job['status']}")
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+            return counts
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+class WebhookServer:
+    """
+    Long-running HTTP server for Notion buttons and other webhook triggers.
+
+    One ReminderService (and with it the pooled HTTP sessions, rate limiters,
+    person cache and incremental Notion state) is kept warm for the whole
+    process. Trigger endpoints only queue a background job and answer
+    202 Accepted right away.
+
+    Endpoints:
+        GET  /health        liveness, uptime, job counts, cache and rate limiter stats
+        POST /sync          synchronize all forms, or one form (see `_form_id`)
+        POST /remind        synchronize then send reminders, for all forms or one form
+        GET  /jobs/<id>     status and result of a queued job
+
+    Listening beyond localhost without a secret raises ValueError unless
+    `allow_insecure` (WEBHOOK_ALLOW_INSECURE) is set.
+    """
+
+    def __init__(self, service: Optional[ReminderService] = None, host: Optional[str] = None,
+                 port: Optional[int] = None, secret: Optional[str] = None, allow_insecure: Optional[bool] = None):
+        self.host = host or config.webhook_host
+        self.port = port if port is not None else config.webhook_port
+        self.secret = secret if secret is not None else config.webhook_secret
+        allow_insecure = config.webhook_allow_insecure if allow_insecure is None else allow_insecure
+        # Anyone reaching the port could message every non-responder: require a secret beyond localhost
+        if not self.secret and not self._is_loopback(self.host):
+            if not allow_insecure:
+                raise ValueError(f"Refusing to listen on {self.host} without WEBHOOK_SECRET "
+                                 f"(set WEBHOOK_ALLOW_INSECURE=1 or --insecure to override)")
+            logger.warning(f"⚠️  Webhook server listening on {self.host} without a secret")
+        self.service = service or ReminderService()
+        self.jobs = JobRunner()
+        self.started_at = time.monotonic()
+        self.httpd = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self.httpd.daemon_threads = True
+
+    @staticmethod
+    def _is_loopback(host: str) -> bool:
+        if host == "localhost":
+            return True
+        try:
+            return ipaddress.ip_address(host).is_loopback
+        except ValueError:
+            return False
+
+    # ----- Triggers -----
+
+    def trigger_sync(self, form_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Queue a synchronization (all forms when form_id is None).
+        Triggers during a running sync of the same target fold into one follow-up sync.
+        """
+        if form_id:
+            return self.jobs.submit("sync", form_id, lambda: self.service.sync_only_specific_form(form_id))
+        return self.jobs.submit("sync", None, self.service.sync_only_all_forms)
+
+    def trigger_reminders(self, form_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Queue a sync + reminders run (all forms when form_id is None).
+        Triggers during a running run of the same target share it, so nobody is reminded twice.
+        """
+        if form_id:
+            return self.jobs.submit("remind", form_id,
+                                    lambda: self.service.send_reminders_for_specific_form(form_id, sync_first=True),
+                                    follow_up=False)
+        return self.jobs.submit("remind", None, lambda: self.service.send_reminders_for_all_forms(sync_first=True),
+                                follow_up=False)
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "status": "ok",
+            "uptime_seconds": round(time.monotonic() - self.started_at, 1),
+            "jobs": self.jobs.counts(),
+            "person_cache": self.service.notion.person_cache.stats(),
+            "rate_limits": get_all_stats()
+        }
+
+    # ----- Request parsing -----
+
+    def _authorized(self, headers, query: Dict) -> bool:
+        if not self.secret:
+            return True
+        provided = headers.get("X-Webhook-Secret") or query.get("token", [""])[0]
+        return hmac.compare_digest(provided.encode("utf-8"), self.secret.encode("utf-8"))
+
+    @staticmethod
+    def _normalize_id(page_id: str) -> str:
+        return page_id.replace("-", "")
+
+    def _form_id(self, query: Dict, body: Dict) -> Optional[str]:
+        """
+        Form targeted by a trigger: `form_id` in the query string or JSON body, or the
+        page a Notion button was clicked on when that page belongs to the forms database.
+        """
+        form_id = query.get("form_id", [None])[0] or body.get("form_id")
+        if form_id:
+            return form_id
+
+        page = body.get("data") or {}
+        parent_db = (page.get("parent") or {}).get("database_id")
+        if page.get("id") and parent_db and \
+                self._normalize_id(parent_db) == self._normalize_id(config.notion_forms_db_id):
+            return page["id"]
+        return None
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                logger.debug(f"{self.address_string()} {format % args}")
+
+            def _send_json(self, status: int, payload: Dict):
+                body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _read_body(self) -> Dict:
+                length = int(self.headers.get("Content-Length") or 0)
+                if not length:
+                    return {}
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    return {}
+                return body if isinstance(body, dict) else {}
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path == "/health":
+                    return self._send_json(200, server.health())
+                if url.path.startswith("/jobs/"):
+                    if not server._authorized(self.headers, parse_qs(url.query)):
+                        return self._send_json(401, {"error": "unauthorized"})
+                    job = server.jobs.get(url.path[len("/jobs/"):])
+                    return self._send_json(200 if job else 404, job or {"error": "unknown job"})
+                self._send_json(404, {"error": "not found"})
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                body = self._read_body()
+                if url.path not in ("/sync", "/remind"):
+                    return self._send_json(404, {"error": "not found"})
+                if not server._authorized(self.headers, query):
+                    logger.warning(f"🚫 Unauthorized webhook call to {url.path} from {self.address_string()}")
+                    return self._send_json(401, {"error": "unauthorized"})
+
+                form_id = server._form_id(query, body)
+                logger.info(f"🔗 Webhook {url.path} - Form ID: {form_id or 'ALL'}")
+                if url.path == "/sync":
+                    job = server.trigger_sync(form_id)
+                else:
+                    job = server.trigger_reminders(form_id)
+                self._send_json(202, job)
+
+        return Handler
+
+    # ----- Lifecycle -----
+
+    def serve_forever(self):
+        logger.info(f"🌐 Webhook server listening on http://{self.host}:{self.port}")
+        try:
+            self.httpd.serve_forever()
+        except KeyboardInterrupt:
+            logger.info("🛑 Webhook server stopping")
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        """Stop accepting requests, then wait for queued jobs to finish."""
+        self.httpd.server_close()
+        self.jobs.shutdown()
+        self.service.synchronizer.close()